@@ -0,0 +1,65 @@
+"""Count the database commits per task of a WorkGraph, with and without the step transaction.
+
+Run it on a profile with a SQLite storage, no broker is needed::
+
+    verdi profile setup core.sqlite_dos -n --profile-name bench --email bench@localhost
+    python benchmarks/commits_per_task.py --profile bench --tasks 200
+"""
+
+import argparse
+import time
+
+# the executor imports the function by its module, which can not be ``__main__``
+from graphs import ADD_ONE
+
+
+def build_workgraph(number_of_tasks: int, step_transaction: bool):
+    from aiida_workgraph import WorkGraph
+
+    wg = WorkGraph(f'commits_per_task_{number_of_tasks}')
+    previous = None
+    for i in range(number_of_tasks):
+        # half of the tasks are independent, the other half is a chain
+        x = previous.outputs.result if previous is not None and i % 2 else i
+        previous = wg.add_task(ADD_ONE, name=f'task{i}', x=x)
+    wg.step_transaction = step_transaction
+    return wg
+
+
+def count_commits(number_of_tasks: int, step_transaction: bool):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    commits = []
+
+    def on_commit(session):
+        commits.append(1)
+
+    wg = build_workgraph(number_of_tasks, step_transaction)
+    event.listen(Session, 'after_commit', on_commit)
+    start = time.perf_counter()
+    try:
+        wg.run()
+    finally:
+        event.remove(Session, 'after_commit', on_commit)
+    return len(commits), time.perf_counter() - start
+
+
+def main():
+    from aiida import load_profile
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profile', default=None, help='the AiiDA profile, by default the default profile')
+    parser.add_argument('--tasks', type=int, default=100, help='the number of tasks')
+    args = parser.parse_args()
+    load_profile(args.profile, allow_switch=True)
+    for step_transaction in (False, True):
+        commits, elapsed = count_commits(args.tasks, step_transaction)
+        print(
+            f'step_transaction={step_transaction!s:5}  commits: {commits:6d}  '
+            f'commits per task: {commits / args.tasks:6.2f}  time: {elapsed:6.2f} s'
+        )
+
+
+if __name__ == '__main__':
+    main()
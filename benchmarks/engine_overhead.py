@@ -0,0 +1,127 @@
+"""Measure the overhead of the engine against the size of synthetic graphs of instantly completing tasks.
+
+For every graph of ``graphs.py`` and every size N, the graph is run with ``WorkGraph.run()`` and the following is
+reported: the number of tasks, the wall time of the run and per unit of N, the number of SQL statements, the bytes
+of the checkpoints written, and the peak Python memory. The ``scaling`` column is the exponent k of ``time ~ N^k``
+between two consecutive sizes, so a step of the engine whose cost grows with the number of tasks shows up as k > 1.
+
+Run it on a profile with a SQLite storage, no broker is needed::
+
+    verdi profile setup core.sqlite_dos -n --profile-name bench --email bench@localhost
+    python benchmarks/engine_overhead.py --profile bench --sizes 10 100 1000
+    python benchmarks/engine_overhead.py --profile bench --graphs map_zone --sizes 10000 50000 --no-memory
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import time
+import tracemalloc
+
+from graphs import GRAPHS
+
+
+@contextlib.contextmanager
+def count_statements(counter: dict):
+    """Count the SQL statements that are executed in the block."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    def on_execute(*args, **kwargs):
+        counter['statements'] += 1
+
+    event.listen(Engine, 'before_cursor_execute', on_execute)
+    try:
+        yield
+    finally:
+        event.remove(Engine, 'before_cursor_execute', on_execute)
+
+
+@contextlib.contextmanager
+def count_checkpoint_bytes(counter: dict):
+    """Count the bytes of the checkpoints that the processes store in the block."""
+    from aiida.orm import ProcessNode
+
+    set_checkpoint = ProcessNode.set_checkpoint
+
+    def counting_set_checkpoint(node, checkpoint):
+        counter['checkpoints'] += 1
+        counter['checkpoint_bytes'] += len(checkpoint.encode())
+        return set_checkpoint(node, checkpoint)
+
+    ProcessNode.set_checkpoint = counting_set_checkpoint
+    try:
+        yield
+    finally:
+        ProcessNode.set_checkpoint = set_checkpoint
+
+
+def measure(graph: str, size: int, memory: bool) -> dict:
+    wg = GRAPHS[graph](size)
+    result = {'graph': graph, 'n': size, 'statements': 0, 'checkpoints': 0, 'checkpoint_bytes': 0}
+    with count_statements(result), count_checkpoint_bytes(result):
+        start = time.perf_counter()
+        wg.run()
+        result['time'] = time.perf_counter() - start
+    if not wg.process.is_finished_ok:
+        raise RuntimeError(f'The {graph} graph of size {size} failed, see `verdi process report {wg.pk}`.')
+    result['tasks'] = len(wg.process.task_states)
+    result['peak_memory'] = None
+    if memory:
+        # a second run, because tracing the allocations slows the engine down
+        wg = GRAPHS[graph](size)
+        tracemalloc.start()
+        try:
+            wg.run()
+            result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def format_row(result: dict, previous: dict = None) -> str:
+    scaling = ''
+    if previous is not None and previous['time'] > 0 and result['n'] != previous['n']:
+        scaling = f'{math.log(result["time"] / previous["time"]) / math.log(result["n"] / previous["n"]):.2f}'
+    memory = f'{result["peak_memory"] / 2**20:.1f}' if result['peak_memory'] is not None else '-'
+    return (
+        f'{result["graph"]:>12} {result["n"]:>7d} {result["tasks"]:>7d} {result["time"]:>9.2f} '
+        f'{1000 * result["time"] / result["n"]:>9.2f} {scaling:>7} {result["statements"]:>10d} '
+        f'{result["statements"] / result["n"]:>8.1f} {result["checkpoint_bytes"] / 2**20:>9.2f} {memory:>9}'
+    )
+
+
+HEADER = (
+    f'{"graph":>12} {"N":>7} {"tasks":>7} {"time [s]":>9} {"ms/N":>9} {"scaling":>7} {"statements":>10} '
+    f'{"st/N":>8} {"ckpt [MB]":>9} {"mem [MB]":>9}'
+)
+
+
+def main():
+    from aiida import load_profile
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profile', default=None, help='the AiiDA profile, by default the default profile')
+    parser.add_argument('--graphs', nargs='+', choices=sorted(GRAPHS), default=list(GRAPHS), help='the graphs')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10, 100, 1000], help='the sizes N of the graphs')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='do not measure the peak memory')
+    parser.add_argument('--json', default=None, help='also write the results to this JSON file')
+    args = parser.parse_args()
+    load_profile(args.profile, allow_switch=True)
+    results = []
+    print(HEADER)
+    for graph in args.graphs:
+        previous = None
+        for size in sorted(args.sizes):
+            result = measure(graph, size, args.memory)
+            print(format_row(result, previous), flush=True)
+            results.append(result)
+            previous = result
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Synthetic graphs of tasks that complete instantly, to measure the overhead of the engine.
+
+All tasks are ``Normal`` tasks that run in the engine, so the graphs run with ``WorkGraph.run()`` without a
+broker or daemon, and the measured time is spent in the engine and the database.
+"""
+
+from typing import Any, Callable, Dict
+
+from aiida_workgraph import Map, While, WorkGraph, Zone
+from aiida_workgraph.socket_spec import dynamic, namespace
+
+
+def add_one(x):
+    return x + 1
+
+
+def smaller_than(x, y):
+    return x < y
+
+
+def generate(n):
+    return {'data': {f'item_{i}': i for i in range(int(n))}}
+
+
+def _handle(function: Callable, identifier: str, outputs=None):
+    from aiida_workgraph import Task
+    from aiida_workgraph.task import TaskHandle
+    from node_graph.executor import RuntimeExecutor
+    from node_graph.task_spec import TaskSpec
+
+    names = function.__code__.co_varnames[: function.__code__.co_argcount]
+    spec = TaskSpec(
+        identifier=identifier,
+        task_type='Normal',
+        inputs=namespace(**{name: Any for name in names}),
+        outputs=outputs or namespace(result=Any),
+        executor=RuntimeExecutor.from_callable(function),
+        base_class=Task,
+    )
+    return TaskHandle(spec)
+
+
+ADD_ONE = _handle(add_one, 'add_one')
+SMALLER_THAN = _handle(smaller_than, 'smaller_than')
+GENERATE = _handle(generate, 'generate', outputs=namespace(data=dynamic(Any)))
+
+
+def chain(n: int) -> WorkGraph:
+    """A chain of ``n`` tasks, each task depends on the previous one."""
+    wg = WorkGraph(f'chain_{n}')
+    x = 0
+    for i in range(n):
+        x = wg.add_task(ADD_ONE, name=f'add{i}', x=x).outputs.result
+    return wg
+
+
+def fanout(n: int) -> WorkGraph:
+    """One task whose result is used by ``n`` independent tasks."""
+    wg = WorkGraph(f'fanout_{n}')
+    source = wg.add_task(ADD_ONE, name='source', x=0)
+    for i in range(n):
+        wg.add_task(ADD_ONE, name=f'add{i}', x=source.outputs.result)
+    return wg
+
+
+def nested_zones(n: int) -> WorkGraph:
+    """``n`` zones nested in each other, with one task per zone that depends on the task of the outer zone."""
+    with WorkGraph(f'nested_zones_{n}') as wg:
+        x = 0
+        zones = []
+        for i in range(n):
+            zones.append(Zone())
+            zone = zones[-1].__enter__()
+            x = zone.add_task(ADD_ONE, name=f'add{i}', x=x).outputs.result
+        for zone in reversed(zones):
+            zone.__exit__(None, None, None)
+    return wg
+
+
+def while_loop(n: int) -> WorkGraph:
+    """A while zone that runs ``n`` iterations of one task."""
+    with WorkGraph(f'while_loop_{n}') as wg:
+        wg.ctx = {'n': 0}
+        condition = wg.add_task(SMALLER_THAN, name='condition', x=wg.ctx.n, y=n)
+        with While(condition.outputs.result, max_iterations=n + 1) as zone:
+            add = zone.add_task(ADD_ONE, name='add', x=wg.ctx.n)
+            wg.update_ctx({'n': add.outputs.result})
+    return wg
+
+
+def map_zone(n: int) -> WorkGraph:
+    """A map zone over ``n`` items, with one task per item."""
+    with WorkGraph(f'map_zone_{n}') as wg:
+        data = wg.add_task(GENERATE, name='generate', n=n).outputs.data
+        with Map(data) as zone:
+            add = zone.add_task(ADD_ONE, name='add', x=zone.item.value)
+            zone.gather({'result': add.outputs.result})
+    return wg
+
+
+# the graph generators by name, each takes the size of the graph
+GRAPHS: Dict[str, Callable[[int], WorkGraph]] = {
+    'chain': chain,
+    'fanout': fanout,
+    'nested_zones': nested_zones,
+    'while_loop': while_loop,
+    'map_zone': map_zone,
+}
@@ -56,6 +56,29 @@ SumGraph.run(1, 2)
 # Even though each sleeps for 5 seconds, they both complete around the same time (note the timestamps).
 # Since the ``multiply`` task depends on both, it waits for both to finish before executing (note the timestamps).
 
+# %%
+# Run coroutines in the loop of the engine
+# ----------------------------------------
+# By default, each ``async`` task is submitted as a ``PyFunction`` process, which goes through the broker
+# to a daemon worker like any other process. For short, I/O-bound coroutines this overhead can dominate.
+# Set ``inline_coroutines`` to run them as asyncio tasks in the event loop of the WorkGraph itself.
+# The ``PyFunction`` process is still created, so the provenance is the same.
+# ``max_inline_coroutines`` limits how many of them run at the same time (``0`` means no limit).
+#
+# .. code-block:: python
+#
+#     wg = WorkGraph('inline_coroutines')
+#     for i in range(10):
+#         wg.add_task(add_async, x=i, y=1, time=1)
+#     wg.inline_coroutines = True
+#     wg.max_inline_coroutines = 4
+#     wg.submit()
+#
+# .. note::
+#
+#     The in-loop processes only live in the memory of the daemon worker that runs the WorkGraph.
+#     If the worker is restarted, their tasks are marked as killed and launched again.
+
 
 # %%
 # Summary
@@ -80,6 +80,94 @@ wg.run()
 #     * **AiiDA-Scheduler** (experimental): For powerful, system-wide control over your AiiDA daemon, the `AiiDA-Scheduler <https://github.com/aiidateam/aiida-scheduler>`_ plugin is the recommended tool.
 #
 
+# %%
+# Concurrency pools
+# -----------------
+# ``max_number_jobs`` is a single limit for all child processes. When the tasks run on different resources,
+# you can add named concurrency pools instead. A pool selects tasks by computer label, task type or a ``tag``
+# set on the task, and every pool is respected independently:
+#
+# .. code-block:: python
+#
+#     wg.add_concurrency_pool('cluster', limit=50, computer='hpc')
+#     wg.add_concurrency_pool('workstation', limit=8, computer='localhost')
+#     wg.add_concurrency_pool('gpu', limit=2, tag='gpu')
+#     wg.tasks.train.tag = 'gpu'
+#
+# A task that matches several pools needs a free slot in each of them.
+# The computer is taken from the ``code`` or ``metadata.computer`` input of the task.
+
+# %%
+# Share the limit with nested workgraphs
+# --------------------------------------
+# Every graph task starts its own WorkGraph with its own ``max_number_jobs``, so 100 sub-graphs allowed
+# 50 jobs each can launch 5,000 jobs together. Set ``shared_job_budget`` to make ``max_number_jobs``
+# a budget for the whole process tree instead:
+#
+# .. code-block:: python
+#
+#     wg.max_number_jobs = 50
+#     wg.shared_job_budget = True
+#
+# When a child workgraph is launched, it gets a fair share of the free slots of its parent, and it passes
+# the budget down to its own children in the same way. The slots are returned to the parent when
+# the child workgraph finishes.
+
+# %%
+# Share a quota between all workgraphs
+# ------------------------------------
+# ``max_number_jobs`` and the concurrency pools only count the jobs of one workgraph. To limit the jobs
+# of all the workgraphs that run in the profile, e.g. to respect the queue limit of a cluster, define
+# a job quota in the database and let the workgraphs use it:
+#
+# .. code-block:: python
+#
+#     from aiida_workgraph.orm.quota import set_job_quota
+#
+#     set_job_quota('cluster', 200)
+#     wg.job_quota = 'cluster'
+#
+# or from the command line with ``verdi workgraph quota set cluster 200``.
+# Every job task (``CalcJob``, ``WorkChain``, ``PythonJob`` and ``ShellJob``) takes a slot of the quota before
+# it is launched and returns it when it finishes; nested workgraphs use the quota of their parent.
+# When the quota is full, the workgraph checks again every few seconds.
+# The slots of workgraphs that were killed or excepted are reclaimed automatically, you can also
+# inspect and clean them with ``verdi workgraph quota show cluster`` and ``verdi workgraph quota reclaim cluster``.
+
+# %%
+# Limit the submission rate
+# -------------------------
+# When a large fan-out becomes ready, all its jobs are submitted in one step, which floods the broker
+# and the daemon workers. ``max_submit_rate`` limits the number of processes submitted per second,
+# and ``submit_burst`` how many of them can be submitted at once:
+#
+# .. code-block:: python
+#
+#     wg.max_submit_rate = 5
+#     wg.submit_burst = 20
+#
+# The ready tasks that exceed the rate stay ready and are submitted in a later step.
+# The number of deferred tasks and the achieved rate are stored on the process node:
+#
+# .. code-block:: python
+#
+#     wg.process.submit_stats
+#     # {'queue_depth': 180, 'submitted': 40, 'submit_rate': 4.9, 'max_submit_rate': 5, 'submit_burst': 20}
+
+# %%
+# Which tasks get the free slots
+# ------------------------------
+# When more tasks are ready than there are free slots, the ready tasks are ordered before they are launched.
+# By default, a task with a longer chain of downstream tasks (its *critical path*) is launched first,
+# so that long dependency chains do not wait behind many short independent tasks.
+# Tasks on equally long paths keep the order in which they were added.
+# You can also set an explicit ``priority`` on a task; higher values are launched first:
+#
+# .. code-block:: python
+#
+#     wg.tasks.ArithmeticAddCalculation4.priority = 10
+#
+
 
 # sphinx_gallery_start_ignore
 set_aiida_loglevel('ERROR')
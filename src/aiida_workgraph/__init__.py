@@ -1,12 +1,17 @@
-from .workgraph import WorkGraph
-from .task import Task
-from .decorator import task
-from .tasks import TaskPool
-from .tasks.shelljob_task import shelljob
-from .manager import get_current_graph, If, Map, While, Zone
-from . import socket_spec as spec
-from .socket_spec import namespace, dynamic, select, meta
-from .collection import group
+import importlib.util
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .workgraph import WorkGraph
+    from .task import Task
+    from .decorator import task
+    from .tasks import TaskPool
+    from .tasks.shelljob_task import shelljob
+    from .manager import get_current_graph, If, Map, While, Zone
+    from . import socket_spec as spec
+    from .socket_spec import namespace, dynamic, select, meta
+    from .collection import group
 
 __version__ = '0.8.1'
 
@@ -28,3 +33,48 @@ __all__ = [
     'meta',
     'group',
 ]
+
+# The public API is imported on first access (PEP 562), so that importing the package, e.g. for the ``verdi``
+# commands, the ORM entry points or the version, does not import the whole of AiiDA, ``aiida_pythonjob`` and
+# ``aiida_shell``. Each name maps to the module that defines it, ``spec`` is the module itself.
+_LAZY_ATTRIBUTES = {
+    'WorkGraph': '.workgraph',
+    'Task': '.task',
+    'task': '.decorator',
+    'TaskPool': '.tasks',
+    'shelljob': '.tasks.shelljob_task',
+    'get_current_graph': '.manager',
+    'Zone': '.manager',
+    'If': '.manager',
+    'Map': '.manager',
+    'While': '.manager',
+    'spec': '.socket_spec',
+    'namespace': '.socket_spec',
+    'dynamic': '.socket_spec',
+    'select': '.socket_spec',
+    'meta': '.socket_spec',
+    'group': '.collection',
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+    value = module if name == 'spec' else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# The import system binds a submodule that is imported for the first time to the attribute of its package, so
+# ``import aiida_workgraph.task`` would shadow the ``task`` decorator with the module. A module that is already in
+# ``sys.modules`` is returned as it is, so the submodule is registered up front and only loaded on first access.
+_spec = importlib.util.find_spec(f'{__name__}.task')
+_spec.loader = importlib.util.LazyLoader(_spec.loader)
+sys.modules[_spec.name] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sys.modules[_spec.name])
+del _spec
@@ -0,0 +1,86 @@
+"""`verdi workgraph list` command."""
+
+import click
+
+from aiida_workgraph.cli.cmd_workgraph import workgraph
+from aiida.cmdline.utils import decorators, echo
+
+ACTIVE_PROCESS_STATES = ('created', 'waiting', 'running')
+
+
+@workgraph.command('list')
+@click.option('-a', '--all', 'all_entries', is_flag=True, help='Also list the terminated work graphs.')
+@click.option(
+    '-t',
+    '--task-state',
+    'task_states',
+    multiple=True,
+    help='Only list the work graphs with at least one task in this state, e.g. FAILED. Can be given multiple times.',
+)
+@click.option(
+    '-O',
+    '--order-by',
+    default='ctime',
+    show_default=True,
+    help='Order by `ctime`, by the time of the last task state change `updated`, or by the number of tasks in a '
+    'state, e.g. `FAILED`.',
+)
+@click.option('-D', '--order-dir', type=click.Choice(['asc', 'desc']), default=None, help='The order direction.')
+@click.option('-l', '--limit', type=click.IntRange(min=1), default=None, help='Limit the number of work graphs.')
+@decorators.with_dbenv()
+def workgraph_list(all_entries, task_states, order_by, order_dir, limit):
+    """List the work graphs, with the number of their tasks per state.
+
+    The numbers are read from the task summary maintained by the engine, with a single query.
+    """
+    from tabulate import tabulate
+
+    from aiida import orm
+    from aiida.common import timezone
+    from aiida.cmdline.utils.common import format_local_time
+    from aiida_workgraph.enums import TERMINAL_TASK_STATES
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    summary_key = f'attributes.{WorkGraphNode.TASK_SUMMARY_KEY}'
+    filters = {}
+    if not all_entries:
+        filters['attributes.process_state'] = {'in': ACTIVE_PROCESS_STATES}
+    if task_states:
+        filters['or'] = [{f'{summary_key}.counts.{state.upper()}': {'>': 0}} for state in task_states]
+    if order_by == 'ctime':
+        order = {'ctime': {'order': order_dir or 'asc'}}
+    elif order_by == 'updated':
+        order = {f'{summary_key}.updated_at': {'order': order_dir or 'desc', 'cast': 'f'}}
+    else:
+        order = {f'{summary_key}.counts.{order_by.upper()}': {'order': order_dir or 'desc', 'cast': 'i'}}
+
+    qb = orm.QueryBuilder().append(
+        WorkGraphNode,
+        filters=filters,
+        project=['id', 'ctime', 'attributes.process_label', 'attributes.process_state', summary_key],
+    )
+    qb.order_by({WorkGraphNode: [order]})
+    if limit:
+        qb.limit(limit)
+
+    rows = []
+    for pk, ctime, label, process_state, summary in qb.iterall():
+        summary = summary or {}
+        counts = summary.get('counts', {})
+        total = summary.get('total', 0)
+        done = sum(count for state, count in counts.items() if state in TERMINAL_TASK_STATES)
+        updated = summary.get('updated_at')
+        rows.append(
+            [
+                pk,
+                format_local_time(ctime),
+                label,
+                (process_state or '').capitalize(),
+                f'{done}/{total}' if summary else '',
+                ', '.join(f'{state}: {count}' for state, count in sorted(counts.items())),
+                format_local_time(timezone.datetime.fromtimestamp(updated)) if updated else '',
+            ]
+        )
+    headers = ['PK', 'Created', 'Label', 'State', 'Done', 'Tasks', 'Updated']
+    echo.echo(tabulate(rows, headers=headers))
+    echo.echo(f'\nTotal results: {len(rows)}')
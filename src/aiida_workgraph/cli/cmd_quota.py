@@ -0,0 +1,55 @@
+"""`verdi workgraph quota` command."""
+
+import click
+
+from aiida_workgraph.cli.cmd_workgraph import workgraph
+from aiida.cmdline.utils import decorators, echo
+
+
+@workgraph.group('quota')
+def workgraph_quota():
+    """Manage the job quotas that are shared by all the work graphs of the profile."""
+
+
+@workgraph_quota.command('set')
+@click.argument('name')
+@click.argument('limit', type=click.IntRange(min=0))
+@decorators.with_dbenv()
+def quota_set(name, limit):
+    """Create or update the job quota NAME with at most LIMIT running jobs."""
+    from aiida_workgraph.orm.quota import set_job_quota
+
+    try:
+        set_job_quota(name, limit)
+    except ValueError as exception:
+        echo.echo_critical(str(exception))
+    echo.echo_success(f'Set the limit of job quota {name} to {limit}.')
+
+
+@workgraph_quota.command('show')
+@click.argument('name')
+@decorators.with_dbenv()
+def quota_show(name):
+    """Show the limit and the slots in use of the job quota NAME."""
+    from tabulate import tabulate
+
+    from aiida_workgraph.orm.quota import get_job_quota_limit, get_job_slots
+
+    limit = get_job_quota_limit(name)
+    if limit is None:
+        echo.echo_critical(f'The job quota {name} is not defined.')
+    slots = get_job_slots(name)
+    echo.echo(f'Job quota {name}: {len(slots)}/{limit} slots in use.')
+    if slots:
+        rows = [[slot['label'], slot.get('workgraph'), slot.get('task'), slot.get('process')] for slot in slots]
+        echo.echo(tabulate(rows, headers=['Slot', 'WorkGraph', 'Task', 'Process']))
+
+
+@workgraph_quota.command('reclaim')
+@click.argument('name')
+@decorators.with_dbenv()
+def quota_reclaim(name):
+    """Release the slots of the job quota NAME that are held by terminated processes."""
+    from aiida_workgraph.orm.quota import reclaim_stale_job_slots
+
+    echo.echo_success(f'Reclaimed {reclaim_stale_job_slots(name)} stale slots of job quota {name}.')
@@ -22,14 +22,173 @@ def workgraph_task():
 
 @workgraph_task.command('list')
 @arguments.PROCESS()
+@click.option(
+    '-S',
+    '--state',
+    'states',
+    multiple=True,
+    help='Only list the tasks in this state, e.g. RUNNING. Can be given multiple times.',
+)
+@click.option('--json', 'as_json', is_flag=True, help='Print the tasks as JSON.')
+@click.option(
+    '-w', '--watch', is_flag=True, help='Print the state changes of the tasks until the workgraph terminates.'
+)
+@click.option('--interval', type=click.FloatRange(min=0.1), default=5.0, show_default=True, help='Polling interval.')
 @options.TIMEOUT()
 @decorators.with_dbenv()
-def task_show(process, timeout):
-    """List the tasks for one or multiple work graphs."""
-    from aiida_workgraph import WorkGraph
+def task_show(process, states, as_json, watch, interval, timeout):
+    """List the tasks of a work graph.
+
+    Only the runtime attributes of the work graph are read, so the command is fast also for very large graphs.
+    """
+    import json
+
+    from tabulate import tabulate
+
+    from aiida_workgraph.utils.control import list_task_states
+
+    states = {state.upper() for state in states}
+    info = list_task_states(process.pk)
+    if info is None:
+        echo.echo_critical(f'Process<{process.pk}> is not a WorkGraph.')
+    tasks = [task for task in info['tasks'] if not states or task['state'].upper() in states]
+
+    if as_json:
+        echo.echo(json.dumps({**info, 'tasks': tasks}, indent=2))
+    else:
+        echo.echo('-' * 80)
+        echo.echo('WorkGraph: {}, PK: {}, State: {}'.format(info['label'], info['pk'], info['state']))
+        echo.echo('-' * 80)
+        echo.echo('Tasks:')
+        echo.echo(
+            tabulate([[task['name'], task['pk'], task['state']] for task in tasks], headers=['Name', 'PK', 'State'])
+        )
+        echo.echo('-' * 80)
+    if watch:
+        _watch_task_states(
+            process.pk, {task['name']: task['state'] for task in info['tasks']}, states, as_json, interval
+        )
+
+
+def _watch_task_states(pk, known_states, states, as_json, interval):
+    """Print the task state changes until the workgraph terminates."""
+    import datetime
+    import json
+
+    from aiida_workgraph.utils.control import TaskStateWatcher
+
+    with TaskStateWatcher(pk, known_states) as watcher:
+        while True:
+            for change in watcher.poll():
+                if states and change.new_state.upper() not in states:
+                    continue
+                if as_json:
+                    echo.echo(json.dumps(change._asdict()))
+                else:
+                    timestamp = datetime.datetime.fromtimestamp(change.timestamp).strftime('%H:%M:%S')
+                    echo.echo(f'{timestamp} {change.task_name}: {change.old_state} -> {change.new_state}')
+            if watcher.terminated:
+                return
+            watcher.wait(interval)
+
+
+@workgraph_task.command('timings')
+@arguments.PROCESS()
+@click.option('--json', 'as_json', is_flag=True, help='Print the timings as JSON.')
+@decorators.with_dbenv()
+def task_timings(process, as_json):
+    """Show the timings of the tasks of a work graph.
+
+    Per task: the time waiting for a slot, launching, running and until the engine applied its state.
+    """
+    import json
+
+    import numpy as np
+    from tabulate import tabulate
+
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+    from aiida_workgraph.utils import get_task_timings
+
+    if not isinstance(process, WorkGraphNode):
+        echo.echo_critical(f'Process<{process.pk}> is not a WorkGraph.')
+    timings = get_task_timings(process.task_timings)
+    fields = ['wait', 'launch', 'run', 'react']
+    if as_json:
+        data = {row['task']: {name: _to_json(row[name]) for name in timings.dtype.names[1:]} for row in timings}
+        echo.echo(json.dumps(data, indent=2))
+        return
+    timings = np.sort(timings, order='ready')
+    rows = [[row['task']] + [_format_seconds(row[field]) for field in fields] for row in timings]
+    rows.append(['Total'] + [_format_seconds(np.nansum(timings[field])) for field in fields])
+    echo.echo(tabulate(rows, headers=['Task', 'Wait', 'Launch', 'Run', 'React']))
+
+
+def _to_json(value):
+    return None if value != value else float(value)
 
-    wg = WorkGraph.load(process.pk)
-    wg.show()
+
+def _format_seconds(value):
+    return '' if value != value else f'{value:.3f}s'
+
+
+@workgraph_task.command('trace')
+@arguments.PROCESS()
+@click.argument('output', type=click.Path(dir_okay=False, writable=True), default='trace.json')
+@decorators.with_dbenv()
+def task_trace(process, output):
+    """Export the task timings and engine steps of a work graph as a Chrome trace.
+
+    The OUTPUT file, by default trace.json, can be opened in chrome://tracing or https://ui.perfetto.dev.
+    The nested work graphs are included.
+    """
+    from aiida_workgraph import WorkGraph
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    if not isinstance(process, WorkGraphNode):
+        echo.echo_critical(f'Process<{process.pk}> is not a WorkGraph.')
+    WorkGraph.load(process).export_trace(output)
+    echo.echo_success(f'Trace of Process<{process.pk}> written to {output}.')
+
+
+@workgraph_task.command('stats')
+@click.argument('keys', nargs=-1)
+@click.option(
+    '--by',
+    type=click.Choice(['name', 'process_label']),
+    default='name',
+    show_default=True,
+    help='Group the runtimes by the task name or by the process label.',
+)
+@click.option('--no-cache', is_flag=True, help='Query all work graphs, instead of updating the cached statistics.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the statistics as JSON.')
+@decorators.with_dbenv()
+def task_stats(keys, by, no_cache, as_json):
+    """Show the runtime statistics of the tasks of all finished work graphs.
+
+    The runtime of a task is the time from the creation to the last modification of the process it launched, only
+    the processes that finished with exit status 0 are counted. Give KEYS to only show these task names or labels.
+    """
+    import json
+
+    from tabulate import tabulate
+
+    from aiida_workgraph.utils.runtime_stats import STATISTICS, get_runtime_stats
+
+    summary = get_runtime_stats(by=by, cache=not no_cache).summary()
+    if keys:
+        summary = summary[[str(key) in keys for key in summary['key']]]
+    if as_json:
+        data = {
+            str(row['key']): {'count': int(row['count']), **{name: float(row[name]) for name in STATISTICS[1:]}}
+            for row in summary
+        }
+        echo.echo(json.dumps(data, indent=2))
+        return
+    rows = [
+        [row['key'], int(row['count'])] + [_format_seconds(row[name]) for name in STATISTICS[1:]] for row in summary
+    ]
+    headers = ['Task' if by == 'name' else 'Process label', 'Count', 'Mean', 'Std', 'Min', 'Median', 'P90', 'Max']
+    echo.echo(tabulate(rows, headers=headers))
 
 
 @workgraph_task.command('pause')
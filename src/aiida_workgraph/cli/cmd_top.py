@@ -0,0 +1,81 @@
+"""`verdi workgraph top` command."""
+
+import time
+
+import click
+
+from aiida_workgraph.cli.cmd_workgraph import workgraph
+from aiida.cmdline.utils import decorators, echo
+
+HEADERS = ['PK', 'Label', 'State', 'Running', 'Ready', 'Waiting', 'Fin/min', 'Latency', 'Step', 'Done', 'Age']
+
+
+@workgraph.command('top')
+@click.option('-n', '--interval', type=click.FloatRange(min=0.5), default=2.0, show_default=True, help='Refresh rate.')
+@click.option('-l', '--limit', type=click.IntRange(min=1), default=50, show_default=True, help='Maximum rows.')
+@click.option('--once', is_flag=True, help='Print the table once, instead of refreshing the screen.')
+@decorators.with_dbenv()
+def workgraph_top(interval, limit, once):
+    """Live dashboard of the running work graphs.
+
+    Per work graph: the running, ready and waiting tasks, the tasks finished per minute, the mean submission
+    latency and step time of the engine, and the number of finished tasks. The numbers are read from the
+    metrics and the task summary that the engines store, with one query per refresh. Press Ctrl+C to quit.
+    """
+    while True:
+        table = _get_top_table(limit)
+        if once:
+            echo.echo(table)
+            return
+        click.clear()
+        echo.echo(f'verdi workgraph top - {time.strftime("%H:%M:%S")}, every {interval}s\n')
+        echo.echo(table)
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            return
+
+
+def _get_top_table(limit: int) -> str:
+    from tabulate import tabulate
+
+    from aiida import orm
+    from aiida_workgraph.enums import TERMINAL_TASK_STATES
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    qb = orm.QueryBuilder().append(
+        WorkGraphNode,
+        filters={'attributes.process_state': {'in': ['created', 'waiting', 'running']}},
+        project=[
+            'id',
+            'attributes.process_label',
+            'attributes.process_state',
+            f'attributes.{WorkGraphNode.TASK_SUMMARY_KEY}',
+            f'attributes.{WorkGraphNode.ENGINE_METRICS_KEY}',
+        ],
+    )
+    qb.order_by({WorkGraphNode: {'ctime': 'desc'}})
+    qb.limit(limit)
+    now = time.time()
+    rows = []
+    for pk, label, state, summary, metrics in qb.iterall():
+        summary, metrics = summary or {}, metrics or {}
+        counts = summary.get('counts', {})
+        done = sum(count for task_state, count in counts.items() if task_state in TERMINAL_TASK_STATES)
+        updated = metrics.get('updated_at')
+        rows.append(
+            [
+                pk,
+                label,
+                (state or '').capitalize(),
+                metrics.get('running', ''),
+                metrics.get('ready', ''),
+                metrics.get('waiting', ''),
+                metrics.get('finished_per_minute', ''),
+                f'{metrics["submit_latency"]:.2f}s' if 'submit_latency' in metrics else '',
+                f'{metrics["step_time"] * 1000:.0f}ms' if 'step_time' in metrics else '',
+                f'{done}/{summary.get("total", 0)}' if summary else '',
+                f'{now - updated:.0f}s' if updated else '',
+            ]
+        )
+    return tabulate(rows, headers=HEADERS)
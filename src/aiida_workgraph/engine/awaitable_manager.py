@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import functools
 from aiida.orm import ProcessNode
 from aiida.engine.processes.workchains.awaitable import (
@@ -10,9 +11,12 @@ from aiida.engine.processes.workchains.awaitable import (
 )
 from aiida.orm import load_node
 from aiida.common import exceptions
-from typing import Any, List
+from typing import Any, List, TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    from aiida.engine import Process
+
 
 class AwaitableManager:
     """Handles awaitable objects and their resolutions."""
@@ -29,6 +33,9 @@ class AwaitableManager:
         # but don't worry, because we re-register them when loading the process
         self.not_persisted_awaitables = {}
         self.ctx._awaitable_actions = []
+        # keys of the awaitables whose process runs as an asyncio task in the loop of the engine
+        self.ctx.setdefault('_inline_awaitables', [])
+        self._inline_semaphore = None
 
     def insert_awaitable(self, awaitable: Awaitable) -> None:
         """Insert an awaitable that should be terminated before before continuing to the next step.
@@ -88,10 +95,14 @@ class AwaitableManager:
         function will be bound with the awaitable and the runner will be asked to
         call it when the target is completed
         """
-        for awaitable in self._awaitables:
+        for awaitable in list(self._awaitables):
             # if the waitable already has a callback, skip
             if awaitable.pk in self.ctx._awaitable_actions:
                 continue
+            if awaitable.key in self.ctx._inline_awaitables:
+                # the asyncio task was lost, e.g. the daemon worker was restarted
+                self.on_inline_awaitable_lost(awaitable)
+                continue
             if awaitable.target == AwaitableTarget.PROCESS:
                 callback = functools.partial(self.process.call_soon, self.on_awaitable_finished, awaitable)
                 self.runner.call_on_process_finish(awaitable.pk, callback)
@@ -122,10 +133,16 @@ class AwaitableManager:
             value = node  # type: ignore
 
         self.resolve_awaitable(awaitable, value)
+        # the job finished, so its slot of the job quota can be used by another job
+        self.process.task_manager.release_job_slot(awaitable.key)
 
         # node finished, update the task state and result
         # udpate the task state
         self.process.task_manager.state_manager.update_task_state(awaitable.key)
+        self.resume_process()
+
+    def resume_process(self) -> None:
+        """Resume the workgraph after an awaitable was resolved."""
         # try to resume the workgraph, if the workgraph is already resumed
         # by other awaitable, this will not work
         try:
@@ -133,6 +150,82 @@ class AwaitableManager:
         except Exception as e:
             self.logger.exception('Failed to resume process after awaitable completion: %s', e)
 
+    @property
+    def inline_semaphore(self) -> asyncio.Semaphore | None:
+        """Semaphore that limits the number of coroutines running in the loop of the engine."""
+        max_inline_coroutines = self.process.wg.max_inline_coroutines
+        if self._inline_semaphore is None and max_inline_coroutines:
+            self._inline_semaphore = asyncio.Semaphore(max_inline_coroutines)
+        return self._inline_semaphore
+
+    def run_in_loop(self, key: str, process: Process) -> None:
+        """Step the process as an asyncio task in the loop of the engine, and await it.
+
+        The process is not sent to the broker, the awaitable is resolved by the done
+        callback of the asyncio task.
+        """
+
+        async def step_until_terminated():
+            semaphore = self.inline_semaphore
+            if semaphore is None:
+                await process.step_until_terminated()
+            else:
+                async with semaphore:
+                    await process.step_until_terminated()
+
+        self.to_context(**{key: process.node})
+        self.ctx._awaitable_actions.append(process.node.pk)
+        self.ctx._inline_awaitables.append(key)
+        future = self.runner.loop.create_task(step_until_terminated(), name=key)
+        self.not_persisted_awaitables[key] = process
+        future.add_done_callback(functools.partial(self.on_inline_task_done, key))
+
+    def on_inline_task_done(self, key: str, future: asyncio.Future) -> None:
+        """Done callback of the asyncio task of an in-loop process.
+
+        If the asyncio task was cancelled, the process did not terminate, so it is marked as killed, and the task fails.
+        """
+        from aiida.engine import ProcessState
+
+        process = self.not_persisted_awaitables.pop(key, None)
+        if key in self.ctx._inline_awaitables:
+            self.ctx._inline_awaitables.remove(key)
+        if future.cancelled():
+            self.logger.error(f'The in-loop process of task {key} was cancelled.')
+            if process is not None and not process.node.is_terminated:
+                process.node.set_process_state(ProcessState.KILLED)
+                process.node.set_process_status('The in-loop process was cancelled.')
+        elif future.exception() is not None:
+            self.logger.error(f'The in-loop process of task {key} raised: {future.exception()}')
+        for awaitable in self._awaitables:
+            if awaitable.key == key:
+                self.process.call_soon(self.on_awaitable_finished, awaitable)
+                break
+
+    def on_inline_awaitable_lost(self, awaitable: Awaitable) -> None:
+        """Reset the task of an in-loop process that can not be continued.
+
+        The process was only alive in the memory of the previous runner, so it is
+        marked as killed and the task is launched again.
+        """
+        from aiida.engine import ProcessState
+
+        node = load_node(awaitable.pk)
+        if not node.is_terminated:
+            node.set_process_state(ProcessState.KILLED)
+            node.set_process_status('The in-loop process was lost when the WorkGraph was stopped.')
+        self.ctx._inline_awaitables.remove(awaitable.key)
+        self._awaitables[:] = [a for a in self._awaitables if a.pk != awaitable.pk]
+        self.process.report(f'Task {awaitable.key} was running in the loop of a stopped runner, reset it.')
+        self.process.task_manager.state_manager.reset_task(awaitable.key, recursive=False)
+        self.process.call_soon(self.resume_process)
+
+    def kill_inline_processes(self, msg_text: str | None = None) -> None:
+        """Kill the processes that are still running in the loop of the engine."""
+        for process in list(self.not_persisted_awaitables.values()):
+            if not process.has_terminated():
+                process.kill(msg_text)
+
     def to_context(self, **kwargs: Awaitable | ProcessNode) -> None:
         """Add a dictionary of awaitables to the context.
 
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import collections
+import logging
+import time
+from typing import List, NamedTuple, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# the subject of the broadcasts with the task state changes of a workgraph, the sender is the pk of the workgraph
+TASK_STATE_CHANGED_SUBJECT = 'workgraph.task_state_changed'
+
+
+class TaskStateChange(NamedTuple):
+    """A change of the state of a task."""
+
+    task_name: str
+    old_state: Optional[str]
+    new_state: str
+    timestamp: float
+
+
+class TaskStateFeed:
+    """Collect the task state changes of the engine, and broadcast them once per step.
+
+    The changes are also applied to the ``task_summary`` of the node, i.e. the number of tasks per state,
+    in the transaction of the step, see :meth:`update_summary`.
+
+    The changes are broadcast after the step is committed, so a client that reads the task states after
+    receiving them sees the new states. Without a communicator, e.g. when the profile has no broker, the changes
+    are dropped and the clients fall back to reading the task states from the database.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.changes: List[TaskStateChange] = []
+        self.unsummarized: List[TaskStateChange] = []
+
+    def add(self, task_name: str, old_state: Optional[str], new_state: str) -> None:
+        if old_state != new_state:
+            # plain strings, the states can be ``TaskState`` members
+            change = TaskStateChange(task_name, str(old_state) if old_state else None, str(new_state), time.time())
+            self.changes.append(change)
+            self.unsummarized.append(change)
+
+    def update_summary(self) -> None:
+        """Apply the changes to the number of tasks per state stored in the ``task_summary`` of the node."""
+        from aiida_workgraph.orm.workgraph import summarize_task_states
+        from node_graph.config import BUILTIN_TASKS
+
+        if not self.unsummarized:
+            return
+        changes, self.unsummarized = self.unsummarized, []
+        node = self.process.node
+        summary = node.task_summary
+        if summary is None:
+            # a workgraph saved before the summary was introduced, the stored states already include the changes
+            node.task_summary = summarize_task_states(node.task_states, exclude=BUILTIN_TASKS)
+            return
+        counts = collections.Counter(summary.get('counts', {}))
+        for change in changes:
+            if change.task_name in BUILTIN_TASKS:
+                continue
+            if change.old_state:
+                counts[change.old_state] -= 1
+            counts[change.new_state] += 1
+        counts = {state: count for state, count in counts.items() if count > 0}
+        node.task_summary = {'counts': counts, 'total': sum(counts.values()), 'updated_at': time.time()}
+
+    def flush(self) -> None:
+        if not self.changes:
+            return
+        changes, self.changes = self.changes, []
+        communicator = self.process.runner.communicator if self.process.runner else None
+        if communicator is None:
+            return
+        try:
+            communicator.broadcast_send(
+                body={'changes': [list(change) for change in changes]},
+                sender=self.process.node.pk,
+                subject=TASK_STATE_CHANGED_SUBJECT,
+            )
+        except Exception as exception:  # pylint: disable=broad-except
+            LOGGER.debug('Failed to broadcast the task state changes: %s', exception)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import collections
+import time
+from typing import Dict, Iterable, List, Optional
+
+from aiida_workgraph.enums import TaskState
+
+# the metrics are written to the node at most once per this number of seconds
+METRICS_INTERVAL = 1.0
+# the number of recent steps and launches that are averaged
+METRICS_WINDOW = 100
+# the number of steps whose start and duration are kept in the ``engine_steps`` attribute of the node
+MAX_RECORDED_STEPS = 10000
+# the recorded steps are written to the node at most once per this number of seconds, and when the engine terminates
+ENGINE_STEPS_INTERVAL = 600.0
+
+
+class EngineMetrics:
+    """Throughput and latency metrics of the engine, stored in the ``engine_metrics`` attribute of the node.
+
+    - ``running``: the number of running processes of the tasks.
+    - ``ready``: the number of tasks that were ready to run in the last step.
+    - ``waiting``: the ready tasks that could not be launched, e.g. because no job slot was free.
+    - ``finished_per_minute``: the number of tasks that finished in the last minute.
+    - ``submit_latency``: the mean time, in seconds, from a task becoming ready to its launch.
+    - ``step_time``: the mean duration of a step, in seconds.
+
+    The ``[start, duration]`` of the last ``MAX_RECORDED_STEPS`` steps are kept in memory, and stored in the
+    ``engine_steps`` attribute every ``ENGINE_STEPS_INTERVAL`` seconds and when the engine terminates.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.steps = 0
+        self.ready = 0
+        self._ready_since: Dict[str, float] = {}
+        self._finished = collections.deque()
+        self._latencies = collections.deque(maxlen=METRICS_WINDOW)
+        self._step_times = collections.deque(maxlen=METRICS_WINDOW)
+        # the steps of a reloaded process continue the recorded ones
+        self._step_spans = collections.deque(process.node.engine_steps or [], maxlen=MAX_RECORDED_STEPS)
+        self._unwritten_steps = 0
+        self._written = 0.0
+        self._steps_written = time.time()
+
+    def tasks_ready(self, names: List[str]) -> None:
+        """Record the tasks that are ready to run, the tasks that are no longer ready are forgotten."""
+        now = time.time()
+        self._ready_since = {name: self._ready_since.get(name, now) for name in names}
+        self.ready = len(names)
+
+    def task_launched(self, name: str) -> float:
+        """Record the launch of a task, and return the time at which it became ready."""
+        now = time.time()
+        since = self._ready_since.pop(name, None)
+        if since is None:
+            return now
+        self._latencies.append(now - since)
+        return since
+
+    def step_finished(self, duration: float, changes: Iterable) -> None:
+        """Record a step and the task state changes since the previous step, and write the metrics if due."""
+        self.steps += 1
+        self._step_times.append(duration)
+        self._step_spans.append([round(time.time() - duration, 6), round(duration, 6)])
+        self._unwritten_steps += 1
+        for change in changes:
+            if change.new_state == TaskState.FINISHED:
+                self._finished.append(change.timestamp)
+        if time.time() - self._written >= METRICS_INTERVAL:
+            self.write()
+
+    def write(self, final: bool = False) -> None:
+        """Write the metrics, and the recorded steps if they are due or if the engine terminates."""
+        now = time.time()
+        while self._finished and self._finished[0] < now - 60:
+            self._finished.popleft()
+        self.process.node.engine_metrics = {
+            'running': len(self.process._awaitables),
+            'ready': self.ready,
+            'waiting': len(self._ready_since),
+            'finished_per_minute': len(self._finished),
+            'submit_latency': _mean(self._latencies),
+            'step_time': _mean(self._step_times),
+            'steps': self.steps,
+            'updated_at': now,
+        }
+        if self._unwritten_steps and (final or now - self._steps_written >= ENGINE_STEPS_INTERVAL):
+            self.process.node.engine_steps = list(self._step_spans)
+            self._unwritten_steps = 0
+            self._steps_written = now
+        self._written = now
+
+
+def _mean(values) -> float:
+    return round(sum(values) / len(values), 6) if values else 0.0
+
+
+# the timestamps recorded for every task, in this order
+TIMING_FIELDS = ('ready', 'started', 'launched', 'finished', 'applied')
+# the phases of a task, as ``(phase, start, end)`` fields of its timings
+TIMING_PHASES = (
+    ('wait', 'ready', 'started'),
+    ('launch', 'started', 'launched'),
+    ('run', 'launched', 'finished'),
+    ('react', 'finished', 'applied'),
+)
+
+
+class TaskTimings:
+    """Record the timestamps of the tasks, stored per task in the ``task_timings:<name>`` attributes of the node.
+
+    For every task the list ``[ready, started, launched, finished, applied]`` of UNIX timestamps is stored:
+
+    - ``ready``: the task was found ready to run.
+    - ``started``: the engine started to launch the task, i.e. it got a slot.
+    - ``launched``: the inputs were prepared and the process was submitted, or the task was executed.
+    - ``finished``: the process of the task terminated.
+    - ``applied``: the engine applied the final state of the task.
+
+    The timestamps are collected during a step and written to the node together.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.pending: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, **timestamps: float) -> None:
+        self.pending.setdefault(name, {}).update(timestamps)
+
+    def launched(self, name: str) -> None:
+        # a task that runs in the engine may be finished already
+        timestamps = self.pending.setdefault(name, {})
+        timestamps['launched'] = timestamps.get('finished', time.time())
+
+    def applied(self, name: str, finished: Optional[float] = None) -> None:
+        """Record that the final state of a task was applied, ``finished`` is the end of its process."""
+        now = time.time()
+        timestamps = self.pending.setdefault(name, {})
+        timestamps['finished'] = finished or timestamps.get('finished', now)
+        timestamps['applied'] = now
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        node = self.process.node
+        rows = {}
+        for name, timestamps in pending.items():
+            # a task that is ready again, e.g. in a while loop, starts a new row
+            row = node.get_task_timing(name) if 'ready' not in timestamps else None
+            row = list(row or [None] * len(TIMING_FIELDS))
+            for field, value in timestamps.items():
+                row[TIMING_FIELDS.index(field)] = round(value, 3)
+            rows[name] = row
+        # only the rows of the changed tasks are written
+        node.set_task_timings(rows)
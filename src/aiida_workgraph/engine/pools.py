@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+POOL_SELECTORS = ('computer', 'task_type', 'tag')
+
+
+def get_input_value(task, name: str) -> Any:
+    """Return the value of an input socket, or ``None`` if the task has no such input."""
+    try:
+        return task.inputs[name].value
+    except (AttributeError, KeyError):
+        return None
+
+
+def get_task_computer_label(task) -> Optional[str]:
+    """Return the label of the computer a task will run on, if it is known before the task is launched.
+
+    The computer is taken from the ``code`` input, the ``metadata.computer`` input or the ``computer``
+    input (e.g. of a ``PythonJob``), in this order.
+    """
+    from aiida.orm import AbstractCode, Computer
+
+    code = get_input_value(task, 'code')
+    if isinstance(code, AbstractCode) and code.computer is not None:
+        return code.computer.label
+    for name in ('metadata.computer', 'computer'):
+        computer = get_input_value(task, name)
+        if isinstance(computer, Computer):
+            return computer.label
+        if isinstance(computer, str):
+            return computer
+        if computer is not None and hasattr(computer, 'value'):
+            return computer.value
+    return None
+
+
+def task_matches_pool(task, pool: Dict[str, Any]) -> bool:
+    """Check if a task matches all the selectors of a concurrency pool."""
+    for selector in POOL_SELECTORS:
+        if selector not in pool:
+            continue
+        if selector == 'computer':
+            value = get_task_computer_label(task)
+        elif selector == 'task_type':
+            value = task.task_type.upper()
+        else:
+            value = task.tag
+        if value != pool[selector]:
+            return False
+    return True
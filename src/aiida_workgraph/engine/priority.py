@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+
+def critical_path_lengths(
+    output_node: Dict[str, List[str]], weights: Optional[Dict[str, float]] = None
+) -> Dict[str, float]:
+    """Compute the length of the longest path from each task to the end of the graph.
+
+    :param output_node: the direct children of each task, as in ``connectivity['output_node']``.
+    :param weights: optional cost of each task, a task without weight costs 1.
+    :return: for each task, the summed weight of the heaviest downstream path, including the task itself.
+    """
+    weights = weights or {}
+    lengths: Dict[str, float] = {}
+    for root in output_node:
+        if root in lengths:
+            continue
+        # iterative post-order traversal, so that long chains do not hit the recursion limit
+        stack = [(root, False)]
+        visiting = set()
+        while stack:
+            name, expanded = stack.pop()
+            if name in lengths:
+                continue
+            children = output_node.get(name, [])
+            if expanded:
+                longest = max((lengths.get(child, 0) for child in children), default=0)
+                lengths[name] = weights.get(name, 1) + longest
+                visiting.discard(name)
+            elif name not in visiting:
+                visiting.add(name)
+                stack.append((name, True))
+                stack.extend((child, False) for child in children if child not in lengths)
+    return lengths
+
+
+def sort_tasks_by_priority(names: Iterable[str], tasks, critical_path: Dict[str, float]) -> List[str]:
+    """Sort the ready tasks, the task that should be launched first comes first.
+
+    Tasks are ordered by their explicit ``priority`` and then by the length of their critical path.
+    Tasks with the same key keep their original order. A mapped task uses the critical path of the
+    task it was copied from.
+    """
+
+    def key(name: str):
+        task = tasks[name]
+        reference = task.map_data['parent'] if task.map_data else name
+        return (task.priority or 0, critical_path.get(reference, 0))
+
+    return sorted(names, key=key, reverse=True)
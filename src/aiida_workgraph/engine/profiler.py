@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# enable the profiler for all workgraphs: '1' stores the profile in the extras, a directory also writes it there
+PROFILE_ENV_VAR = 'AIIDA_WORKGRAPH_PROFILE'
+# the extra of the workgraph node in which the profile is stored
+PROFILE_EXTRA_KEY = 'workgraph_profile'
+# the methods that are timed, per attribute of the engine, ``None`` is the engine itself
+PROFILED_METHODS = {
+    None: ('_do_step', 'save_instance_state', 'finalize'),
+    'task_manager': (
+        'continue_workgraph',
+        'run_tasks',
+        'should_run_task',
+        'get_inputs',
+        'execute_process_task',
+        'execute_function_task',
+        'execute_normal_task',
+    ),
+    'awaitable_manager': ('on_awaitable_finished',),
+    'task_manager.state_manager': (
+        'update_task_state',
+        'update_normal_task_state',
+        'is_task_ready_to_run',
+        'flush_socket_spec_extras',
+    ),
+    'report_buffer': ('flush',),
+    'task_state_feed': ('update_summary', 'flush'),
+    'timings': ('flush',),
+    'metrics': ('write',),
+}
+
+
+def get_profiling(wg_profiling: Any) -> Any:
+    """Return the profiling setting of a workgraph, the environment variable enables it for all workgraphs."""
+    if wg_profiling:
+        return wg_profiling
+    value = os.environ.get(PROFILE_ENV_VAR, '')
+    if value.lower() in ('', '0', 'false', 'no'):
+        return False
+    return True if value.lower() in ('1', 'true', 'yes') else value
+
+
+class EngineProfiler:
+    """Time the phases of the engine and count the SQL statements that each phase issues.
+
+    The methods in ``PROFILED_METHODS`` of the engine and its managers are wrapped on the instances, so the engine
+    runs unchanged when profiling is disabled. The time and the statements of a nested phase are excluded from the
+    ``self`` time and ``self_statements`` of its caller, and included in its ``total`` and ``statements``.
+
+    The profile is stored in the ``workgraph_profile`` extra of the node when the process terminates, see
+    :meth:`dump`, and written to ``workgraph_<pk>_profile.json`` if a directory is given.
+    """
+
+    def __init__(self, process, directory: Optional[str] = None):
+        self.process = process
+        self.directory = directory
+        self.stats: Dict[str, List[float]] = {}
+        self._stack: List[List[Any]] = []
+        self._thread = threading.get_ident()
+        self._engine = None
+        self._started = time.perf_counter()
+
+    def install(self) -> None:
+        """Wrap the profiled methods of the engine and start counting the SQL statements."""
+        from aiida.manage import get_manager
+        from sqlalchemy import event
+
+        for path, methods in PROFILED_METHODS.items():
+            obj = self.process
+            for attribute in path.split('.') if path else []:
+                obj = getattr(obj, attribute)
+            for method in methods:
+                name = f'{type(obj).__name__}.{method}'
+                setattr(obj, method, self.wrap(name, getattr(obj, method)))
+        storage = get_manager().get_profile_storage()
+        if hasattr(storage, 'get_session'):
+            self._engine = storage.get_session().bind
+            event.listen(self._engine, 'before_cursor_execute', self._on_statement)
+
+    def uninstall(self) -> None:
+        from sqlalchemy import event
+
+        if self._engine is not None:
+            event.remove(self._engine, 'before_cursor_execute', self._on_statement)
+            self._engine = None
+
+    def wrap(self, name: str, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self._stack.append([name, time.perf_counter(), 0.0, 0, 0])
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._pop()
+
+        return wrapper
+
+    def _pop(self) -> None:
+        name, start, child_time, statements, child_statements = self._stack.pop()
+        duration = time.perf_counter() - start
+        # calls, total, self, statements, self_statements
+        stats = self.stats.setdefault(name, [0, 0.0, 0.0, 0, 0])
+        # a recursive call is only counted once in the total of the outermost call
+        recursive = any(frame[0] == name for frame in self._stack)
+        stats[0] += 1
+        stats[1] += 0.0 if recursive else duration
+        stats[2] += duration - child_time
+        stats[3] += 0 if recursive else statements + child_statements
+        stats[4] += statements
+        if self._stack:
+            self._stack[-1][2] += duration
+            self._stack[-1][4] += statements + child_statements
+
+    def _on_statement(self, *args, **kwargs) -> None:
+        if self._stack and threading.get_ident() == self._thread:
+            self._stack[-1][3] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the profile, with the phases sorted by their ``self`` time."""
+        phases = {
+            name: {
+                'calls': calls,
+                'total': round(total, 6),
+                'self': round(self_time, 6),
+                'statements': statements,
+                'self_statements': self_statements,
+            }
+            for name, (calls, total, self_time, statements, self_statements) in sorted(
+                self.stats.items(), key=lambda item: -item[1][2]
+            )
+        }
+        return {
+            'wall_time': round(time.perf_counter() - self._started, 6),
+            'profiled_time': round(sum(phase['self'] for phase in phases.values()), 6),
+            'statements': sum(phase['self_statements'] for phase in phases.values()),
+            'phases': phases,
+        }
+
+    def dump(self) -> Dict[str, Any]:
+        """Stop counting the statements, and store the profile in the extras of the node and in the directory."""
+        self.uninstall()
+        profile = self.summary()
+        node = self.process.node
+        node.base.extras.set(PROFILE_EXTRA_KEY, profile)
+        if self.directory:
+            path = os.path.join(self.directory, f'workgraph_{node.pk}_profile.json')
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as handle:
+                    json.dump(profile, handle, indent=2)
+            except OSError as exception:
+                LOGGER.warning('Failed to write the profile of the workgraph to %s: %s', path, exception)
+        return profile
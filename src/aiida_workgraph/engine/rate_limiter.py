@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import collections
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket that limits the rate at which the engine submits processes.
+
+    The bucket holds at most ``burst`` tokens and is refilled with ``rate`` tokens per second.
+    Every submission consumes one token, so after a burst the submissions are spread at ``rate`` per second.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[int] = None,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param rate: the number of submissions per second.
+        :param burst: the number of submissions that can be done at once, by default ``max(1, rate)``.
+        :param window: the time window, in seconds, over which the achieved rate is measured.
+        :param clock: the function returning the current time in seconds.
+        """
+        if rate <= 0:
+            raise ValueError(f'The submission rate must be positive, got {rate}.')
+        self.rate = rate
+        self.burst = max(1, int(burst if burst is not None else rate))
+        self.window = window
+        self.clock = clock
+        self.tokens = float(self.burst)
+        self.timestamp = clock()
+        self.submitted = 0
+        self._started = None
+        self._recent = collections.deque()
+
+    def refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.timestamp) * self.rate)
+        self.timestamp = now
+
+    def has_token(self) -> bool:
+        """Check if a submission is allowed now, without consuming a token."""
+        self.refill()
+        return self.tokens >= 1
+
+    def consume(self) -> None:
+        """Consume a token for a submission."""
+        self.refill()
+        self.tokens -= 1
+        self.submitted += 1
+        if self._started is None:
+            self._started = self.timestamp
+        self._recent.append(self.timestamp)
+
+    def wait_time(self) -> float:
+        """Seconds until the next token is available."""
+        self.refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def achieved_rate(self) -> float:
+        """The number of submissions per second over the last ``window`` seconds."""
+        if self._started is None:
+            return 0.0
+        now = self.clock()
+        while self._recent and self._recent[0] < now - self.window:
+            self._recent.popleft()
+        elapsed = max(min(self.window, now - self._started), 1 / self.rate)
+        return len(self._recent) / elapsed
+
+    def stats(self, queue_depth: int) -> Dict[str, float]:
+        """Statistics for monitoring, ``queue_depth`` is the number of ready tasks that were deferred."""
+        return {
+            'queue_depth': queue_depth,
+            'submitted': self.submitted,
+            'submit_rate': round(self.achieved_rate(), 3),
+            'max_submit_rate': self.rate,
+            'submit_burst': self.burst,
+        }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import collections
+import contextlib
+import logging
+import sys
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiida.common.log import LOG_LEVEL_REPORT
+
+ROUTINE_REPORT_MODES = ('report', 'debug', 'summary')
+# the buffer is written to the database before it grows larger than this
+MAX_BUFFERED_REPORTS = 1000
+
+
+class ReportBuffer:
+    """Buffer the reports of the engine and write them to the database in one transaction.
+
+    The records keep the time and the source location of the report, and are passed to the handlers of the logger
+    when the buffer is flushed, so the database handler still inserts one log entry per record.
+
+    Routine messages, e.g. that a task finished, are reported according to ``wg.routine_reports``:
+
+    - ``report``: as every other report.
+    - ``debug``: at the ``DEBUG`` level, so they are only stored if the profile logs at this level.
+    - ``summary``: counted, and a single summary line is reported per step.
+
+    Failures and other messages are always reported in full.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.records: List[Tuple[float, int, str, Tuple[str, int, str], Any]] = []
+        self.summary: Dict[str, int] = collections.Counter()
+
+    def add(self, level: int, message: str, frame: Optional[types.FrameType] = None, exc_info: Any = None) -> None:
+        """Add a report.
+
+        :param frame: the frame of the caller, whose location is recorded, by default the caller of this method.
+        :param exc_info: the exception information, as for :meth:`logging.Logger.log`.
+        """
+        frame = frame or sys._getframe(1)
+        location = (frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name)
+        if exc_info:
+            # the exception is captured now, because the report is only written at the end of the step
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        self.records.append((time.time(), level, message, location, exc_info or None))
+        if len(self.records) >= MAX_BUFFERED_REPORTS:
+            self.flush()
+
+    def add_routine(self, message: str, category: str, count: int = 1, frame: Optional[types.FrameType] = None) -> None:
+        """Add a routine message, ``category`` describes the counted items in the summary, e.g. 'tasks finished'."""
+        frame = frame or sys._getframe(1)
+        mode = self.process.wg.routine_reports if getattr(self.process, 'wg', None) else 'report'
+        if mode == 'summary':
+            if count:
+                self.summary[category] += count
+        elif mode == 'debug':
+            self.add(logging.DEBUG, message, frame)
+        else:
+            self.add(LOG_LEVEL_REPORT, message, frame)
+
+    def flush(self) -> None:
+        """Write the buffered reports, and the summary of the routine messages, to the logger."""
+        if self.summary:
+            summary = ', '.join(f'{count} {category}' for category, count in self.summary.items())
+            self.summary.clear()
+            self.add(LOG_LEVEL_REPORT, self.process.format_report(f'Step summary: {summary}.', '_do_step'))
+        if not self.records:
+            return
+        from aiida.manage import get_manager
+
+        records, self.records = self.records, []
+        adapter = self.process.logger
+        logger = getattr(adapter, 'logger', adapter)
+        extra = getattr(adapter, 'extra', None)
+        storage = get_manager().get_profile_storage()
+        # inside a step, the reports are committed with the transaction of the step
+        with contextlib.nullcontext() if storage.in_transaction else storage.transaction():
+            for created, level, message, (pathname, lineno, func), exc_info in records:
+                if not logger.isEnabledFor(level):
+                    continue
+                record = logger.makeRecord(
+                    logger.name, level, pathname, lineno, message, (), exc_info, func=func, extra=extra
+                )
+                record.created = created
+                record.msecs = (created - int(created)) * 1000
+                logger.handle(record)
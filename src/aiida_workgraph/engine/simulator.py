@@ -0,0 +1,353 @@
+"""Simulate the scheduling of a workgraph in virtual time, without running its tasks.
+
+The simulator drives the :class:`~aiida_workgraph.engine.task_manager.TaskManager` of the engine, so the readiness
+of the tasks, the zones, the ``If`` and ``While`` zones, the expansion of the ``Map`` zones, ``max_number_jobs``
+and the concurrency pools behave as in a real run. Only the launch of the tasks is replaced: a process task
+occupies a job slot for its duration, and a task that runs in the engine, e.g. a ``Normal`` task, blocks the
+engine for its duration. Nothing is stored and no process is launched.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from aiida.common.extendeddicts import AttributeDict
+from node_graph.config import BUILTIN_TASKS
+
+from aiida_workgraph.enums import TaskState
+
+from .awaitable_manager import AwaitableManager
+from .context_manager import ContextManager
+from .error_handler_manager import ErrorHandlerManager
+from .task_manager import TaskManager
+from .transaction import StepTransaction
+
+if TYPE_CHECKING:
+    from aiida_workgraph import WorkGraph
+    from aiida_workgraph.task import Task
+
+LOGGER = logging.getLogger(__name__)
+
+# the duration of a task in seconds, or a function that returns it, e.g. a sample of a distribution
+DurationModel = Union[float, Callable[['Task'], float]]
+
+
+class SimulatedJob(NamedTuple):
+    """A running process of a task, in place of the awaitable of the engine."""
+
+    key: str
+
+
+class SimulationResult(NamedTuple):
+    """The predicted schedule of a workgraph.
+
+    - ``makespan``: the time from the start of the workgraph until all tasks finished.
+    - ``peak_concurrency``: the maximum number of processes running at the same time.
+    - ``utilization``: the fraction of the job slots in use over the makespan. The slots are ``max_number_jobs``,
+      or the number of jobs if that is smaller.
+    - ``critical_path``: the tasks that determined the makespan, each task started when the previous one finished.
+    - ``spans``: the ``(start, end)`` of every run of the tasks, a task in a ``While`` zone runs multiple times.
+    """
+
+    makespan: float
+    peak_concurrency: int
+    utilization: float
+    critical_path: List[str]
+    spans: Dict[str, List[Tuple[float, float]]]
+
+
+class SimulatedNode:
+    """Keep the runtime information of the tasks in memory, in place of the ``WorkGraphNode``."""
+
+    pk = None
+
+    def __init__(self, label: str):
+        self.label = label
+        self.task_states: Dict[str, str] = {}
+        self.task_processes: Dict[str, Any] = {}
+        self.task_actions: Dict[str, str] = {}
+        self.task_execution_counts: Dict[str, int] = {}
+        self.task_map_info: Dict[str, dict] = {}
+        self.submit_stats = None
+
+    def get_task_state(self, task_name: str) -> str:
+        return self.task_states.get(task_name, '')
+
+    def set_task_state(self, task_name: str, task_state: str) -> None:
+        self.task_states[task_name] = task_state
+
+    def get_task_process(self, task_name: str) -> Any:
+        return self.task_processes.get(task_name)
+
+    def set_task_process(self, task_name: str, task_process: Any) -> None:
+        self.task_processes[task_name] = task_process
+
+    def get_task_action(self, task_name: str) -> str:
+        return self.task_actions.get(task_name, '')
+
+    def set_task_action(self, task_name: str, task_action: str) -> None:
+        self.task_actions[task_name] = task_action
+
+    def get_task_execution_count(self, task_name: str) -> int:
+        return self.task_execution_counts.get(task_name, 0)
+
+    def set_task_execution_count(self, task_name: str, count: int) -> None:
+        self.task_execution_counts[task_name] = count
+
+    def set_task_map_info(self, task_name: str, task_map_info: dict) -> None:
+        self.task_map_info[task_name] = task_map_info
+
+
+class SimulatedTaskManager(TaskManager):
+    """The task manager of the engine, with the launch of the tasks replaced by the simulation."""
+
+    def acquire_job_slot(self, task: 'Task') -> bool:
+        # the job quota is shared with the other workgraphs of the profile, which are not simulated
+        return True
+
+    @property
+    def submit_bucket(self) -> None:
+        # the submission rate limiter works in real time
+        return None
+
+    def can_run_concurrently(self, task: 'Task') -> bool:
+        return False
+
+    def execute_process_task(self, task, args=None, kwargs=None, var_kwargs=None):
+        self.process.start_job(task)
+        self.state_manager.set_task_runtime_info(task.name, 'state', TaskState.RUNNING)
+        self.state_manager.set_task_runtime_info(task.name, 'action', '')
+        if task.map_data:
+            parent_task_name = task.map_data['parent']
+            if self.process.node.get_task_state(parent_task_name) == TaskState.PLANNED:
+                self.process.node.set_task_state(parent_task_name, TaskState.RUNNING)
+
+    def execute_coroutine_task(self, task, args=None, kwargs=None, var_kwargs=None):
+        self.execute_process_task(task)
+
+    def execute_function_task(self, task, continue_workgraph=None, args=None, kwargs=None, var_kwargs=None):
+        self.process.run_in_engine(task)
+        if continue_workgraph:
+            self.continue_workgraph()
+
+    def execute_normal_task(self, task, continue_workgraph=None, args=None, kwargs=None, var_kwargs=None):
+        self.execute_function_task(task, continue_workgraph)
+
+    def should_run_while_task(self, name: str) -> bool:
+        """Run the number of iterations given in the outcomes, one by default."""
+        execution_count = self.state_manager.get_task_runtime_info(name, 'execution_count')
+        max_iterations = self.process.wg.tasks[name].inputs.max_iterations.property.value
+        return execution_count < min(max_iterations, int(self.process.outcomes.get(name, 1)))
+
+    def should_run_if_task(self, name: str) -> bool:
+        """Run the zone if its outcome is true, which is the default."""
+        return bool(self.process.outcomes.get(name, True))
+
+    def execute_map_task(self, task, kwargs):
+        """Map over the items given in the outcomes, a number of items or the items themselves."""
+        source = self.process.outcomes.get(task.name, kwargs.get('source'))
+        if isinstance(source, int):
+            source = {f'item_{i}': None for i in range(source)}
+        elif isinstance(source, (list, tuple)):
+            source = {f'item_{i}': value for i, value in enumerate(source)}
+        elif not isinstance(source, dict):
+            source = {}
+        super().execute_map_task(task, {**kwargs, 'source': source})
+
+
+class WorkGraphSimulator:
+    """Replay the scheduling of a workgraph in virtual time, see :func:`simulate_workgraph`.
+
+    The simulator stands in for the ``WorkGraphEngine`` process that the managers of the engine expect.
+    """
+
+    def __init__(
+        self,
+        wg: 'WorkGraph',
+        durations: Optional[Dict[str, DurationModel]] = None,
+        default_duration: DurationModel = 0.0,
+        outcomes: Optional[Dict[str, Any]] = None,
+    ):
+        from aiida_workgraph import WorkGraph
+
+        # a copy, because the map zones add tasks to the workgraph
+        self.wg = WorkGraph.from_dict(wg.to_dict())
+        self.durations = durations or {}
+        self.default_duration = default_duration
+        self.outcomes = outcomes or {}
+        self.node = SimulatedNode(wg.name)
+        self.logger = LOGGER
+        self.clock = 0.0
+        self._awaitables: List[SimulatedJob] = []
+        self._events: List[Tuple[float, int, str]] = []
+        self._busy = 0.0
+        self._jobs = 0
+        self.peak_concurrency = 0
+        self.spans: Dict[str, List[List[float]]] = {}
+        # the task whose end started each run of a task, to find the critical path
+        self._causes: Dict[Tuple[str, int], Optional[Tuple[str, int]]] = {}
+        self._trigger: Optional[Tuple[str, int]] = None
+        self.metrics = self.timings = self.task_state_feed = _Recorder(self)
+        self.step_transaction = StepTransaction(self)
+        self.exit_codes = AttributeDict()
+        self._context = AttributeDict()
+        self.ctx_manager = ContextManager(self._context, process=self, logger=self.logger)
+        self.awaitable_manager = AwaitableManager(self._awaitables, None, self.logger, self, self.ctx_manager)
+        self.task_manager = SimulatedTaskManager(self.ctx_manager, self.logger, None, self, self.awaitable_manager)
+        self.error_handler_manager = ErrorHandlerManager(self, self.ctx_manager, self.logger)
+
+    @property
+    def ctx(self) -> AttributeDict:
+        return self._context
+
+    def report(self, msg: str, *args: Any, **kwargs: Any) -> None:
+        self.logger.debug(msg, *args)
+
+    def report_routine(self, msg: str, category: str, count: int = 1) -> None:
+        self.logger.debug(msg)
+
+    @contextlib.contextmanager
+    def bulk_submit(self):
+        yield
+
+    def get_duration(self, task: 'Task') -> float:
+        """Return the duration of a task, from the model of its name, of its name before mapping, or its identifier."""
+        keys = [task.name, task.map_data['parent'] if task.map_data else None, task.identifier]
+        model = next((self.durations[key] for key in keys if key in self.durations), self.default_duration)
+        duration = model(task) if callable(model) else model
+        return max(float(duration), 0.0)
+
+    def advance(self, clock: float) -> None:
+        if clock > self.clock:
+            self._busy += len(self._awaitables) * (clock - self.clock)
+            self.clock = clock
+
+    def start_job(self, task: 'Task') -> None:
+        heapq.heappush(self._events, (self.clock + self.get_duration(task), len(self._events), task.name))
+        self._awaitables.append(SimulatedJob(task.name))
+        self._jobs += 1
+        self.peak_concurrency = max(self.peak_concurrency, len(self._awaitables))
+
+    def run_in_engine(self, task: 'Task') -> None:
+        self.advance(self.clock + self.get_duration(task))
+        self.finish_task(task.name)
+
+    def finish_task(self, name: str) -> None:
+        """Apply the end of a task, as the engine does when its process finished."""
+        state_manager = self.task_manager.state_manager
+        self.ctx._task_results.setdefault(name, {})
+        state_manager.set_task_runtime_info(name, 'state', TaskState.FINISHED)
+        self._trigger = (name, len(self.spans[name]) - 1) if name in self.spans else self._trigger
+        state_manager.update_meta_tasks(name)
+        state_manager.update_parent_task_state(name)
+
+    def setup(self) -> None:
+        self.ctx._executed_tasks = []
+        self.ctx._new_data = {}
+        self.ctx._job_grants = {}
+        self.ctx._job_slots = {}
+        self.ctx._task_results = {
+            'graph_ctx': self.wg.ctx._value,
+            'graph_inputs': self.wg.inputs._value,
+            'graph_outputs': self.wg.outputs._value,
+        }
+        for task in self.wg.tasks:
+            if task.name in BUILTIN_TASKS:
+                self.node.set_task_state(task.name, TaskState.FINISHED)
+            else:
+                self.ctx._task_results[task.name] = {}
+                self.node.set_task_state(task.name, TaskState.PLANNED)
+
+    def run(self) -> SimulationResult:
+        """Run the simulation until all tasks finished."""
+        self.setup()
+        task_manager = self.task_manager
+        while True:
+            task_manager.start_step()
+            task_manager.continue_workgraph()
+            finished, _ = task_manager.is_workgraph_finished()
+            if finished:
+                break
+            if not self._events:
+                waiting = [task.name for task in self.wg.tasks if self.node.get_task_state(task.name) == 'PLANNED']
+                raise RuntimeError(f'The simulation is stuck, the tasks {waiting} can never run.')
+            # the engine reacts to the finished processes after the current step
+            end, _, name = heapq.heappop(self._events)
+            self.advance(end)
+            self._awaitables.remove(SimulatedJob(name))
+            self.finish_task(name)
+        return self.get_result()
+
+    def get_result(self) -> SimulationResult:
+        spans = {name: [(start, end) for start, end in runs if end is not None] for name, runs in self.spans.items()}
+        slots = min(self.wg.max_number_jobs, self._jobs)
+        utilization = self._busy / (self.clock * slots) if self.clock > 0 and slots else 0.0
+        return SimulationResult(self.clock, self.peak_concurrency, utilization, self.get_critical_path(), spans)
+
+    def get_critical_path(self) -> List[str]:
+        runs = [
+            (runs[-1][1], runs[-1][0], name, len(runs) - 1)
+            for name, runs in self.spans.items()
+            if runs[-1][1] is not None
+        ]
+        if not runs:
+            return []
+        # the run that ended last, a zone ends with its last child, which started later
+        _, _, name, index = max(runs)
+        run, path = (name, index), []
+        while run is not None:
+            path.append(run[0])
+            run = self._causes.get(run)
+        return path[::-1]
+
+
+class _Recorder:
+    """Record the virtual start and end of the tasks, in place of the metrics, timings and feed of the engine."""
+
+    def __init__(self, simulator: WorkGraphSimulator):
+        self.simulator = simulator
+
+    def tasks_ready(self, names: List[str]) -> None:
+        pass
+
+    def task_launched(self, name: str) -> float:
+        simulator = self.simulator
+        runs = simulator.spans.setdefault(name, [])
+        runs.append([simulator.clock, None])
+        simulator._causes[(name, len(runs) - 1)] = simulator._trigger
+        return simulator.clock
+
+    def record(self, name: str, **timestamps: float) -> None:
+        pass
+
+    def launched(self, name: str) -> None:
+        pass
+
+    def applied(self, name: str, finished: Optional[float] = None) -> None:
+        runs = self.simulator.spans.get(name)
+        if runs and runs[-1][1] is None:
+            runs[-1][1] = self.simulator.clock
+
+    def add(self, task_name: str, old_state: Optional[str], new_state: str) -> None:
+        pass
+
+
+def simulate_workgraph(
+    wg: 'WorkGraph',
+    durations: Optional[Dict[str, DurationModel]] = None,
+    default_duration: DurationModel = 0.0,
+    outcomes: Optional[Dict[str, Any]] = None,
+) -> SimulationResult:
+    """Predict the makespan, concurrency and critical path of a workgraph, without running it.
+
+    :param durations: the duration model per task name or task identifier. A model is a number of seconds, or a
+        function that takes the task and returns its duration, e.g. to sample a distribution.
+    :param default_duration: the duration model of the other tasks, the zones take no time.
+    :param outcomes: the outcome of the zones whose conditions depend on results, by zone name: the number of
+        iterations of a ``While`` zone (one by default), whether an ``If`` zone runs (by default it does), and
+        the number of items, or the items, of a ``Map`` zone (by default its ``source`` input).
+    """
+    return WorkGraphSimulator(wg, durations, default_duration, outcomes).run()
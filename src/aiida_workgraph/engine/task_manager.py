@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import contextlib
+import time
 from typing import Any, Dict, List, Optional, Tuple
 from aiida_workgraph.task import Task
 from aiida_workgraph.enums import TaskAction, TaskState
@@ -9,11 +11,20 @@ from aiida.engine.processes.exit_code import ExitCode
 from .task_state import TaskStateManager
 from .task_actions import TaskActionManager
 from .awaitable_manager import AwaitableManager
+from .priority import critical_path_lengths, sort_tasks_by_priority
+from .pools import task_matches_pool
+from .rate_limiter import TokenBucket
+from aiida_workgraph.orm import quota
+from aiida.common.exceptions import NotExistent
 import traceback
 from node_graph.link import TaskLink
 from aiida.engine.processes import Process
 
 MAX_NUMBER_AWAITABLES_MSG = 'The maximum number of subprocesses has been reached: {}. Cannot launch the job: {}.'
+POOL_FULL_MSG = 'The concurrency pool {} is full: {}. Cannot launch the job: {}.'
+JOB_QUOTA_FULL_MSG = 'The job quota {} is full. Cannot launch the job: {}.'
+# seconds before the ready tasks are checked again, when a job quota of the profile was full
+JOB_QUOTA_RETRY_INTERVAL = 10
 
 process_task_types = [
     'CALCJOB',
@@ -23,6 +34,43 @@ process_task_types = [
     'PYTHONJOB',
     'SHELLJOB',
 ]
+# tasks that only submit a process, they can be launched in bulk
+bulk_launch_task_types = ['CALCJOB', 'WORKCHAIN', 'PYTHONJOB', 'SHELLJOB']
+# minimum number of ready tasks that are launched in bulk, instead of one by one
+BULK_LAUNCH_MIN_TASKS = 10
+# the graph tasks only wait for their children, which acquire their own slots of the job quota
+quota_task_types = ['CALCJOB', 'WORKCHAIN', 'PYTHONJOB', 'SHELLJOB']
+
+
+def load_node_attributes(value: Any) -> None:
+    """Load the attributes of all stored nodes in ``value`` in the current thread.
+
+    The storage sessions are bound to a thread, a worker thread can therefore only read
+    the attributes that were already loaded by the main thread.
+    """
+    from aiida.orm import Node
+
+    if isinstance(value, Node):
+        if value.is_stored:
+            value.base.attributes.all
+    elif isinstance(value, dict):
+        for item in value.values():
+            load_node_attributes(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            load_node_attributes(item)
+
+
+def execute_in_worker(task: Task, args, kwargs, var_kwargs):
+    """Execute a Normal task in a worker thread.
+
+    The executor runs inside a storage transaction of the worker thread, so that reading the
+    preloaded attributes of stored nodes does not try to refresh them from another session.
+    """
+    from aiida.manage import get_manager
+
+    with get_manager().get_profile_storage().transaction():
+        return task.execute(args, kwargs, var_kwargs)
 
 
 class TaskManager:
@@ -45,6 +93,29 @@ class TaskManager:
         # Sub-managers
         self.state_manager = TaskStateManager(ctx_manager, logger, process, awaitable_manager)
         self.action_manager = TaskActionManager(self.state_manager, logger, process)
+        # length of the critical path of each task, used to order the ready tasks
+        self._critical_path = None
+        # names of the concurrency pools of each task
+        self._task_pools = {}
+        # job slots reserved for the ready child workgraphs, until they are launched, see `reserve_job_budgets`
+        self._reserved_job_grants = {}
+        # depth of the nested `run_tasks` calls, the reservations are dropped when the outermost call returns
+        self._run_tasks_depth = 0
+        # seconds after which the engine should step again, although no awaitable finished
+        self.wakeup_delay = None
+        # limits the submission rate of processes, created when `wg.max_submit_rate` is set
+        self._submit_bucket = None
+        # ready tasks whose submission was deferred by the rate limiter in the current step
+        self._deferred_tasks = set()
+        # the submission statistics last stored on the node
+        self._submit_stats = None
+        # true while the ready process tasks are launched in bulk
+        self._bulk_launching = False
+
+    def start_step(self) -> None:
+        """Reset the bookkeeping of the previous step."""
+        self.wakeup_delay = None
+        self._deferred_tasks.clear()
 
     def get_task(self, name: str):
         """Get task from the context."""
@@ -125,23 +196,224 @@ class TaskManager:
             if ready:
                 task_to_run.append(task.name)
         #
-        self.process.report('tasks ready to run: {}'.format(','.join(task_to_run)))
+        task_to_run = self.sort_by_priority(task_to_run)
+        self.process.metrics.tasks_ready(task_to_run)
+        self.process.report_routine(
+            'tasks ready to run: {}'.format(','.join(task_to_run)), 'ready tasks', count=len(task_to_run)
+        )
         self.run_tasks(task_to_run)
 
+    def sort_by_priority(self, names: List[str]) -> List[str]:
+        """Sort the ready tasks, so that the free job slots go to the most important tasks first.
+
+        The critical path lengths are computed from the connectivity the first time they are needed. Only the
+        process tasks take a slot, the other tasks, e.g. the context tasks, keep their order and are run first.
+        """
+        tasks = self.process.wg.tasks
+        process_tasks = [name for name in names if tasks[name].task_type.upper() in process_task_types]
+        if not process_tasks:
+            return names
+        if self._critical_path is None:
+            self._critical_path = critical_path_lengths(self.process.wg.connectivity['output_node'])
+        other_tasks = [name for name in names if tasks[name].task_type.upper() not in process_task_types]
+        return other_tasks + sort_tasks_by_priority(process_tasks, tasks, self._critical_path)
+
     def should_run_task(self, task: 'Task') -> bool:
         """Check if the task should run."""
         name = task.name
         # skip if the max number of awaitables is reached
         if task.task_type.upper() in process_task_types:
-            if len(self.process._awaitables) >= self.process.wg.max_number_jobs:
-                self.process.report(MAX_NUMBER_AWAITABLES_MSG.format(self.process.wg.max_number_jobs, name))
+            # a child workgraph with a reserved budget already counts as running, without a slot it waits
+            reserved = self._reserved_job_grants.get(name)
+            if reserved == 0 or (
+                reserved is None and self.get_number_of_running_jobs() >= self.process.wg.max_number_jobs
+            ):
+                self.process.report_routine(
+                    MAX_NUMBER_AWAITABLES_MSG.format(self.process.wg.max_number_jobs, name),
+                    'tasks waiting for a job slot',
+                )
                 return False
+        if not self.has_free_pool_slot(task):
+            return False
         # skip if the task is already executed or if the task is in a skippped state
         if (
             name in self.ctx._executed_tasks
             or self.state_manager.get_task_runtime_info(name, 'state') == TaskState.SKIPPED
         ):
             return False
+        submitted = self.is_submitted_task(task)
+        if submitted and not self.has_submit_token(task):
+            return False
+        if not self.acquire_job_slot(task):
+            return False
+        if submitted and self.submit_bucket is not None:
+            self.submit_bucket.consume()
+            self._deferred_tasks.discard(name)
+        return True
+
+    def is_submitted_task(self, task: 'Task') -> bool:
+        """Check if the task is launched as a new process, and not run in the engine."""
+        task_type = task.task_type.upper()
+        if task_type in process_task_types or task_type == 'MONITOR':
+            return True
+        return (
+            task_type == 'PYFUNCTION'
+            and task.spec.metadata.get('is_coroutine', False)
+            and not self.process.wg.inline_coroutines
+        )
+
+    @property
+    def submit_bucket(self) -> Optional[TokenBucket]:
+        """The token bucket of the submission rate limiter, ``None`` if the rate is not limited."""
+        if self._submit_bucket is None and self.process.wg.max_submit_rate:
+            self._submit_bucket = TokenBucket(self.process.wg.max_submit_rate, self.process.wg.submit_burst)
+        return self._submit_bucket
+
+    def has_submit_token(self, task: 'Task') -> bool:
+        """Check if the rate limiter allows to submit the task now, otherwise defer it to a later step."""
+        bucket = self.submit_bucket
+        if bucket is None or bucket.has_token():
+            return True
+        self._deferred_tasks.add(task.name)
+        self.request_wakeup(bucket.wait_time())
+        return False
+
+    def update_submit_stats(self) -> None:
+        """Store the queue depth and the achieved submission rate on the node, for monitoring."""
+        if self.submit_bucket is None:
+            return
+        if self._deferred_tasks:
+            self.process.report_routine(
+                f'Submission rate limit reached, deferred {len(self._deferred_tasks)} ready tasks.',
+                'tasks deferred by the rate limit',
+                count=len(self._deferred_tasks),
+            )
+        stats = self.submit_bucket.stats(len(self._deferred_tasks))
+        if stats != self._submit_stats:
+            self.process.node.submit_stats = self._submit_stats = stats
+
+    def request_wakeup(self, delay: float) -> None:
+        """Ask the engine to step again after ``delay`` seconds, e.g. to retry tasks that could not be launched."""
+        if self.wakeup_delay is None or delay < self.wakeup_delay:
+            self.wakeup_delay = delay
+
+    def acquire_job_slot(self, task: 'Task') -> bool:
+        """Acquire a slot of the job quota of the profile for a job task.
+
+        The quota is shared by all the WorkGraphs of the profile. When it is full, the engine retries
+        after ``JOB_QUOTA_RETRY_INTERVAL`` seconds, because the slot may be released by another WorkGraph.
+        """
+        name = self.process.wg.job_quota
+        if not name or task.task_type.upper() not in quota_task_types:
+            return True
+        slots = self.ctx.setdefault('_job_slots', {})
+        if task.name in slots:
+            return True
+        try:
+            # the slot is committed right away, so that the other WorkGraphs see it
+            with self.process.step_transaction.suspended():
+                label = quota.acquire_job_slot(name, self.process.node.pk, task.name)
+        except NotExistent:
+            self.process.report(f'The job quota {name} is not defined, launch the job {task.name} without quota.')
+            return True
+        if label is None:
+            self.process.report_routine(JOB_QUOTA_FULL_MSG.format(name, task.name), 'tasks waiting for the job quota')
+            self.request_wakeup(JOB_QUOTA_RETRY_INTERVAL)
+            return False
+        slots[task.name] = label
+        return True
+
+    def release_job_slot(self, name: str) -> None:
+        """Release the job quota slot of a task, if it holds one."""
+        label = self.ctx.get('_job_slots', {}).pop(name, None)
+        if label is not None:
+            quota.release_job_slot(label)
+
+    def release_all_job_slots(self) -> None:
+        """Release the job quota slots of all the tasks, e.g. when the WorkGraph terminates."""
+        for name in list(self.ctx.get('_job_slots', {})):
+            self.release_job_slot(name)
+
+    def get_number_of_running_jobs(self) -> int:
+        """Count the job slots in use.
+
+        With a shared job budget, a running child workgraph uses all the slots that were granted to it, and a ready
+        child workgraph the slots reserved for it.
+        """
+        if not self.process.wg.shared_job_budget:
+            return len(self.process._awaitables)
+        grants = self.ctx.get('_job_grants', {})
+        running = sum(grants.get(awaitable.key, 1) for awaitable in self.process._awaitables)
+        return running + sum(self._reserved_job_grants.values())
+
+    def reserve_job_budgets(self, names: List[str]) -> None:
+        """Divide the free job slots between the ready child workgraphs, before any task of the batch is launched.
+
+        Every other ready process task needs one slot. The remaining slots are shared fairly by the child workgraphs,
+        in the launch order. A child workgraph that gets no slot waits for a later step.
+        """
+        if not self.process.wg.shared_job_budget:
+            return
+        task_types = {name: self.process.wg.tasks[name].task_type.upper() for name in names}
+        graphs = [
+            name
+            for name, task_type in task_types.items()
+            if task_type in ('GRAPH', 'SUBGRAPH') and name not in self._reserved_job_grants
+        ]
+        if not graphs:
+            return
+        jobs = sum(1 for task_type in task_types.values() if task_type in quota_task_types)
+        free = max(0, self.process.wg.max_number_jobs - self.get_number_of_running_jobs() - jobs)
+        share, remainder = divmod(free, len(graphs))
+        for i, name in enumerate(graphs):
+            self._reserved_job_grants[name] = share + (1 if i < remainder else 0)
+
+    def grant_job_budget(self, name: str) -> Optional[int]:
+        """Grant a part of the free job slots to a child workgraph.
+
+        The grant is the share reserved for the child by :meth:`reserve_job_budgets`. The slots are returned when
+        the child workgraph finishes, because its awaitable is resolved.
+
+        :return: the number of granted slots, or ``None`` if the job budget is not shared.
+        """
+        if not self.process.wg.shared_job_budget:
+            return None
+        if name not in self._reserved_job_grants:
+            self.reserve_job_budgets([name])
+        grant = self._reserved_job_grants.pop(name)
+        self.ctx.setdefault('_job_grants', {})[name] = grant
+        self.process.report_routine(f'Grant {grant} job slots to task {name}.', 'job budgets granted')
+        return grant
+
+    def get_task_pools(self, name: str) -> List[str]:
+        """Get the names of the concurrency pools that a task belongs to."""
+        if name not in self._task_pools:
+            task = self.process.wg.tasks[name]
+            self._task_pools[name] = [
+                pool_name
+                for pool_name, pool in self.process.wg.concurrency_pools.items()
+                if task_matches_pool(task, pool)
+            ]
+        return self._task_pools[name]
+
+    def has_free_pool_slot(self, task: 'Task') -> bool:
+        """Check if every concurrency pool of the task still has a free slot.
+
+        The running jobs of a pool are the awaitables of the tasks that belong to it.
+        """
+        pools = self.get_task_pools(task.name)
+        if not pools:
+            return True
+        running = [awaitable.key for awaitable in self.process._awaitables]
+        for pool_name in pools:
+            limit = self.process.wg.concurrency_pools[pool_name].get('limit')
+            if limit is None:
+                continue
+            if sum(1 for key in running if pool_name in self.get_task_pools(key)) >= limit:
+                self.process.report_routine(
+                    POOL_FULL_MSG.format(pool_name, limit, task.name), 'tasks waiting for a concurrency pool'
+                )
+                return False
         return True
 
     def run_tasks(self, names: List[str], continue_workgraph: bool = True) -> None:
@@ -149,7 +421,25 @@ class TaskManager:
         Task type includes: Node, Data, CalcFunction, WorkFunction, CalcJob, WorkChain, GraphBuilder,
         WorkGraph, PythonJob, ShellJob, While, If, Zone, GetContext, SetContext, Normal.
 
+        Independent Normal tasks are collected and, if ``wg.max_inline_workers`` is larger
+        than one, executed concurrently after the other tasks of this step were launched.
+        When many process tasks are ready, they are launched first, in bulk.
         """
+        self.reserve_job_budgets(names)
+        self._run_tasks_depth += 1
+        try:
+            self._run_tasks(names, continue_workgraph)
+        finally:
+            self._run_tasks_depth -= 1
+            if not self._run_tasks_depth:
+                self._reserved_job_grants.clear()
+
+    def _run_tasks(self, names: List[str], continue_workgraph: bool) -> None:
+        bulk_batch = [name for name in names if self.process.wg.tasks[name].task_type.upper() in bulk_launch_task_types]
+        if len(bulk_batch) >= BULK_LAUNCH_MIN_TASKS and not self._bulk_launching:
+            self.launch_tasks_in_bulk(bulk_batch)
+            names = [name for name in names if name not in set(bulk_batch)]
+        inline_batch = []
         for name in names:
             # skip if the max number of awaitables is reached
             task = self.process.wg.tasks[name]
@@ -157,6 +447,8 @@ class TaskManager:
             if not self.should_run_task(task):
                 continue
 
+            ready = self.process.metrics.task_launched(name)
+            self.process.timings.record(name, ready=ready, started=time.time())
             self.ctx._executed_tasks.append(name)
             # print("-" * 60)
 
@@ -167,7 +459,10 @@ class TaskManager:
             task_type = task.task_type.upper()
             if task_type == 'PYFUNCTION':
                 if task.spec.metadata.get('is_coroutine', False):
-                    self.execute_process_task(task, **inputs)
+                    if self.process.wg.inline_coroutines:
+                        self.execute_coroutine_task(task, **inputs)
+                    else:
+                        self.execute_process_task(task, **inputs)
                 else:
                     self.execute_function_task(task, continue_workgraph, **inputs)
             elif task_type in ['CALCFUNCTION', 'WORKFUNCTION']:
@@ -191,20 +486,46 @@ class TaskManager:
             elif task_type == 'MAP':
                 self.execute_map_task(task, inputs['kwargs'])
             elif task_type == 'NORMAL':
-                self.execute_normal_task(
-                    task,
-                    continue_workgraph,
-                    **inputs,
-                )
+                if self.can_run_concurrently(task):
+                    inline_batch.append((task, inputs))
+                else:
+                    self.execute_normal_task(
+                        task,
+                        continue_workgraph,
+                        **inputs,
+                    )
             else:
                 self.process.report(f'Unknown task type {task_type}')
                 self.state_manager.set_task_runtime_info(name, 'state', TaskState.FAILED)
+            self.process.timings.launched(name)
+        if inline_batch:
+            self.execute_normal_tasks_concurrently(inline_batch, continue_workgraph)
+
+    def launch_tasks_in_bulk(self, names: List[str]) -> None:
+        """Launch process tasks in one storage transaction, and continue their processes together."""
+        number_of_awaitables = len(self.process._awaitables)
+        self._bulk_launching = True
+        try:
+            with self.process.bulk_submit():
+                self.run_tasks(names, continue_workgraph=False)
+        finally:
+            self._bulk_launching = False
+        self.process.report(f'Launched {len(self.process._awaitables) - number_of_awaitables} tasks in bulk.')
+
+    def can_run_concurrently(self, task: 'Task') -> bool:
+        """Check if a Normal task can be executed in the inline worker pool.
+
+        Tasks that receive the engine context are excluded, because they may modify it.
+        """
+        return self.process.wg.max_inline_workers > 1 and 'context' not in task.args_data['kwargs']
 
     def execute_function_task(self, task, continue_workgraph=None, args=None, kwargs=None, var_kwargs=None):
         """Execute a CalcFunction or WorkFunction task."""
 
         try:
-            process, _ = task.execute(args, kwargs, var_kwargs)
+            # the process function runs the event loop, so other processes may write meanwhile
+            with self.process.step_transaction.suspended():
+                process, _ = task.execute(args, kwargs, var_kwargs)
             self.state_manager.set_task_runtime_info(task.name, 'process', process)
             self.state_manager.update_task_state(task.name)
         except Exception as e:
@@ -218,12 +539,15 @@ class TaskManager:
     def execute_process_task(self, task, args=None, kwargs=None, var_kwargs=None):
         """Execute a CalcJob or WorkChain task."""
         try:
-            process, state = task.execute(
-                engine_process=self.process,
-                args=args,
-                kwargs=kwargs,
-                var_kwargs=var_kwargs,
-            )
+            # a paused process is sent to the broker right away, so it has to be committed first
+            paused = task.action == TaskAction.PAUSE
+            with self.process.step_transaction.suspended() if paused else contextlib.nullcontext():
+                process, state = task.execute(
+                    engine_process=self.process,
+                    args=args,
+                    kwargs=kwargs,
+                    var_kwargs=var_kwargs,
+                )
             self.state_manager.set_task_runtime_info(task.name, 'state', state)
             self.state_manager.set_task_runtime_info(task.name, 'action', '')
             self.state_manager.set_task_runtime_info(task.name, 'process', process)
@@ -233,9 +557,32 @@ class TaskManager:
                 if self.process.node.get_task_state(parent_task_name) == TaskState.PLANNED:
                     self.process.node.set_task_state(parent_task_name, state)
             self.awaitable_manager.to_context(**{task.name: process})
+            if task.name in self.ctx.get('_job_slots', {}):
+                quota.record_job_slot_process(self.ctx._job_slots[task.name], process.pk)
         except Exception as e:
             error_traceback = traceback.format_exc()  # Capture the full traceback
             self.logger.error(f'Error in task {task.name}: {e}\n{error_traceback}')  # Log the error with traceback
+            self.release_job_slot(task.name)
+            self.state_manager.update_task_state(task.name, success=False)
+
+    def execute_coroutine_task(self, task, args=None, kwargs=None, var_kwargs=None):
+        """Execute a coroutine task as an asyncio task in the loop of the engine.
+
+        The ``PyFunction`` process still records the provenance and is checkpointed on its state transitions,
+        but it is not sent to the broker. At most ``wg.max_inline_coroutines`` coroutines run at the same time.
+        """
+        from aiida_pythonjob import PyFunction
+
+        try:
+            inputs = task.get_coroutine_inputs(kwargs, var_kwargs)
+            process = self.runner.instantiate_process(PyFunction, **inputs)
+            self.state_manager.set_task_runtime_info(task.name, 'state', TaskState.RUNNING)
+            self.state_manager.set_task_runtime_info(task.name, 'action', '')
+            self.state_manager.set_task_runtime_info(task.name, 'process', process.node)
+            self.awaitable_manager.run_in_loop(task.name, process)
+        except Exception as e:
+            error_traceback = traceback.format_exc()
+            self.logger.error(f'Error in task {task.name}: {e}\n{error_traceback}')
             self.state_manager.update_task_state(task.name, success=False)
 
     def execute_while_task(self, task):
@@ -314,17 +661,21 @@ class TaskManager:
 
         self.continue_workgraph()
 
-    def execute_normal_task(self, task, continue_workgraph=None, args=None, kwargs=None, var_kwargs=None):
-        """Execute a Normal task."""
-        name = task.name
-
+    def prepare_normal_task_kwargs(self, task, kwargs):
+        """Prepare the keyword arguments passed to the executor of a Normal task."""
         # A "context" key is special and should be passed to the context manager
         # TODO this is hard coded for now, need to be refactored
         if 'context' in task.args_data['kwargs']:
-            self.ctx.task_name = name
+            self.ctx.task_name = task.name
             kwargs.update({'context': self.ctx})
         for key in task.args_data['args']:
             kwargs.pop(key, None)
+        return kwargs
+
+    def execute_normal_task(self, task, continue_workgraph=None, args=None, kwargs=None, var_kwargs=None):
+        """Execute a Normal task."""
+        name = task.name
+        kwargs = self.prepare_normal_task_kwargs(task, kwargs)
         try:
             results, _ = task.execute(args, kwargs, var_kwargs)
             self.state_manager.update_normal_task_state(name, results)
@@ -335,6 +686,38 @@ class TaskManager:
         if continue_workgraph:
             self.continue_workgraph()
 
+    def execute_normal_tasks_concurrently(self, batch, continue_workgraph=None):
+        """Execute a batch of independent Normal tasks in a bounded thread pool.
+
+        Only the executors run in the worker threads. The results are applied in the main
+        thread and in the order in which the tasks became ready, so the state and provenance
+        writes are the same as for a serial run.
+
+        :param batch: list of ``(task, inputs)`` tuples, with ``inputs`` as returned by ``get_inputs``.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        max_workers = min(self.process.wg.max_inline_workers, len(batch))
+        self.logger.info(f'Run {len(batch)} tasks with {max_workers} inline workers.')
+        futures = []
+        # the worker threads use their own storage sessions, which can not see uncommitted nodes
+        with self.process.step_transaction.suspended():
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='workgraph-inline') as pool:
+                for task, inputs in batch:
+                    kwargs = self.prepare_normal_task_kwargs(task, inputs['kwargs'])
+                    load_node_attributes(inputs)
+                    futures.append(pool.submit(execute_in_worker, task, inputs['args'], kwargs, inputs['var_kwargs']))
+        for (task, _), future in zip(batch, futures):
+            try:
+                results, _ = future.result()
+                self.state_manager.update_normal_task_state(task.name, results)
+            except Exception as e:
+                error_traceback = ''.join(traceback.format_exception(e))
+                self.logger.error(f'Error in task {task.name}: {e}\n{error_traceback}')
+                self.state_manager.update_normal_task_state(task.name, results=None, success=False)
+        if continue_workgraph:
+            self.continue_workgraph()
+
     def get_socket_value(self, socket) -> Any:
         """Get the value of the socket recursively."""
         socket_value = None
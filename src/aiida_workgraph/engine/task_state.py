@@ -26,6 +26,8 @@ class TaskStateManager:
         self.logger = logger
         self.process = process
         self.awaitable_manager = awaitable_manager
+        # the socket spec extras of the finished tasks, written together at the end of the step
+        self.pending_extras: List[Tuple[Data, dict]] = []
 
     def get_task_runtime_info(self, name: str, key: RuntimeInfoKey) -> Any:
         """Fetch a task runtime property (e.g. process, state, action)."""
@@ -52,7 +54,10 @@ class TaskStateManager:
                 serialized = serialize(value)
                 self.process.node.set_task_process(name, serialized)
             case 'state':
+                self.process.task_state_feed.add(name, self.process.node.get_task_state(name), value)
                 self.process.node.set_task_state(name, value)
+                if value in (TaskState.FINISHED, TaskState.FAILED):
+                    self.process.timings.applied(name)
             case 'action':
                 self.process.node.set_task_action(name, value)
             case 'execution_count':
@@ -82,6 +87,9 @@ class TaskStateManager:
         if success:
             node = self.get_task_runtime_info(name, 'process')
             if isinstance(node, ProcessNode):
+                if node.is_terminated:
+                    # the last modification of a terminated process is its termination
+                    self.process.timings.record(name, finished=node.mtime.timestamp())
                 state = node.process_state.value.upper()
                 if node.is_finished_ok:
                     self.set_task_runtime_info(task.name, 'state', state)
@@ -89,7 +97,7 @@ class TaskStateManager:
                     self.ctx._task_results[name] = resolve_node_link_managers(node.outputs)
                     self.set_task_runtime_info(task.name, 'state', TaskState.FINISHED)
                     self.update_meta_tasks(name)
-                    self.process.report(f'Task: {name}, type: {task.task_type}, finished.')
+                    self.process.report_routine(f'Task: {name}, type: {task.task_type}, finished.', 'tasks finished')
                     self.apply_socket_spec_extras_to_aiida_node(name, node)
                 # all other states are considered as failed
                 else:
@@ -103,7 +111,7 @@ class TaskStateManager:
                 self.ctx._task_results[name] = {output_name: node}
                 self.set_task_runtime_info(task.name, 'state', TaskState.FINISHED)
                 self.update_meta_tasks(name)
-                self.process.report(f'Task: {name} finished.')
+                self.process.report_routine(f'Task: {name} finished.', 'tasks finished')
         else:
             self.on_task_failed(name)
         # After finishing, inform the parent
@@ -142,7 +150,7 @@ class TaskStateManager:
                     self.process.exit_codes.OUTPUS_NOT_MATCH_RESULTS
             self.update_meta_tasks(name)
             self.set_task_runtime_info(name, 'state', TaskState.FINISHED)
-            self.process.report(f'Task: {name} finished.')
+            self.process.report_routine(f'Task: {name} finished.', 'tasks finished')
         else:
             self.on_task_failed(name)
         self.update_parent_task_state(name)
@@ -273,7 +281,9 @@ class TaskStateManager:
         finished, _ = self.are_childen_finished(name)
 
         if finished:
-            self.process.report(f'While Task {name}: this iteration finished. Try to reset for the next iteration.')
+            self.process.report_routine(
+                f'While Task {name}: this iteration finished. Try to reset for the next iteration.', 'while iterations'
+            )
             # reset the condition tasks
             for link in self.process.wg.tasks[name].inputs.conditions._links:
                 self.reset_task(link.from_task.name, recursive=False)
@@ -288,7 +298,7 @@ class TaskStateManager:
         finished, _ = self.are_childen_finished(name)
         if finished:
             self.set_task_runtime_info(name, 'state', TaskState.FINISHED)
-            self.process.report(f'Task: {name} finished.')
+            self.process.report_routine(f'Task: {name} finished.', 'tasks finished')
             self.update_parent_task_state(name)
 
     def update_map_task_state(self, name: str) -> None:
@@ -312,7 +322,7 @@ class TaskStateManager:
                 self.ctx._task_results[name][link.to_socket._name] = results
             self.set_task_runtime_info(name, 'state', TaskState.FINISHED)
             # self.update_meta_tasks(name)
-            self.process.report(f'Task: {name} finished.')
+            self.process.report_routine(f'Task: {name} finished.', 'tasks finished')
             self.update_meta_tasks(name)
             self.update_parent_task_state(name)
 
@@ -334,7 +344,7 @@ class TaskStateManager:
             # self.ctx._task_results[name] = results
             self.set_task_runtime_info(name, 'state', TaskState.FINISHED)
             # self.update_meta_tasks(name)
-            self.process.report(f'Task: {name} finished.')
+            self.process.report_routine(f'Task: {name} finished.', 'tasks finished')
             self.update_parent_task_state(name)
 
     def are_childen_finished(self, name: str) -> tuple[bool, Any]:
@@ -355,22 +365,40 @@ class TaskStateManager:
         return finished, None
 
     def apply_socket_spec_extras_to_aiida_node(self, name: str, node: ProcessNode) -> None:
-        """Apply the socket spec extras to the AiiDA process node for a task."""
+        """Apply the socket spec extras to the AiiDA process node for a task.
+
+        The extras are only collected here, and written by :meth:`flush_socket_spec_extras` at the end of the step.
+        """
         task = self.process.wg.tasks[name]
         task.set_outputs_from_process_node(node)
-        self.set_socket_spec_extra(task.outputs)
+        self.pending_extras.extend(self.get_socket_spec_extras(task.outputs))
+
+    def flush_socket_spec_extras(self) -> None:
+        """Write the collected socket spec extras of all output nodes in one bulk update."""
+        from aiida_workgraph.orm.utils import set_extras_many
+
+        if not self.pending_extras:
+            return
+        pending, self.pending_extras = self.pending_extras, []
+        set_extras_many(pending)
+
+    @classmethod
+    def get_socket_spec_extras(cls, socket: BaseSocket) -> List[Tuple[Data, dict]]:
+        """Return the ``(node, extras)`` tuples of the socket spec extras of the Data nodes of a socket."""
+        if isinstance(socket, TaskSocketNamespace):
+            return [item for sub_socket in socket._sockets.values() for item in cls.get_socket_spec_extras(sub_socket)]
+        if isinstance(socket.value, Data):
+            extras = {
+                key: value
+                for key, value in socket._metadata.extras.items()
+                if key not in ['identifier', 'builtin_socket', 'function_socket']
+            }
+            return [(socket.value, extras)] if extras else []
+        return []
 
     @classmethod
     def set_socket_spec_extra(cls, socket: BaseSocket) -> None:
         """Set the socket spec extra to the AiiDA process node for a task."""
-        if isinstance(socket, TaskSocketNamespace):
-            for sub_socket in socket._sockets.values():
-                cls.set_socket_spec_extra(sub_socket)
-        else:
-            if isinstance(socket.value, Data):
-                extras = {
-                    key: value
-                    for key, value in socket._metadata.extras.items()
-                    if key not in ['identifier', 'builtin_socket', 'function_socket']
-                }
-                socket.value.base.extras.set_many(extras)
+        from aiida_workgraph.orm.utils import set_extras_many
+
+        set_extras_many(cls.get_socket_spec_extras(socket))
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import contextlib
+from typing import TYPE_CHECKING, Iterator, List
+
+if TYPE_CHECKING:
+    from aiida.engine import Process
+
+
+class StepTransaction:
+    """One storage transaction for a step of the engine.
+
+    The task states, reports, data nodes and the new process nodes of a step are committed together,
+    instead of one commit per write. The processes submitted in the transaction are only continued after
+    the commit, so that a daemon worker never receives a process that is not committed yet.
+
+    Code that runs the event loop, e.g. a ``calcfunction``, or that uses other threads runs between two
+    transactions, see :meth:`suspended`, because other processes may write to the database meanwhile.
+    """
+
+    def __init__(self, process: 'Process'):
+        self.process = process
+        self.processes: List['Process'] = []
+        self._root = None
+        self._savepoint = None
+
+    @property
+    def active(self) -> bool:
+        return self._root is not None
+
+    def begin(self) -> None:
+        """Open the transaction, unless one is already open or the storage does not support it."""
+        from aiida.manage import get_manager
+
+        storage = get_manager().get_profile_storage()
+        if self.active or storage.in_transaction or not hasattr(storage, 'get_session'):
+            return
+        from aiida.storage.psql_dos.orm.utils import disable_expire_on_commit
+
+        session = storage.get_session()
+        # read before the commit below, because loading an expired model begins a transaction
+        pk = self.process.node.pk
+        if session.in_transaction():
+            # end the transaction that was started implicitly by a previous query
+            with disable_expire_on_commit(session):
+                session.commit()
+        self.expire_external_models(session, pk)
+        self._root = session.begin()
+        # the nested transaction tells the storage that it should not commit the single writes
+        self._savepoint = session.begin_nested()
+
+    def expire_external_models(self, session, pk: int) -> None:
+        """Expire the models that other processes may have written since the last step, e.g. the child processes.
+
+        The storage does not refresh the models inside a transaction, so these are read again from the database. The
+        node of the workgraph is only written by this process, and the attributes of the stored data nodes do not
+        change, so they are kept: reloading them, e.g. the large ``workgraph_data`` attribute, is expensive.
+        """
+        for model in list(session.identity_map.values()):
+            # only the loaded attributes are read, so that an expired model is not loaded here
+            node_type = model.__dict__.get('node_type')
+            if node_type is not None and (model.__dict__.get('id') == pk or node_type.startswith('data.')):
+                continue
+            session.expire(model)
+
+    def commit(self) -> None:
+        """Commit the transaction, and continue the processes that were submitted in it."""
+        if not self.active:
+            return
+        from aiida.manage import get_manager
+        from aiida.storage.psql_dos.orm.utils import disable_expire_on_commit
+
+        root, savepoint, self._root, self._savepoint = self._root, self._savepoint, None, None
+        savepoint.commit()
+        # the models written in the step are up to date, the ones that other processes write are expired by `begin`
+        with disable_expire_on_commit(get_manager().get_profile_storage().get_session()):
+            root.commit()
+        processes, self.processes = self.processes, []
+        for process in processes:
+            self.continue_process(process)
+
+    def rollback(self) -> None:
+        """Roll back the transaction, the processes that were submitted in it are dropped."""
+        if not self.active:
+            return
+        root, self._root, self._savepoint = self._root, None, None
+        self.processes = []
+        root.rollback()
+
+    @contextlib.contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Commit the transaction before the block, and open a new one after it."""
+        if not self.active:
+            yield
+            return
+        self.commit()
+        try:
+            yield
+        finally:
+            self.begin()
+
+    def submit(self, process_class, inputs: dict) -> 'Process':
+        """Instantiate a process in the transaction, it is continued when the transaction is committed.
+
+        The checks are the ones of :meth:`aiida.engine.runners.Runner.submit`.
+        """
+        from aiida.common import exceptions
+        from aiida.engine import utils
+        from aiida.manage import get_manager
+
+        runner = self.process.runner
+        assert not utils.is_process_function(process_class), 'Cannot submit a process function'
+        assert not runner.is_closed()
+        # a savepoint per process, so that a failing process does not roll back the whole step
+        with get_manager().get_profile_storage().get_session().begin_nested():
+            process = runner.instantiate_process(process_class, **inputs)
+            if not process.metadata.store_provenance:
+                raise exceptions.InvalidOperation('cannot submit a process with `store_provenance=False`')
+            if process.metadata.get('dry_run', False):
+                raise exceptions.InvalidOperation('cannot submit a process from within another with `dry_run=True`')
+            if runner.is_daemon_runner:
+                runner.persister.save_checkpoint(process)
+                process.close()
+        self.processes.append(process)
+        return process
+
+    def continue_process(self, process: 'Process') -> None:
+        runner = self.process.runner
+        if runner.is_daemon_runner:
+            runner.controller.continue_process(process.pid, nowait=True, no_reply=True)
+        else:
+            runner.loop.create_task(process.step_until_terminated())
@@ -3,17 +3,21 @@
 from __future__ import annotations
 
 import collections.abc
+import contextlib
 import logging
+import sys
+import time
 import typing as t
 
 from plumpy import process_comms
 from plumpy.persistence import auto_persist
-from plumpy.process_states import Continue, Wait
+from plumpy.process_states import Continue, ProcessState, Wait
 from plumpy.workchains import _PropagateReturn
 import kiwipy
 
 from aiida.common.extendeddicts import AttributeDict
 from aiida.common.lang import override
+from aiida.common.log import LOG_LEVEL_REPORT
 from aiida.orm import Node
 from aiida_workgraph.enums import TaskState
 from aiida_workgraph.orm.workgraph import WorkGraphNode
@@ -25,6 +29,11 @@ from .context_manager import ContextManager
 from .awaitable_manager import AwaitableManager
 from .task_manager import TaskManager
 from .error_handler_manager import ErrorHandlerManager
+from .report_buffer import ReportBuffer
+from .change_feed import TaskStateFeed
+from .metrics import EngineMetrics, TaskTimings
+from .profiler import EngineProfiler, get_profiling
+from .transaction import StepTransaction
 from aiida.engine.processes.workchains.awaitable import Awaitable
 from node_graph.config import BUILTIN_TASKS
 
@@ -46,6 +55,12 @@ class WorkGraphEngine(Process, metaclass=Protect):
     _node_class = WorkGraphNode
     _spec_class = WorkGraphSpec
     _CONTEXT = 'CONTEXT'
+    _report_buffer = None
+    _task_state_feed = None
+    _metrics = None
+    _timings = None
+    _step_transaction = None
+    _profiler = None
 
     def __init__(
         self,
@@ -160,15 +175,21 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.awaitable_manager = AwaitableManager(self._awaitables, self.runner, self.logger, self, self.ctx_manager)
         self.task_manager = TaskManager(self.ctx_manager, self.logger, self.runner, self, self.awaitable_manager)
         self.error_handler_manager = ErrorHandlerManager(self, self.ctx_manager, self.logger)
+        if '_wgdata' in self.ctx:
+            self.setup_profiler()
         # "_awaitables" is auto persisted.
         if self._awaitables:
             # For other awaitables, because they exist in the db, we only need to re-register the callbacks
             self.ctx._awaitable_actions = []
             self.awaitable_manager.action_awaitables()
+        elif self.state == ProcessState.WAITING:
+            # the workgraph was waiting to retry tasks that could not be launched, e.g. a full job quota
+            self.call_soon(self.wake_up)
 
     @override
     def run(self) -> t.Any:
         self.setup()
+        self.setup_profiler()
         return self._do_step()
 
     def _do_step(self) -> t.Any:
@@ -181,7 +202,31 @@ class WorkGraphEngine(Process, metaclass=Protect):
         # we resume the workgraph in the callback function even
         # there are some awaitables left
         # self._awaitables = []
+        transaction = self.step_transaction
+        if self.wg.step_transaction:
+            transaction.begin()
+        start = time.perf_counter()
+        try:
+            result = self._step()
+            self.metrics.step_finished(time.perf_counter() - start, self.task_state_feed.unsummarized)
+            self.task_state_feed.update_summary()
+            self.timings.flush()
+            self.task_manager.state_manager.flush_socket_spec_extras()
+            self.report_buffer.flush()
+        except BaseException:
+            transaction.rollback()
+            raise
+        else:
+            transaction.commit()
+        finally:
+            self.report_buffer.flush()
+            self.task_state_feed.flush()
+        return result
+
+    def _step(self) -> t.Any:
+        """Continue the workgraph, and decide the next state of the process."""
         result: t.Any = None
+        self.task_manager.start_step()
 
         try:
             self.task_manager.continue_workgraph()
@@ -189,6 +234,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
             finished, result = True, exception.exit_code
         else:
             finished, result = self.task_manager.is_workgraph_finished()
+        self.task_manager.update_submit_stats()
 
         # If the workgraph is finished or the result is an ExitCode, we exit by returning
         if finished:
@@ -197,7 +243,7 @@ class WorkGraphEngine(Process, metaclass=Protect):
             else:
                 return self.finalize()
 
-        if self._awaitables:
+        if self._awaitables or self.task_manager.wakeup_delay is not None:
             return Wait(self._do_step, 'Waiting before next step')
 
         return Continue(self._do_step)
@@ -231,16 +277,151 @@ class WorkGraphEngine(Process, metaclass=Protect):
             # An uncaught exception here will have bizarre and disastrous consequences
             self.logger.exception('exception in _store_nodes called in on_exiting')
 
+    @override
+    def on_killed(self) -> None:
+        """Kill the child processes that run in the loop of the engine, because the broker can not reach them."""
+        super().on_killed()
+        self.awaitable_manager.kill_inline_processes('Killed through the parent WorkGraph')
+
+    @override
+    def on_terminated(self) -> None:
+        """Release the job quota slots that are still held, e.g. when the workgraph was killed or excepted."""
+        try:
+            # before the node is sealed by the parent class
+            self.task_state_feed.update_summary()
+            self.timings.flush()
+            self.metrics.write(final=True)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('exception while updating the task summary and the metrics')
+        super().on_terminated()
+        try:
+            self.task_manager.release_all_job_slots()
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception('exception while releasing the job quota slots')
+        self.task_manager.state_manager.flush_socket_spec_extras()
+        self.report_buffer.flush()
+        self.task_state_feed.flush()
+        if self._profiler is not None:
+            try:
+                self._profiler.dump()
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception('exception while storing the profile of the engine')
+
+    def setup_profiler(self) -> None:
+        """Profile the engine if it is enabled by ``wg.profiling`` or the ``AIIDA_WORKGRAPH_PROFILE`` variable."""
+        profiling = get_profiling(self.wg.profiling)
+        if not profiling:
+            return
+        self._profiler = EngineProfiler(self, directory=profiling if isinstance(profiling, str) else None)
+        self._profiler.install()
+
+    @property
+    def report_buffer(self) -> ReportBuffer:
+        if self._report_buffer is None:
+            self._report_buffer = ReportBuffer(self)
+        return self._report_buffer
+
+    @property
+    def metrics(self) -> EngineMetrics:
+        if self._metrics is None:
+            self._metrics = EngineMetrics(self)
+        return self._metrics
+
+    @property
+    def timings(self) -> TaskTimings:
+        if self._timings is None:
+            self._timings = TaskTimings(self)
+        return self._timings
+
+    @property
+    def task_state_feed(self) -> TaskStateFeed:
+        if self._task_state_feed is None:
+            self._task_state_feed = TaskStateFeed(self)
+        return self._task_state_feed
+
+    def format_report(self, msg: str, caller: str) -> str:
+        return f'[{self.node.pk}|{self.__class__.__name__}|{caller}]: {msg}'
+
+    @override
+    def report(self, msg: str, *args: t.Any, **kwargs: t.Any) -> None:
+        """Buffer a report, the reports of a step are written to the database together at the end of the step.
+
+        The keyword arguments are those of :meth:`logging.Logger.log`. A report with other arguments than
+        ``exc_info``, e.g. ``stack_info``, is written right away.
+        """
+        if args:
+            msg = msg % args
+        frame = sys._getframe(1)
+        msg = self.format_report(msg, frame.f_code.co_name)
+        exc_info = kwargs.pop('exc_info', None)
+        if kwargs:
+            self.report_buffer.flush()
+            self.logger.log(LOG_LEVEL_REPORT, msg, exc_info=exc_info, **kwargs)
+            return
+        self.report_buffer.add(LOG_LEVEL_REPORT, msg, frame, exc_info)
+
+    def report_routine(self, msg: str, category: str, count: int = 1) -> None:
+        """Report a routine message, that is reported, logged at ``DEBUG`` or summarized, see ``wg.routine_reports``.
+
+        :param category: the counted items in the summary of the step, e.g. 'tasks finished'.
+        :param count: the number of items that the message is about.
+        """
+        frame = sys._getframe(1)
+        self.report_buffer.add_routine(self.format_report(msg, frame.f_code.co_name), category, count, frame)
+
     @Protect.final
     def on_wait(self, awaitables: t.Sequence[t.Awaitable]):
         """Entering the WAITING state."""
         super().on_wait(awaitables)
         if self._awaitables:
             self.awaitable_manager.action_awaitables()
-            self.report('Process status: {}'.format(self.node.process_status))
-        else:
+            self.report_routine('Process status: {}'.format(self.node.process_status), 'status updates')
+            self.report_buffer.flush()
+        if self.task_manager.wakeup_delay is not None:
+            self.loop.call_later(self.task_manager.wakeup_delay, self.wake_up)
+        elif not self._awaitables:
             self.call_soon(self.resume)
 
+    def wake_up(self) -> None:
+        """Resume the workgraph if it is still waiting, to retry the tasks that could not be launched."""
+        if self.state == ProcessState.WAITING:
+            self.awaitable_manager.resume_process()
+
+    @property
+    def step_transaction(self) -> StepTransaction:
+        if self._step_transaction is None:
+            self._step_transaction = StepTransaction(self)
+        return self._step_transaction
+
+    @contextlib.contextmanager
+    def bulk_submit(self) -> t.Iterator[None]:
+        """Submit all the processes of the block in one storage transaction.
+
+        The process nodes, their inputs and checkpoints are committed together, and the processes
+        are continued only after the commit, so the daemon workers never see an uncommitted process.
+        Inside a step, the transaction of the step is used.
+        """
+        transaction = self.step_transaction
+        if transaction.active:
+            yield
+            return
+        transaction.begin()
+        try:
+            yield
+        except BaseException:
+            transaction.rollback()
+            raise
+        transaction.commit()
+
+    @override
+    def submit(self, process: t.Any, inputs: dict | None = None, **kwargs: t.Any) -> Node:
+        """Submit a child process, it is continued when the open storage transaction is committed."""
+        from aiida.engine.utils import prepare_inputs
+
+        if not self.step_transaction.active:
+            return super().submit(process, inputs, **kwargs)
+        return self.step_transaction.submit(process, prepare_inputs(inputs, **kwargs)).node
+
     def _build_process_label(self) -> str:
         """Use the workgraph name as the process label."""
         return f'WorkGraph<{self.inputs[WorkGraphSpec.WORKGRAPH_DATA_KEY]["name"]}>'
@@ -263,6 +444,10 @@ class WorkGraphEngine(Process, metaclass=Protect):
         self.ctx._awaitable_actions = []
         self.ctx._new_data = {}
         self.ctx._executed_tasks = []
+        # job slots granted to the child workgraphs, when the job budget is shared
+        self.ctx._job_grants = {}
+        # slots of the job quota of the profile that are held by the tasks
+        self.ctx._job_slots = {}
         # read the workgraph data
         wgdata = restore_workgraph_data_from_raw_inputs(self.inputs)
         self.wg = WorkGraph.from_dict(wgdata)
@@ -0,0 +1,149 @@
+"""Job quotas that are shared by all the WorkGraphs of a profile.
+
+A quota is a ``JobQuotaGroup`` whose label is the name of the quota and whose ``limit`` extra is the
+maximum number of jobs. Every running job holds a ``JobQuotaSlot`` group with the label ``<quota>/<index>``.
+Group labels are unique in the database, so storing a slot atomically acquires it, also when many
+daemon workers try to take the same slot at the same time.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from aiida.common import exceptions
+from aiida.orm import Group, QueryBuilder, load_node
+
+__all__ = (
+    'JobQuotaGroup',
+    'JobQuotaSlot',
+    'set_job_quota',
+    'get_job_quota_limit',
+    'acquire_job_slot',
+    'record_job_slot_process',
+    'release_job_slot',
+    'reclaim_stale_job_slots',
+    'get_job_slots',
+)
+
+LIMIT_KEY = 'limit'
+
+
+class JobQuotaGroup(Group):
+    """Group that defines a job quota, the maximum number of jobs is stored in the ``limit`` extra."""
+
+
+class JobQuotaSlot(Group):
+    """Group that represents a job slot of a quota that is held by a task of a WorkGraph."""
+
+
+def get_group(cls, label: str) -> Optional[Group]:
+    """Return the group of the given class and label, or ``None`` if it does not exist."""
+    qb = QueryBuilder().append(cls, filters={'label': label}, subclassing=False)
+    return qb.first(flat=True)
+
+
+def set_job_quota(name: str, limit: int) -> JobQuotaGroup:
+    """Create or update the job quota ``name``."""
+    if '/' in name:
+        raise ValueError(f'The name of a job quota can not contain a slash: {name}')
+    if limit < 0:
+        raise ValueError(f'The limit of a job quota must be a non-negative integer, got {limit}.')
+    group = get_group(JobQuotaGroup, name)
+    if group is None:
+        group = JobQuotaGroup(label=name, description=f'Job quota {name}').store()
+    group.base.extras.set(LIMIT_KEY, limit)
+    return group
+
+
+def get_job_quota_limit(name: str) -> Optional[int]:
+    """Return the limit of the job quota ``name``, or ``None`` if the quota is not defined."""
+    group = get_group(JobQuotaGroup, name)
+    return None if group is None else group.base.extras.get(LIMIT_KEY)
+
+
+def get_job_slots(name: str) -> List[Dict]:
+    """Return the label and the holder of every slot of the job quota ``name`` that is in use."""
+    qb = QueryBuilder().append(
+        JobQuotaSlot,
+        filters={'label': {'like': f'{name}/%'}},
+        project=['label', 'extras'],
+        subclassing=False,
+    )
+    return [{'label': label, **extras} for label, extras in qb.all()]
+
+
+def acquire_job_slot(name: str, workgraph_pk: int, task_name: str) -> Optional[str]:
+    """Try to acquire a slot of the job quota ``name`` for a task of a WorkGraph.
+
+    If all the slots are in use, the slots of terminated processes are reclaimed once before giving up.
+    This should not run inside a storage transaction, because a slot that was taken concurrently
+    rolls back the session.
+
+    :return: the label of the acquired slot, or ``None`` if the quota is full.
+    :raises aiida.common.exceptions.NotExistent: if the quota is not defined.
+    """
+    limit = get_job_quota_limit(name)
+    if limit is None:
+        raise exceptions.NotExistent(f'The job quota {name} is not defined.')
+    for attempt in range(2):
+        taken = {slot['label'] for slot in get_job_slots(name)}
+        for index in range(limit):
+            label = f'{name}/{index}'
+            if label in taken:
+                continue
+            slot = JobQuotaSlot(label=label)
+            # the holder is stored with the slot, in one insert, so that a slot always has a holder
+            slot.base.extras.set_many({'workgraph': workgraph_pk, 'task': task_name, 'process': None})
+            try:
+                slot.store()
+            except exceptions.IntegrityError:
+                # another WorkGraph took the slot in the meantime
+                continue
+            return label
+        if attempt == 0 and not reclaim_stale_job_slots(name):
+            break
+    return None
+
+
+def record_job_slot_process(label: str, process_pk: int) -> None:
+    """Record the process that uses the slot, so that the slot can be reclaimed once the process terminated."""
+    slot = get_group(JobQuotaSlot, label)
+    if slot is not None:
+        slot.base.extras.set('process', process_pk)
+
+
+def release_job_slot(label: str) -> bool:
+    """Release a slot, return ``False`` if the slot was already released or reclaimed."""
+    slot = get_group(JobQuotaSlot, label)
+    if slot is None:
+        return False
+    try:
+        JobQuotaSlot.collection.delete(slot.pk)
+    except exceptions.NotExistent:
+        return False
+    return True
+
+
+def is_terminated(pk: Optional[int]) -> bool:
+    """Check if the process ``pk`` terminated, a process that does not exist anymore counts as terminated."""
+    if pk is None:
+        return False
+    try:
+        return load_node(pk).is_terminated
+    except exceptions.NotExistent:
+        return True
+
+
+def reclaim_stale_job_slots(name: str) -> int:
+    """Release the slots whose process or WorkGraph terminated without releasing them, or that have no WorkGraph.
+
+    This happens when a WorkGraph is killed or excepted, or when a daemon worker died.
+
+    :return: the number of reclaimed slots.
+    """
+    reclaimed = 0
+    for slot in get_job_slots(name):
+        # a slot without a holder was stored by a version that set the holder after the slot
+        if slot.get('workgraph') is None or is_terminated(slot.get('process')) or is_terminated(slot.get('workgraph')):
+            reclaimed += release_job_slot(slot['label'])
+    return reclaimed
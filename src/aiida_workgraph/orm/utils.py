@@ -8,7 +8,7 @@ from aiida.orm.utils.serialize import (
     group_constructor,
     node_links_manager_constructor,
 )
-from typing import Any
+from typing import Any, Iterable, Optional, Tuple
 import yaml
 
 
@@ -32,3 +32,55 @@ AiiDASafeLoader.add_constructor(_GROUP_TAG, group_constructor)
 
 def deserialize_safe(serialized: str) -> Any:
     return yaml.load(serialized, Loader=AiiDASafeLoader)
+
+
+class _NodeUuidLoader(yaml.SafeLoader):
+    """Loader that returns the UUID of a serialized node, instead of loading the node from the database."""
+
+    pass
+
+
+_NodeUuidLoader.add_constructor(_NODE_TAG, lambda loader, node: loader.construct_scalar(node))
+
+
+def get_serialized_node_uuid(serialized: str) -> Optional[str]:
+    """Return the UUID of a node serialized with :func:`aiida.orm.utils.serialize.serialize`, or None."""
+    if not serialized or not serialized.startswith(_NODE_TAG):
+        return None
+    try:
+        return yaml.load(serialized, Loader=_NodeUuidLoader)
+    except yaml.YAMLError:
+        return None
+
+
+def set_extras_many(extras_of_nodes: Iterable[Tuple[Any, dict]]) -> None:
+    """Set the extras of many nodes with one bulk UPDATE of the extras column of the stored nodes.
+
+    The extras are merged into the extras of the nodes in memory, and the models of the nodes are updated without
+    marking them as modified. The extras of unstored nodes are only set in memory.
+
+    :param extras_of_nodes: ``(node, extras)`` tuples, the extras are merged into the existing extras of the node.
+    """
+    from aiida.manage import get_manager
+    from aiida.orm import EntityTypes
+    from aiida.orm.implementation.utils import clean_value, validate_attribute_extra_key
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    merged = {}
+    for node, extras in extras_of_nodes:
+        if not extras:
+            continue
+        if not node.is_stored:
+            node.base.extras.set_many(extras)
+            continue
+        for key in extras:
+            validate_attribute_extra_key(key)
+        node_extras = merged.setdefault(node.pk, (node, dict(node.base.extras.all)))[1]
+        node_extras.update((key, clean_value(value)) for key, value in extras.items())
+    if not merged:
+        return
+    get_manager().get_profile_storage().bulk_update(
+        EntityTypes.NODE, [{'id': pk, 'extras': extras} for pk, (_, extras) in merged.items()]
+    )
+    for node, extras in merged.values():
+        set_committed_value(node.backend_entity.bare_model, 'extras', extras)
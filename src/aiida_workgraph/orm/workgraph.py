@@ -1,7 +1,9 @@
 """Module with `Node` sub class for work processes."""
 
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+import collections
 import logging
+import time
 from aiida.common.lang import classproperty
 
 from aiida.orm.nodes.process.workflow.workchain import WorkChainNode
@@ -43,6 +45,13 @@ def set_item_in_dict(base, attribute_key: str, item_key: str, value):
     base.attributes.set(attribute_key, dct)
 
 
+def summarize_task_states(task_states: Dict[str, str], exclude: Iterable[str] = ()) -> Dict:
+    """Return the summary of the task states: the number of tasks per state and the time of the update."""
+    exclude = set(exclude)
+    counts = collections.Counter(state for name, state in task_states.items() if name not in exclude and state)
+    return {'counts': dict(counts), 'total': sum(counts.values()), 'updated_at': time.time()}
+
+
 class WorkGraphNode(WorkChainNode):
     """ORM class for all nodes representing the execution of a WorkGraph."""
 
@@ -57,6 +66,11 @@ class WorkGraphNode(WorkChainNode):
     WORKGRAPH_DATA_KEY = 'workgraph_data'
     WORKGRAPH_DATA_SHORT_KEY = 'workgraph_data_short'
     WORKGRAPH_ERROR_HANDLERS_KEY = 'workgraph_error_handlers'
+    SUBMIT_STATS_KEY = 'submit_stats'
+    TASK_SUMMARY_KEY = 'task_summary'
+    ENGINE_METRICS_KEY = 'engine_metrics'
+    TASK_TIMINGS_KEY = 'task_timings'
+    ENGINE_STEPS_KEY = 'engine_steps'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -78,8 +92,19 @@ class WorkGraphNode(WorkChainNode):
             cls.TASK_ERROR_HANDLERS_KEY,
             cls.TASK_EXECUTION_COUNTS_KEY,
             cls.TASK_MAP_INFO_KEY,
+            cls.SUBMIT_STATS_KEY,
+            cls.TASK_SUMMARY_KEY,
+            cls.ENGINE_METRICS_KEY,
+            cls.ENGINE_STEPS_KEY,
         )
 
+    def _check_mutability_attributes(self, keys: Optional[List[str]] = None) -> None:
+        # the timings of every task are stored under their own key, see `set_task_timings`
+        prefix = f'{self.TASK_TIMINGS_KEY}:'
+        if keys is not None:
+            keys = [key for key in keys if not key.startswith(prefix)]
+        super()._check_mutability_attributes(keys)
+
     task_states = make_dict_property(TASK_STATES_KEY, default={})
     task_processes = make_dict_property(TASK_PROCESSES_KEY, default={})
     task_actions = make_dict_property(TASK_ACTIONS_KEY, default={})
@@ -91,6 +116,28 @@ class WorkGraphNode(WorkChainNode):
     task_inputs = make_dict_property(TASK_INPUTS_KEY, default=None)
     workgraph_data_short = make_dict_property(WORKGRAPH_DATA_SHORT_KEY, default=None)
     workgraph_error_handlers = make_dict_property(WORKGRAPH_ERROR_HANDLERS_KEY, default=None)
+    submit_stats = make_dict_property(SUBMIT_STATS_KEY, default=None)
+    # the number of tasks per state, maintained by the engine, so that workgraphs can be queried by their progress
+    task_summary = make_dict_property(TASK_SUMMARY_KEY, default=None)
+    # throughput and latency of the engine, updated at most once per second, see `engine.metrics.EngineMetrics`
+    engine_metrics = make_dict_property(ENGINE_METRICS_KEY, default=None)
+    # the ``[start, duration]`` of the recent steps of the engine, see `engine.metrics.EngineMetrics`
+    engine_steps = make_dict_property(ENGINE_STEPS_KEY, default=None)
+
+    @property
+    def task_timings(self) -> Optional[Dict[str, list]]:
+        """Return the timestamps of every task, see `engine.metrics.TaskTimings`."""
+        prefix = f'{self.TASK_TIMINGS_KEY}:'
+        timings = {key[len(prefix) :]: row for key, row in self.base.attributes.items() if key.startswith(prefix)}
+        return timings or None
+
+    def get_task_timing(self, task_name: str) -> Optional[list]:
+        """Return the timestamps of a single task."""
+        return self.base.attributes.get(f'{self.TASK_TIMINGS_KEY}:{task_name}', None)
+
+    def set_task_timings(self, timings: Dict[str, list]) -> None:
+        """Set the timestamps of the given tasks, each task is stored under its own attribute key."""
+        self.base.attributes.set_many({f'{self.TASK_TIMINGS_KEY}:{name}': row for name, row in timings.items()})
 
     def get_task_state(self, task_name: str) -> Optional[str]:
         """Return the state of a single task."""
@@ -8,6 +8,17 @@ from aiida_workgraph.property import TaskProperty
 from aiida_workgraph.registry import type_mapping
 
 
+def _load_pending_process(socket) -> None:
+    """Load the process of the task of the socket, if :meth:`Task.update_state` deferred it.
+
+    The output sockets of a task are only populated when the task is accessed, so a socket that was obtained before
+    the workgraph ran, e.g. ``outputs = shelljob(...)``, loads them when its value is read.
+    """
+    task = socket._task
+    if task is not None and getattr(task, '_pending_process_pk', None) is not None:
+        task._load_process()
+
+
 class TaskSocket(BaseTaskSocket):
     """Represent a socket of a Task in the AiiDA WorkGraph."""
 
@@ -21,6 +32,15 @@ class TaskSocket(BaseTaskSocket):
 
         return task
 
+    @property
+    def value(self):
+        _load_pending_process(self)
+        return BaseTaskSocket.value.fget(self)
+
+    @value.setter
+    def value(self, value):
+        BaseTaskSocket.value.fset(self, value)
+
     @property
     def node_value(self):
         return self.get_node_value()
@@ -1,6 +1,7 @@
 from __future__ import annotations
+import weakref
 from dataclasses import replace
-from typing import Any, Tuple, Dict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Tuple
 from node_graph.socket_spec import (
     SocketMeta,
     SocketSpecSelect,
@@ -11,11 +12,13 @@ from node_graph.socket_spec import (
     Leaf,
 )
 from aiida_workgraph.registry import type_mapping
-from aiida.engine import Process
-from aiida.engine.processes.process_spec import ProcessSpec
-from plumpy.ports import Port, PortNamespace
 from .socket import TaskSocketNamespace
 
+if TYPE_CHECKING:
+    from aiida.engine import Process
+    from aiida.engine.processes.process_spec import ProcessSpec
+    from plumpy.ports import Port, PortNamespace
+
 
 __all__ = [
     'SocketSpecAPI',
@@ -25,12 +28,18 @@ __all__ = [
     'validate_socket_data',
     'infer_specs_from_callable',
     'from_aiida_process',
+    'spec_structure_key',
+    'copy_spec',
     'SocketSpecSelect',
     'select',
     'meta',
     'Leaf',
 ]
 
+# the socket specs of the AiiDA process classes, per process class and SocketSpecAPI class, see `from_aiida_process`
+_PROCESS_SOCKET_SPECS: 'weakref.WeakKeyDictionary[type, Dict[type, Tuple[SocketSpec, SocketSpec]]]'
+_PROCESS_SOCKET_SPECS = weakref.WeakKeyDictionary()
+
 
 class SocketSpecAPI(_SocketSpecAPI):
     MAP: Dict[Any, str] = type_mapping
@@ -60,6 +69,8 @@ class SocketSpecAPI(_SocketSpecAPI):
         """Recursively convert an AiiDA Port/PortNamespace to a SocketSpec.
         `role` is "input" or "output" (affects call_role metadata).
         """
+        from plumpy.ports import PortNamespace
+
         if isinstance(port, PortNamespace):
             required_here = bool(getattr(port, 'required', True)) and bool(parent_required)
 
@@ -113,18 +124,30 @@ class SocketSpecAPI(_SocketSpecAPI):
           - AiiDA Process instance
           - ProcessSpec object (as returned by `.spec()`)
         """
-        # Normalize to a ProcessSpec
+        from aiida.engine import Process
+        from aiida.engine.processes.process_spec import ProcessSpec
+
+        # The spec of a process class does not change, so its conversion is computed once per class. The callers get
+        # copies, so that a caller that modifies the ``fields`` of a namespace does not change the cached spec.
         if isinstance(process_or_spec, ProcessSpec):
-            spec = process_or_spec
-        elif isinstance(process_or_spec, type) and issubclass(process_or_spec, Process):
-            spec = process_or_spec.spec()
-        elif isinstance(process_or_spec, Process):
-            spec = process_or_spec.spec()
-        else:
+            return cls._from_process_spec(process_or_spec)
+        if isinstance(process_or_spec, Process):
+            process_or_spec = type(process_or_spec)
+        if not (isinstance(process_or_spec, type) and issubclass(process_or_spec, Process)):
             raise TypeError(
                 'from_aiida_process expects an AiiDA Process class/instance or a ProcessSpec; '
                 f'got {type(process_or_spec)!r}'
             )
+        cached = _PROCESS_SOCKET_SPECS.setdefault(process_or_spec, {})
+        if cls not in cached:
+            cached[cls] = cls._from_process_spec(process_or_spec.spec())
+        in_spec, out_spec = cached[cls]
+        return copy_spec(in_spec), copy_spec(out_spec)
+
+    @classmethod
+    def _from_process_spec(cls, spec: ProcessSpec) -> Tuple[SocketSpec, SocketSpec]:
+        from aiida.engine.processes.process_spec import ProcessSpec
+        from plumpy.ports import PortNamespace
 
         # Validate spec structure
         if not isinstance(spec, ProcessSpec):
@@ -142,6 +165,45 @@ class SocketSpecAPI(_SocketSpecAPI):
         return in_spec, out_spec
 
 
+def spec_structure_key(value: Any) -> Optional[Hashable]:
+    """Return a hashable key of the structure of socket data: a ``SocketSpec``, or names in nested lists and dicts.
+
+    Equal keys describe the same sockets, so that a spec built from the data can be cached under the key. ``None`` is
+    returned if a part of the data, e.g. a default value, is not hashable.
+    """
+
+    def freeze(obj: Any) -> Hashable:
+        if isinstance(obj, SocketSpec):
+            fields = (obj.identifier, obj.item, obj.default, obj.link_limit, obj.fields, obj.meta.to_dict())
+            return (SocketSpec,) + tuple(freeze(field) for field in fields)
+        if isinstance(obj, dict):
+            return (dict,) + tuple((key, freeze(item)) for key, item in obj.items())
+        if isinstance(obj, (list, tuple)):
+            return (type(obj),) + tuple(freeze(item) for item in obj)
+        hash(obj)
+        # the type, because e.g. ``1 == True`` but they are different defaults
+        return (type(obj), obj)
+
+    try:
+        return freeze(value)
+    except TypeError:
+        return None
+
+
+def copy_spec(spec: Optional[SocketSpec]) -> Optional[SocketSpec]:
+    """Return a copy of the spec with new ``fields`` dicts, so that the copy can be modified without changing the spec.
+
+    The leaves have no fields, so they are shared with the spec.
+    """
+    if spec is None or (not spec.fields and spec.item is None):
+        return spec
+    return replace(
+        spec,
+        item=copy_spec(spec.item),
+        fields={name: copy_spec(field) for name, field in spec.fields.items()},
+    )
+
+
 socket = SocketSpecAPI.socket
 namespace = SocketSpecAPI.namespace
 dynamic = SocketSpecAPI.dynamic
@@ -3,7 +3,6 @@ from __future__ import annotations
 from node_graph.task import Task as GraphTask
 from .registry import RegistryHub, registry_hub
 from aiida_workgraph.enums import TaskState
-import aiida
 from typing import Any, Dict, Optional, Union, Callable, List, TYPE_CHECKING
 from node_graph.task_spec import BaseHandle
 from node_graph.task import TaskSet
@@ -11,7 +10,8 @@ from aiida_workgraph.socket_spec import SocketSpecAPI
 from node_graph.task_spec import TaskSpec
 
 if TYPE_CHECKING:
-    pass
+    import aiida
+    from node_graph.socket import TaskSocketNamespace
 
 
 class Task(GraphTask):
@@ -55,6 +55,10 @@ class Task(GraphTask):
         self.map_data = None
         self.mapped_tasks = None
         self.execution_count = 0
+        # tasks with a higher priority are launched first, ties are broken by the critical path length
+        self.priority = None
+        # user defined label, used to select the concurrency pools of the task
+        self.tag = None
 
     def to_dict(self, include_sockets: bool = False, should_serialize: bool = False) -> Dict[str, Any]:
         from aiida.orm.utils.serialize import serialize
@@ -63,6 +67,8 @@ class Task(GraphTask):
         tdata['wait'] = [task.name for task in self.waiting_on]
         tdata['children'] = []
         tdata['execution_count'] = self.execution_count
+        tdata['priority'] = self.priority
+        tdata['tag'] = self.tag
         tdata['parent_task'] = [self.parent.name] if self.parent else [None]
         tdata['process'] = serialize(self.process) if self.process else serialize(None)
         tdata['metadata']['pk'] = self.process.pk if self.process else None
@@ -114,24 +120,61 @@ class Task(GraphTask):
         self.process = process
         self.waiting_on.add(data.get('wait', []))
         self.map_data = data.get('map_data', None)
+        self.priority = data.get('priority', None)
+        self.tag = data.get('tag', None)
 
     def reset(self) -> None:
         self.process = None
         self.state = TaskState.PLANNED
 
     def update_state(self, data: Dict[str, Any]) -> None:
-        """Set the outputs of the task from a dictionary."""
+        """Set the state of the task from a dictionary.
+
+        The node of the task is only loaded, and the output sockets populated, when the process or the outputs
+        of the task are accessed.
+        """
         self.state = data['state']
         self.ctime = data['ctime']
         self.mtime = data['mtime']
         self.pk = data['pk']
-        if data['pk'] is not None:
-            node = aiida.orm.load_node(data['pk'])
-            self.process = self.node = node
-            if isinstance(node, aiida.orm.ProcessNode):
-                self.set_outputs_from_process_node(node)
-            elif isinstance(node, aiida.orm.Data):
-                self.set_outputs_from_data_node(node)
+        self.process = None
+        self._pending_process_pk = data['pk']
+
+    @property
+    def process(self) -> Optional[aiida.orm.Node]:
+        if getattr(self, '_pending_process_pk', None) is not None:
+            self._load_process()
+        return self._process
+
+    @process.setter
+    def process(self, value: Optional[aiida.orm.Node]) -> None:
+        self._pending_process_pk = None
+        self._process = value
+
+    @property
+    def node(self) -> Optional[aiida.orm.Node]:
+        return self.process
+
+    @property
+    def outputs(self) -> TaskSocketNamespace:
+        if getattr(self, '_pending_process_pk', None) is not None:
+            self._load_process()
+        return self._outputs
+
+    @outputs.setter
+    def outputs(self, value: TaskSocketNamespace) -> None:
+        self._outputs = value
+
+    def _load_process(self) -> None:
+        """Load the node set by :meth:`update_state`, and populate the output sockets from it."""
+        from aiida import orm
+
+        node = orm.load_node(self._pending_process_pk)
+        self.process = node
+        if isinstance(node, orm.ProcessNode):
+            self.set_outputs_from_process_node(node)
+        elif isinstance(node, orm.Data):
+            self.set_outputs_from_data_node(node)
 
     def set_outputs_from_process_node(self, node: aiida.orm.ProcessNode) -> None:
         from aiida_workgraph.utils import resolve_node_link_managers
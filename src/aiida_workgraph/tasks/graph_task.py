@@ -8,6 +8,21 @@ from node_graph.executor import RuntimeExecutor
 from aiida.engine import Process
 
 
+def apply_job_budget(wgdata: dict, engine_process, name: str) -> None:
+    """Limit the child workgraph to the job slots granted by the parent, if the parent shares its budget.
+
+    The grant is applied to the serialized data of the child, the ``workgraph_data`` of its engine inputs, so that
+    the graph of the task is not modified. The child workgraph also uses the job quota of the parent, unless it has
+    its own.
+    """
+    if wgdata.get('job_quota') is None:
+        wgdata['job_quota'] = engine_process.wg.job_quota
+    grant = engine_process.task_manager.grant_job_budget(name)
+    if grant is not None:
+        wgdata['max_number_jobs'] = min(wgdata['max_number_jobs'], grant)
+        wgdata['shared_job_budget'] = True
+
+
 class GraphTask(Task):
     """Graph builder task"""
 
@@ -73,6 +88,7 @@ class GraphTask(Task):
             wg.max_number_jobs = max_number_jobs
         wg.parent_uuid = engine_process.node.uuid
         inputs = wg.to_engine_inputs(metadata=metadata)
+        apply_job_budget(inputs['workgraph_data'], engine_process, self.name)
         if self.action == TaskAction.PAUSE:
             engine_process.report(f'Task {self.name} is created and paused.')
             process = create_and_pause_process(
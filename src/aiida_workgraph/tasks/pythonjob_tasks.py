@@ -146,29 +146,35 @@ class PyFunctionTask(BaseSerializablePythonTask):
 
     identifier = 'workgraph.pyfunction'
 
-    def execute(self, args=None, kwargs=None, var_kwargs=None, engine_process=None):
-        from aiida_pythonjob import prepare_pyfunction_inputs
-
-        kwargs = kwargs or {}
-        metadata = self.get_process_metadata(kwargs)
+    def get_callable(self) -> Callable:
         func = RuntimeExecutor(**self.get_executor().to_dict()).callable
         # If it's a wrapped function, unwrap
         if isinstance(func, BaseHandle) and hasattr(func, '_callable'):
             func = func._callable
+        return func
+
+    def get_coroutine_inputs(self, kwargs=None, var_kwargs=None) -> Dict[str, Any]:
+        """Build the inputs of the ``PyFunction`` process that runs the coroutine."""
+        from aiida_pythonjob import prepare_pyfunction_inputs
+
+        kwargs = kwargs or {}
+        metadata = self.get_process_metadata(kwargs)
+        function_inputs = self.get_function_inputs(kwargs, var_kwargs)
+        return prepare_pyfunction_inputs(
+            function=self.get_callable(),
+            function_inputs=function_inputs,
+            inputs_spec=self.function_inputs_spec,
+            outputs_spec=self.function_outputs_spec,
+            metadata=metadata,
+            process_label=kwargs.pop('process_label', None),
+            deserializers=kwargs.pop('deserializers', None),
+            serializers=kwargs.pop('serializers', None),
+            register_pickle_by_value=kwargs.pop('register_pickle_by_value', False),
+        )
 
+    def execute(self, args=None, kwargs=None, var_kwargs=None, engine_process=None):
         if self.spec.metadata.get('is_coroutine', False):
-            function_inputs = self.get_function_inputs(kwargs, var_kwargs)
-            inputs = prepare_pyfunction_inputs(
-                function=func,
-                function_inputs=function_inputs,
-                inputs_spec=self.function_inputs_spec,
-                outputs_spec=self.function_outputs_spec,
-                metadata=metadata,
-                process_label=kwargs.pop('process_label', None),
-                deserializers=kwargs.pop('deserializers', None),
-                serializers=kwargs.pop('serializers', None),
-                register_pickle_by_value=kwargs.pop('register_pickle_by_value', False),
-            )
+            inputs = self.get_coroutine_inputs(kwargs, var_kwargs)
             if self.action == TaskAction.PAUSE:
                 engine_process.report(f'Task {self.name} is created and paused.')
                 process = create_and_pause_process(
@@ -185,6 +191,9 @@ class PyFunctionTask(BaseSerializablePythonTask):
 
             return process, state
         else:
+            kwargs = kwargs or {}
+            metadata = self.get_process_metadata(kwargs)
+            func = self.get_callable()
             # Make sure it's process_function-decorated
             if not hasattr(func, 'is_process_function'):
                 func = pyfunction()(func)
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import replace
-from typing import Any, Dict, List, Optional, Union, Callable, Annotated
+import functools
+from typing import Any, Dict, Hashable, List, Optional, Union, Callable, Annotated
 import inspect
 from aiida_shell import ShellJob
 from aiida_shell.launch import prepare_shell_job_inputs
 from node_graph.task_spec import TaskSpec
 from node_graph.executor import RuntimeExecutor
 from node_graph.socket_spec import SocketSpec, merge_specs, SocketMeta
-from aiida_workgraph.socket_spec import from_aiida_process, namespace
+from aiida_workgraph.socket_spec import copy_spec, from_aiida_process, namespace, spec_structure_key
 from aiida_workgraph.task import Task, TaskHandle
 from aiida_workgraph.enums import TaskAction, TaskState
 from aiida import orm
@@ -106,11 +107,51 @@ class ShellJobTask(Task):
         return process, state
 
 
+class _ShellJobSpecArguments:
+    """The arguments of `_build_shelljob_TaskSpec`, hashed and compared by their structure, see `spec_structure_key`."""
+
+    __slots__ = ('key', 'kwargs')
+
+    def __init__(self, key: Hashable, kwargs: Dict[str, Any]):
+        self.key = key
+        self.kwargs = kwargs
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _ShellJobSpecArguments) and self.key == other.key
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_shelljob_TaskSpec(arguments: _ShellJobSpecArguments) -> TaskSpec:
+    return _make_shelljob_TaskSpec(**arguments.kwargs)
+
+
 def _build_shelljob_TaskSpec(
     *,
     identifier: Optional[str] = None,
     outputs: Optional[SocketSpec | List[str]] = None,
     parser_outputs: Optional[SocketSpec | List[str]] = None,
+) -> TaskSpec:
+    """Return the `TaskSpec` of a ShellJob with these outputs.
+
+    The spec is built on every ``shelljob()`` call, so it is cached by the structure of the arguments. Each call gets
+    a copy of the cached spec, with its own ``fields`` dicts.
+    """
+    kwargs = {'identifier': identifier, 'outputs': outputs, 'parser_outputs': parser_outputs}
+    key = spec_structure_key(tuple(kwargs.values()))
+    if key is None:
+        return _make_shelljob_TaskSpec(**kwargs)
+    spec = _cached_shelljob_TaskSpec(_ShellJobSpecArguments(key, kwargs))
+    return replace(spec, inputs=copy_spec(spec.inputs), outputs=copy_spec(spec.outputs))
+
+
+def _make_shelljob_TaskSpec(
+    *,
+    identifier: Optional[str] = None,
+    outputs: Optional[SocketSpec | List[str]] = None,
+    parser_outputs: Optional[SocketSpec | List[str]] = None,
 ) -> TaskSpec:
     """Create a `TaskSpec` for a ShellJob, augmenting inputs/outputs as needed.
 
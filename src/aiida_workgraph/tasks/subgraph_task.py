@@ -52,8 +52,10 @@ class SubGraphTask(Task):
     def execute(self, engine_process, args=None, kwargs=None, var_kwargs=None):
         from aiida_workgraph.utils import create_and_pause_process
         from aiida_workgraph.engine.workgraph import WorkGraphEngine
+        from aiida_workgraph.tasks.graph_task import apply_job_budget
 
         inputs = self.prepare_for_subgraph_task(kwargs)
+        apply_job_budget(inputs['workgraph_data'], engine_process, self.name)
 
         if self.action == TaskAction.PAUSE:
             engine_process.report(f'Task {self.name} is created and paused.')
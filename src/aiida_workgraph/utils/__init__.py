@@ -1,25 +1,23 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Literal, Optional, TypeAlias, Union, Callable, List
-from aiida.engine.processes import Process
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Literal, Optional, TypeAlias, Union, Callable, List
 from aiida import orm
 from aiida.common.exceptions import NotExistent
-from aiida.engine.runners import Runner
 from aiida.common.links import validate_link_label
-from aiida_workgraph.config import task_types
-from aiida.engine import CalcJob, WorkChain
-from aiida_pythonjob import PythonJob
-from aiida_pythonjob.calculations.pyfunction import PyFunction
-from aiida_shell.calculations.shell import ShellJob
 import inspect
 import yaml
 from node_graph.socket import TaggedValue
-from node_graph.socket_spec import SocketSpec
 from aiida.orm.utils.serialize import serialize
-from aiida_workgraph.orm.utils import deserialize_safe
+from aiida_workgraph.orm.utils import deserialize_safe, get_serialized_node_uuid
 from copy import deepcopy
 
+if TYPE_CHECKING:
+    import numpy
+    from aiida.engine.processes import Process
+    from aiida.engine.runners import Runner
+    from node_graph.socket_spec import SocketSpec
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -81,6 +79,13 @@ def _validate_task_name(name: str, *, source: TaskNameSource) -> None:
 
 
 def inspect_aiida_component_type(executor: Callable) -> str:
+    from aiida.engine import CalcJob, WorkChain
+    from aiida_pythonjob import PythonJob
+    from aiida_pythonjob.calculations.pyfunction import PyFunction
+    from aiida_shell.calculations.shell import ShellJob
+
+    from aiida_workgraph.config import task_types
+
     task_type = None
     if isinstance(executor, type):
         if executor == PythonJob:
@@ -270,6 +275,8 @@ def clean_pickled_task_executor(tdata: Dict[str, Any]) -> None:
 
 def save_workgraph_data(node: Union[int, orm.Node], inputs: Dict[str, Any]) -> None:
     from aiida_workgraph.engine.workgraph import WorkGraphSpec
+    from aiida_workgraph.orm.workgraph import summarize_task_states
+    from node_graph.config import BUILTIN_TASKS
 
     inputs = shallow_copy_nested_dict(inputs)
     wgdata = inputs.pop(WorkGraphSpec.WORKGRAPH_DATA_KEY, {})
@@ -284,6 +291,7 @@ def save_workgraph_data(node: Union[int, orm.Node], inputs: Dict[str, Any]) -> N
         # clean pickled executor before save to database
         clean_pickled_task_executor(task)
     node.task_states = task_states
+    node.task_summary = summarize_task_states(task_states, exclude=BUILTIN_TASKS)
     node.task_processes = task_processes
     node.task_actions = task_actions
     node.workgraph_data = wgdata
@@ -347,6 +355,48 @@ def get_parent_workgraphs(pk: int) -> List[List[str, int]]:
     return parent_workgraphs
 
 
+def get_task_timings(task_timings: Optional[Dict[str, list]]) -> 'numpy.ndarray':
+    """Convert the ``task_timings`` attribute of a workgraph node to a NumPy structured array.
+
+    See :meth:`aiida_workgraph.WorkGraph.timings` for the fields.
+    """
+    import numpy as np
+    from aiida_workgraph.engine.metrics import TIMING_FIELDS, TIMING_PHASES
+
+    task_timings = task_timings or {}
+    width = max([len(name) for name in task_timings] + [1])
+    fields = TIMING_FIELDS + tuple(phase for phase, _, _ in TIMING_PHASES)
+    dtype = [('task', f'U{width}')] + [(field, 'f8') for field in fields]
+    array = np.full(len(task_timings), np.nan, dtype=dtype)
+    for i, (name, row) in enumerate(task_timings.items()):
+        array['task'][i] = name
+        for field, value in zip(TIMING_FIELDS, row):
+            if value is not None:
+                array[field][i] = value
+    for field, start, end in TIMING_PHASES:
+        array[field] = array[end] - array[start]
+    return array
+
+
+# the maximum number of UUIDs in the ``in`` filter of a single query
+NODES_INFO_CHUNK_SIZE = 500
+
+
+def get_nodes_info(uuids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Return the pk, process type, creation and modification time of the nodes, with one query per 500 nodes."""
+    uuids = list(dict.fromkeys(uuids))
+    info = {}
+    for start in range(0, len(uuids), NODES_INFO_CHUNK_SIZE):
+        qb = orm.QueryBuilder().append(
+            orm.Node,
+            filters={'uuid': {'in': uuids[start : start + NODES_INFO_CHUNK_SIZE]}},
+            project=['uuid', 'id', 'process_type', 'ctime', 'mtime'],
+        )
+        for uuid, pk, process_type, ctime, mtime in qb.iterall():
+            info[uuid] = {'pk': pk, 'process_type': process_type, 'ctime': ctime, 'mtime': mtime}
+    return info
+
+
 def get_processes_latest(
     pk: int, task_name: str = None, item_type: str = 'task'
 ) -> Dict[str, Dict[str, Union[int, str]]]:
@@ -375,15 +425,16 @@ def get_processes_latest(
         task_states = node.task_states
         task_processes = node.task_processes
         task_names = [task_name] if task_name else task_states.keys()
+        uuids = {name: get_serialized_node_uuid(task_processes.get(name, '')) for name in task_names}
+        nodes = get_nodes_info(uuid for uuid in uuids.values() if uuid)
         for name in task_names:
-            state = task_states[name]
-            task_process = deserialize_safe(task_processes.get(name, ''))
+            info = nodes.get(uuids[name], {})
             tasks[name] = {
-                'pk': task_process.pk if task_process else None,
-                'process_type': task_process.process_type if task_process else '',
-                'state': state,
-                'ctime': task_process.ctime if task_process else None,
-                'mtime': task_process.mtime if task_process else None,
+                'pk': info.get('pk'),
+                'process_type': info.get('process_type', ''),
+                'state': task_states[name],
+                'ctime': info.get('ctime'),
+                'mtime': info.get('mtime'),
             }
 
     return tasks
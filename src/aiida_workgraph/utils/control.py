@@ -1,16 +1,218 @@
 from __future__ import annotations
 
+import collections
 import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from aiida.manage import get_manager
 from aiida import orm
 from aiida.engine.processes import control
 
-from aiida_workgraph.enums import RuntimeInfoKey, TaskAction, TaskActionMessage, TaskState
+from aiida_workgraph.engine.change_feed import TASK_STATE_CHANGED_SUBJECT, TaskStateChange
+from aiida_workgraph.enums import TERMINAL_TASK_STATES, RuntimeInfoKey, TaskAction, TaskActionMessage, TaskState
 
 LOGGER = logging.getLogger(__name__)
 
 
+class StateChangeListener:
+    """Wake up a client when one of the watched processes changes its state.
+
+    The listener subscribes to the state change broadcasts of the processes. If the profile has no broker,
+    or the broker can not be reached, :meth:`wait` simply waits for the timeout, so the client polls.
+
+    The subscription is only made on the first call of :meth:`wait`, so that a client that does not need to wait
+    does not connect to the broker. Use it as a context manager, to remove the subscriber when the client stops waiting.
+    """
+
+    def __init__(self, pks: Iterable[int] = ()):
+        self.pks = {str(pk) for pk in pks if pk is not None}
+        self.event = threading.Event()
+        self._communicator = None
+        self._identifier: Optional[str] = None
+        self._tried = False
+        # the task state changes broadcast by the engines of the watched workgraphs
+        self.task_changes = collections.deque()
+
+    @property
+    def subscribed(self) -> bool:
+        return self._identifier is not None
+
+    def add(self, pks: Iterable[int]) -> None:
+        """Also watch the processes ``pks``, e.g. the processes of the tasks."""
+        self.pks.update(str(pk) for pk in pks if pk is not None)
+
+    def subscribe(self) -> None:
+        self._tried = True
+        manager = get_manager()
+        try:
+            if manager.get_broker() is None:
+                return
+            self._communicator = manager.get_communicator()
+            self._identifier = self._communicator.add_broadcast_subscriber(self._on_broadcast)
+        except Exception as exception:  # pylint: disable=broad-except
+            LOGGER.debug('Can not subscribe to the state changes of the processes, poll instead: %s', exception)
+            self._communicator = self._identifier = None
+
+    def unsubscribe(self) -> None:
+        if self._identifier is None:
+            return
+        try:
+            self._communicator.remove_broadcast_subscriber(self._identifier)
+        except Exception as exception:  # pylint: disable=broad-except
+            LOGGER.debug('Failed to remove the state change subscriber: %s', exception)
+        self._communicator = self._identifier = None
+
+    def _on_broadcast(self, _communicator, body, sender, subject, *_args, **_kwargs) -> None:
+        # called in the thread of the communicator
+        if not subject or str(sender) not in self.pks:
+            return
+        if subject == TASK_STATE_CHANGED_SUBJECT:
+            self.task_changes.extend(TaskStateChange(*change) for change in (body or {}).get('changes', []))
+            self.event.set()
+        elif str(subject).startswith('state_changed'):
+            self.event.set()
+
+    def pop_task_changes(self) -> List[TaskStateChange]:
+        changes = []
+        while self.task_changes:
+            changes.append(self.task_changes.popleft())
+        return changes
+
+    def wait(self, timeout: float) -> bool:
+        """Wait until a watched process changes its state, or for ``timeout`` seconds.
+
+        :return: True if a state change was received.
+        """
+        if not self._tried:
+            self.subscribe()
+            if self.subscribed:
+                # a state change may have been missed before the subscription, so the client should check again
+                return True
+        changed = self.event.wait(max(timeout, 0))
+        self.event.clear()
+        return changed
+
+    def __enter__(self) -> 'StateChangeListener':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.unsubscribe()
+
+
+class TaskStateWatcher:
+    """Return the state changes of the tasks of a workgraph.
+
+    The changes are taken from the change feed of the engine, see :class:`StateChangeListener`, and completed by
+    comparing the task states stored in the database, with a single query, with the states known to the watcher.
+    So no change is missed if a broadcast is lost, or the profile has no broker.
+    """
+
+    def __init__(self, pk: int, states: Optional[Dict[str, str]] = None):
+        """
+        :param pk: the pk of the workgraph process.
+        :param states: the task states known to the client, only the changes from these states are returned.
+        """
+        self.pk = pk
+        self.states = dict(states or {})
+        self.listener = StateChangeListener([pk])
+        self.process_state: Optional[str] = None
+        # the time of the last query of the task states
+        self.snapshot_time = 0.0
+
+    @property
+    def terminated(self) -> bool:
+        return self.process_state in ('finished', 'excepted', 'killed')
+
+    def poll(self) -> List[TaskStateChange]:
+        """Return the task state changes since the last poll."""
+        changes = []
+        for change in self.listener.pop_task_changes():
+            # a broadcast that arrives late must not move a task back, either to a state older than the last query,
+            # or out of a terminal state, the next query reads the actual state anyway
+            if change.timestamp <= self.snapshot_time or self.states.get(change.task_name) in TERMINAL_TASK_STATES:
+                continue
+            changes.extend(self._update(change.task_name, change.new_state, change.timestamp))
+        # the steps are broadcast after they are committed, so the query includes the changes received above
+        self.snapshot_time = time.time()
+        process_state, states = self._query()
+        self.process_state = process_state
+        for name, state in states.items():
+            changes.extend(self._update(name, state, self.snapshot_time))
+        return changes
+
+    def _update(self, name: str, state: str, timestamp: float) -> List[TaskStateChange]:
+        old_state = self.states.get(name)
+        if old_state == state:
+            return []
+        self.states[name] = state
+        return [TaskStateChange(name, old_state, state, timestamp)]
+
+    def _query(self) -> Tuple[Optional[str], Dict[str, str]]:
+        from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+        qb = orm.QueryBuilder().append(
+            WorkGraphNode,
+            filters={'id': self.pk},
+            project=['attributes.process_state', f'attributes.{WorkGraphNode.TASK_STATES_KEY}'],
+        )
+        result = qb.first()
+        if result is None:
+            return None, {}
+        return result[0], result[1] or {}
+
+    def wait(self, timeout: float) -> bool:
+        return self.listener.wait(timeout)
+
+    def __enter__(self) -> 'TaskStateWatcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.listener.unsubscribe()
+
+
+def list_task_states(pk: int) -> Optional[Dict]:
+    """Return the state and the process pk of every task of a workgraph, without loading the workgraph.
+
+    Only the runtime attributes are read, with one projection query, and the pks of the task processes
+    with one query per 500 tasks.
+
+    :return: a dictionary with the ``pk``, ``label`` and ``state`` of the workgraph and the list of ``tasks``,
+        or None if the node is not a workgraph.
+    """
+    from aiida_workgraph.orm.utils import get_serialized_node_uuid
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+    from aiida_workgraph.utils import get_nodes_info
+
+    qb = orm.QueryBuilder().append(
+        WorkGraphNode,
+        filters={'id': pk},
+        project=[
+            'attributes.process_label',
+            'attributes.process_state',
+            f'attributes.{WorkGraphNode.TASK_STATES_KEY}',
+            f'attributes.{WorkGraphNode.TASK_PROCESSES_KEY}',
+        ],
+    )
+    result = qb.first()
+    if result is None:
+        return None
+    label, process_state, task_states, task_processes = result
+    task_states, task_processes = task_states or {}, task_processes or {}
+    uuids = {name: get_serialized_node_uuid(task_processes.get(name, '')) for name in task_states}
+    nodes = get_nodes_info(uuid for uuid in uuids.values() if uuid)
+    return {
+        'pk': pk,
+        'label': label,
+        'state': (process_state or 'created').upper(),
+        'tasks': [
+            {'name': name, 'pk': nodes.get(uuids[name], {}).get('pk'), 'state': state}
+            for name, state in task_states.items()
+        ],
+    }
+
+
 def create_task_action(
     pk: int,
     tasks: list,
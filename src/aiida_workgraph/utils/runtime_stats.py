@@ -0,0 +1,183 @@
+"""Runtime statistics of the tasks of the finished workgraphs, e.g. for priority scheduling and simulation.
+
+The runtime of a task is taken from the process it launched: the ``mtime`` minus the ``ctime`` of the child process
+of a terminated ``WorkGraphNode``, whose call link label is the task name. Only the processes that finished with exit
+status 0 are counted. Tasks that run in the engine, e.g. ``Normal`` tasks, launch no process and have no statistics.
+
+The samples are grouped by task name and by process label, and cached in a JSON file in the AiiDA configuration
+directory, so that only the workgraphs that terminated since the last call are queried.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from aiida import orm
+from aiida.common.links import LinkType
+
+if TYPE_CHECKING:
+    import numpy
+
+LOGGER = logging.getLogger(__name__)
+
+RUNTIME_STATS_GROUP_BY = ('name', 'process_label')
+# the samples that are kept per task name or process label, the most recent ones
+MAX_SAMPLES = 1000
+RUNTIME_STATS_CACHE_VERSION = 1
+TERMINATED_PROCESS_STATES = ('finished', 'excepted', 'killed')
+STATISTICS = ('count', 'mean', 'std', 'min', 'median', 'p90', 'max')
+
+
+def get_default_cache_path() -> Path:
+    """Return the cache file of the current profile, in the AiiDA configuration directory."""
+    from aiida.manage import get_config, get_manager
+
+    profile = get_manager().get_profile()
+    return Path(get_config().dirpath) / 'workgraph_runtime_stats' / f'{profile.name}.json'
+
+
+class RuntimeStats:
+    """The runtime distributions of the tasks, per task name or process label.
+
+    :param by: group the runtimes by the task ``name`` or by the ``process_label`` of the launched process.
+    :param cache: the cache file, ``True`` for the default file of the profile, or ``False`` to query all workgraphs.
+    """
+
+    def __init__(self, by: str = 'name', cache: Union[bool, str, Path] = True):
+        if by not in RUNTIME_STATS_GROUP_BY:
+            raise ValueError(f'Invalid grouping `{by}`, valid values are: {", ".join(RUNTIME_STATS_GROUP_BY)}.')
+        self.by = by
+        if cache is True:
+            self.cache_path = get_default_cache_path()
+        else:
+            self.cache_path = Path(cache) if cache else None
+        self._data = self._load_cache()
+
+    def _empty(self) -> dict:
+        from aiida.manage import get_manager
+
+        return {
+            'version': RUNTIME_STATS_CACHE_VERSION,
+            'profile': get_manager().get_profile().uuid,
+            # all workgraphs up to the watermark are counted, and the terminated ones above it are listed
+            'watermark': 0,
+            'counted': [],
+            'samples': {by: {} for by in RUNTIME_STATS_GROUP_BY},
+        }
+
+    def _load_cache(self) -> dict:
+        empty = self._empty()
+        if self.cache_path is None or not self.cache_path.exists():
+            return empty
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as exception:
+            LOGGER.warning('Ignoring the runtime statistics cache %s: %s', self.cache_path, exception)
+            return empty
+        if data.get('version') != empty['version'] or data.get('profile') != empty['profile']:
+            return empty
+        return data
+
+    def _save_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_text(json.dumps(self._data), encoding='utf-8')
+        except OSError as exception:
+            LOGGER.warning('Failed to write the runtime statistics cache %s: %s', self.cache_path, exception)
+
+    def update(self) -> int:
+        """Add the runtimes of the workgraphs that terminated since the last update, return the number of samples."""
+        from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+        watermark, counted = self._data['watermark'], set(self._data['counted'])
+        # the watermark advances to just below the first workgraph that is still running, it is queried first so
+        # that a workgraph that terminates during the update is counted now or in the next update
+        qb = orm.QueryBuilder().append(
+            WorkGraphNode,
+            filters={'id': {'>': watermark}, 'attributes.process_state': {'!in': TERMINATED_PROCESS_STATES}},
+            project='id',
+        )
+        running = qb.order_by({WorkGraphNode: {'id': 'asc'}}).first(flat=True)
+        rows = query_task_runtimes(watermark, counted)
+        for wg_pk, name, process_label, duration in rows:
+            counted.add(wg_pk)
+            for by, key in zip(RUNTIME_STATS_GROUP_BY, (name, process_label)):
+                if key:
+                    self._data['samples'][by].setdefault(key, []).append(duration)
+        for samples in self._data['samples'].values():
+            for values in samples.values():
+                del values[:-MAX_SAMPLES]
+        watermark = running - 1 if running is not None else max(counted, default=watermark)
+        self._data['watermark'] = watermark
+        self._data['counted'] = sorted(pk for pk in counted if pk > watermark)
+        self._save_cache()
+        return len(rows)
+
+    @property
+    def samples(self) -> Dict[str, 'numpy.ndarray']:
+        """Return the runtimes in seconds per task name or process label, oldest first."""
+        import numpy as np
+
+        return {key: np.asarray(values, dtype='f8') for key, values in self._data['samples'][self.by].items()}
+
+    def summary(self) -> 'numpy.ndarray':
+        """Return the statistics of the runtimes as a NumPy structured array, one row per key, see ``STATISTICS``."""
+        import numpy as np
+
+        samples = self.samples
+        width = max([len(key) for key in samples] + [1])
+        array = np.zeros(len(samples), dtype=[('key', f'U{width}')] + [(name, 'f8') for name in STATISTICS])
+        for i, key in enumerate(sorted(samples)):
+            values = samples[key]
+            median, p90 = np.percentile(values, [50, 90])
+            array[i] = (key, len(values), values.mean(), values.std(), values.min(), median, p90, values.max())
+        return array
+
+    def durations(self, statistic: str = 'median') -> Dict[str, float]:
+        """Return one runtime per key, e.g. as the ``durations`` of :meth:`aiida_workgraph.WorkGraph.simulate`."""
+        if statistic not in STATISTICS[1:]:
+            raise ValueError(f'Invalid statistic `{statistic}`, valid values are: {", ".join(STATISTICS[1:])}.')
+        return {str(row['key']): float(row[statistic]) for row in self.summary()}
+
+
+def query_task_runtimes(after: int = 0, exclude: Optional[set] = None) -> List[Tuple[int, str, str, float]]:
+    """Return the ``(workgraph pk, task name, process label, runtime)`` of the finished processes of the tasks.
+
+    A single query over the terminated workgraphs with a pk larger than ``after`` and not in ``exclude``.
+    """
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    filters = {'id': {'>': after}, 'attributes.process_state': {'in': TERMINATED_PROCESS_STATES}}
+    if exclude:
+        filters['id']['!in'] = list(exclude)
+    qb = orm.QueryBuilder()
+    qb.append(WorkGraphNode, tag='workgraph', filters=filters, project='id')
+    qb.append(
+        orm.ProcessNode,
+        tag='process',
+        with_incoming='workgraph',
+        edge_tag='call',
+        edge_filters={'type': {'in': [LinkType.CALL_CALC.value, LinkType.CALL_WORK.value]}},
+        edge_project='label',
+        filters={'attributes.process_state': 'finished', 'attributes.exit_status': 0},
+        project=['attributes.process_label', 'ctime', 'mtime'],
+    )
+    qb.order_by({'workgraph': {'id': 'asc'}})
+    rows = []
+    for row in qb.iterdict():
+        process = row['process']
+        runtime = (process['mtime'] - process['ctime']).total_seconds()
+        rows.append((row['workgraph']['id'], row['call']['label'], process['attributes.process_label'], runtime))
+    return rows
+
+
+def get_runtime_stats(by: str = 'name', cache: Union[bool, str, Path] = True) -> RuntimeStats:
+    """Return the up-to-date runtime statistics of the tasks, see :class:`RuntimeStats`."""
+    stats = RuntimeStats(by=by, cache=cache)
+    stats.update()
+    return stats
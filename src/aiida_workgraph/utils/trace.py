@@ -0,0 +1,143 @@
+"""Export the task timings and engine steps of a workgraph run in the Chrome trace event format.
+
+The file can be opened in ``chrome://tracing`` or https://ui.perfetto.dev. Every workgraph, including the nested
+ones, is a process of the trace. Its tracks are the engine steps and, for the tasks, the concurrency pool the task
+belongs to, else the computer its process ran on, else ``engine`` for the tasks that ran in the engine and
+``processes`` for the other processes. Tasks that overlap in time are put on separate lanes of a track.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from aiida_workgraph.engine.metrics import TIMING_FIELDS, TIMING_PHASES
+from aiida_workgraph.engine.pools import task_matches_pool
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from aiida_workgraph import WorkGraph
+
+ENGINE_TRACK = 'engine'
+PROCESSES_TRACK = 'processes'
+STEPS_TRACK = 'engine steps'
+
+
+def get_task_track(wg: 'WorkGraph', name: str) -> str:
+    """Return the track of a task: its first concurrency pool, the computer of its process, or the engine."""
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    task = wg.tasks[name] if name in wg.tasks else None
+    if task is None:
+        return ENGINE_TRACK
+    for pool_name, pool in wg.concurrency_pools.items():
+        if task_matches_pool(task, pool):
+            return f'pool: {pool_name}'
+    process = task.process
+    if process is None or isinstance(process, WorkGraphNode):
+        return ENGINE_TRACK if process is None else PROCESSES_TRACK
+    computer = getattr(process, 'computer', None)
+    return f'computer: {computer.label}' if computer is not None else PROCESSES_TRACK
+
+
+def build_trace(wg: 'WorkGraph') -> Dict[str, Any]:
+    """Return the trace of a workgraph that was run, as a dictionary in the Chrome trace event format."""
+    events: List[Dict[str, Any]] = []
+    _add_workgraph_events(wg, events, parent=None, sort_index=0)
+    # the timestamps are relative to the first event, in microseconds
+    origin = min((event['ts'] for event in events if 'ts' in event), default=0)
+    for event in events:
+        if 'ts' in event:
+            event['ts'] = round((event['ts'] - origin) * 1e6, 1)
+            if 'dur' in event:
+                event['dur'] = round(event['dur'] * 1e6, 1)
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_trace(wg: 'WorkGraph', path: Union[str, 'Path']) -> None:
+    """Write the trace of a workgraph that was run to a JSON file, see :func:`build_trace`."""
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(build_trace(wg), handle)
+
+
+def _add_workgraph_events(wg: 'WorkGraph', events: List[dict], parent: Optional[str], sort_index: int) -> int:
+    """Add the events of a workgraph and its nested workgraphs, return the next free sort index."""
+    from aiida_workgraph import WorkGraph
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    node = wg.process
+    pid = node.pk
+    label = f'{node.process_label} <{pid}>' + (f' in task {parent}' if parent else '')
+    events.append(_metadata('process_name', pid, None, {'name': label}))
+    events.append(_metadata('process_sort_index', pid, None, {'sort_index': sort_index}))
+    sort_index += 1
+
+    lanes = _Lanes(pid, events)
+    for start, duration in node.engine_steps or []:
+        events.append(_span('step', 'engine', pid, lanes.tid(STEPS_TRACK, start, start + duration), start, duration))
+
+    nested = []
+    for name, row in sorted((node.task_timings or {}).items(), key=lambda item: _first(item[1])):
+        timestamps = {field: value for field, value in zip(TIMING_FIELDS, row) if value is not None}
+        if not timestamps:
+            continue
+        start, end = min(timestamps.values()), max(timestamps.values())
+        task = wg.tasks[name] if name in wg.tasks else None
+        process = task.process if task is not None else None
+        args = {'state': node.get_task_state(name)}
+        if process is not None:
+            args['pk'] = process.pk
+        tid = lanes.tid(get_task_track(wg, name), start, end)
+        events.append(_span(name, 'task', pid, tid, start, end - start, args))
+        for phase, first, second in TIMING_PHASES:
+            if first in timestamps and second in timestamps:
+                duration = timestamps[second] - timestamps[first]
+                events.append(_span(phase, 'phase', pid, tid, timestamps[first], duration))
+        if isinstance(process, WorkGraphNode):
+            nested.append((name, process))
+
+    for name, process in nested:
+        sort_index = _add_workgraph_events(WorkGraph.load(process), events, parent=name, sort_index=sort_index)
+    return sort_index
+
+
+class _Lanes:
+    """Assign the spans of a track to lanes, i.e. trace threads, so that the spans of a lane do not overlap."""
+
+    def __init__(self, pid: int, events: List[dict]):
+        self.pid = pid
+        self.events = events
+        self.ends: Dict[str, List[float]] = {}
+        self.tids: Dict[tuple, int] = {}
+
+    def tid(self, track: str, start: float, end: float) -> int:
+        ends = self.ends.setdefault(track, [])
+        lane = next((i for i, lane_end in enumerate(ends) if lane_end <= start), len(ends))
+        if lane == len(ends):
+            ends.append(end)
+            tid = self.tids[(track, lane)] = len(self.tids) + 1
+            name = track if lane == 0 else f'{track} #{lane + 1}'
+            self.events.append(_metadata('thread_name', self.pid, tid, {'name': name}))
+            self.events.append(_metadata('thread_sort_index', self.pid, tid, {'sort_index': tid}))
+        ends[lane] = end
+        return self.tids[(track, lane)]
+
+
+def _first(row: list) -> float:
+    return min((value for value in row if value is not None), default=math.inf)
+
+
+def _span(name: str, cat: str, pid: int, tid: int, start: float, duration: float, args: Optional[dict] = None):
+    event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': pid, 'tid': tid, 'ts': start, 'dur': max(duration, 0)}
+    if args:
+        event['args'] = args
+    return event
+
+
+def _metadata(name: str, pid: int, tid: Optional[int], args: dict) -> Dict[str, Any]:
+    event = {'name': name, 'ph': 'M', 'pid': pid, 'args': args}
+    if tid is not None:
+        event['tid'] = tid
+    return event
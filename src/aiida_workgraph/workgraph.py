@@ -6,13 +6,21 @@ import aiida
 from aiida_workgraph.task import Task
 from aiida_workgraph.enums import TaskAction, TaskState
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 from .registry import RegistryHub, registry_hub
 from node_graph.analysis import GraphAnalysis
 from node_graph.config import BUILTIN_TASKS
 from node_graph.socket import BaseSocket, TaskSocketNamespace
 from aiida_workgraph.socket_spec import SocketSpecAPI
 from node_graph.error_handler import ErrorHandlerSpec
+from aiida_workgraph.engine.change_feed import TaskStateChange
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import numpy
+
+    from aiida_workgraph.engine.simulator import SimulationResult
 
 LOGGER = logging.getLogger(__name__)
 
@@ -69,6 +77,28 @@ class WorkGraph(node_graph.Graph):
         self.restart_process = None
         self.max_number_jobs = 1000000
         self.max_iteration = 1000000
+        # number of threads used to run independent Normal tasks, 1 means serial execution
+        self.max_inline_workers = 1
+        # run coroutine tasks as asyncio tasks in the loop of the engine, instead of submitting them
+        self.inline_coroutines = False
+        # maximum number of coroutines running at the same time in the loop, 0 means no limit
+        self.max_inline_coroutines = 0
+        # named concurrency pools, see `add_concurrency_pool`
+        self.concurrency_pools = {}
+        # share `max_number_jobs` with the child workgraphs, so that the whole process tree respects it
+        self.shared_job_budget = False
+        # name of a job quota that is shared with all the WorkGraphs of the profile, see `set_job_quota`
+        self.job_quota = None
+        # maximum number of processes submitted per second, and how many can be submitted at once
+        self.max_submit_rate = None
+        self.submit_burst = None
+        # how routine messages, e.g. that a task finished, are reported: 'report', 'debug' or 'summary'
+        self.routine_reports = 'report'
+        # opt-in: commit the storage writes of an engine step in one transaction, see `engine.transaction`
+        self.step_transaction = False
+        # profile the engine: False, True to store the profile in the extras of the node, or a directory in which
+        # the profile is also written, see `engine.profiler.EngineProfiler`
+        self.profiling = False
         self._error_handlers = error_handlers or {}
         self.analyzer = GraphAnalysis(self)
 
@@ -247,6 +277,17 @@ class WorkGraph(node_graph.Graph):
                 'restart_process': self.restart_process.pk if self.restart_process else None,
                 'max_iteration': self.max_iteration,
                 'max_number_jobs': self.max_number_jobs,
+                'max_inline_workers': self.max_inline_workers,
+                'inline_coroutines': self.inline_coroutines,
+                'max_inline_coroutines': self.max_inline_coroutines,
+                'concurrency_pools': self.concurrency_pools,
+                'shared_job_budget': self.shared_job_budget,
+                'job_quota': self.job_quota,
+                'max_submit_rate': self.max_submit_rate,
+                'submit_burst': self.submit_burst,
+                'routine_reports': self.routine_reports,
+                'step_transaction': self.step_transaction,
+                'profiling': self.profiling,
             }
         )
         # save error handlers
@@ -259,16 +300,22 @@ class WorkGraph(node_graph.Graph):
 
     def wait(self, timeout: int = 600, tasks: dict = None, interval: int = 5) -> None:
         """
-        Periodically checks and waits for the AiiDA workgraph process to finish until a given timeout.
+        Waits for the AiiDA workgraph process to finish until a given timeout.
+
+        The process and the processes of its tasks are watched through their state change broadcasts,
+        so the method returns as soon as the workgraph finishes. The state is also polled every ``interval``
+        seconds, e.g. for the tasks that do not run a process, or if the profile has no broker.
 
         Args:
             timeout (int): The maximum time in seconds to wait for the process to finish. Defaults to 600.
             tasks (dict): Optional; specifies task states to wait for in the format {task_name: [acceptable_states]}.
-            interval (int): The time interval in seconds between checks. Defaults to 5.
+            interval (int): The time interval in seconds between two polls. Defaults to 5.
 
         Raises:
             TimeoutError: If the process does not finish within the given timeout.
         """
+        from aiida_workgraph.utils.control import StateChangeListener
+
         terminating_states = (
             'KILLED',
             'PAUSED',
@@ -278,37 +325,157 @@ class WorkGraph(node_graph.Graph):
             'EXCEPTED',
         )
         start = time.time()
-        self.update()
-        finished = False
 
-        while not finished:
-            self.update()
+        with StateChangeListener([self.pk]) as listener:
+            while True:
+                self.update()
+                listener.add(task.pk for task in self.tasks)
 
-            if tasks is not None:
-                states = []
-                for name, value in tasks.items():
-                    flag = self.tasks[name].state in value
-                    states.append(flag)
-                finished = all(states)
-            else:
-                finished = self.state in terminating_states
+                if tasks is not None:
+                    finished = all(self.tasks[name].state in value for name, value in tasks.items())
+                else:
+                    finished = self.state in terminating_states
+
+                if finished:
+                    LOGGER.info('Process %s finished with state: %s', self.process.pk, self.state)
+                    return
+
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f'Timeout reached after {timeout} seconds while waiting for the WorkGraph: {self.process.pk}. '
+                    )
+                listener.wait(min(interval, remaining))
+
+    def timings(self) -> 'numpy.ndarray':
+        """
+        Return the timings of the tasks, recorded by the engine, as a NumPy structured array.
+
+        Every row has the ``task`` name, the UNIX timestamps ``ready``, ``started``, ``launched``, ``finished`` and
+        ``applied``, see :class:`~aiida_workgraph.engine.metrics.TaskTimings`, and the durations in seconds:
+
+        - ``wait``: from ready to started, the time waiting for a slot.
+        - ``launch``: from started to launched, preparing the inputs and submitting the process.
+        - ``run``: from launched to finished, the run time of the process.
+        - ``react``: from finished to applied, the time the engine took to react.
+
+        Missing values are NaN. ``pandas.DataFrame(wg.timings())`` converts the array to a data frame.
+        """
+        from aiida_workgraph.utils import get_task_timings
+
+        return get_task_timings(self.process.task_timings if self.process is not None else None)
+
+    def simulate(
+        self,
+        durations: Optional[Dict[str, Any]] = None,
+        default_duration: Any = 0.0,
+        outcomes: Optional[Dict[str, Any]] = None,
+    ) -> 'SimulationResult':
+        """
+        Predict the makespan, peak concurrency, utilization of the job slots and critical path of the workgraph,
+        without running it.
+
+        The readiness logic of the engine is replayed in virtual time, with ``max_number_jobs`` and the concurrency
+        pools, see :func:`~aiida_workgraph.engine.simulator.simulate_workgraph` for the arguments.
+
+        Args:
+            durations (dict): The duration in seconds per task name or identifier, or a function of the task.
+            default_duration (float): The duration of the other tasks.
+            outcomes (dict): The iterations of the While zones, the If zones that run, and the items of the Map zones.
+        """
+        from aiida_workgraph.engine.simulator import simulate_workgraph
+
+        return simulate_workgraph(self, durations, default_duration, outcomes)
+
+    def export_trace(self, path: Union[str, Path]) -> None:
+        """
+        Write the task timings and engine steps of the workgraph process to ``path`` in the Chrome trace event
+        format, to be opened in ``chrome://tracing`` or https://ui.perfetto.dev.
+
+        Every workgraph, including the nested ones, is a process of the trace. Its tracks are the engine steps
+        and the concurrency pools, or else the computers, of the tasks. A task span is split in the phases
+        ``wait``, ``launch``, ``run`` and ``react``, see :meth:`timings`.
+        """
+        from aiida_workgraph.utils.trace import export_trace
+
+        if self.process is None:
+            raise ValueError('The workgraph has no process, run or submit it first.')
+        export_trace(self, path)
 
-            if finished:
-                LOGGER.info('Process %s finished with state: %s', self.process.pk, self.state)
-                return
+    def watch(self, timeout: Optional[float] = None, interval: float = 5) -> Iterator[TaskStateChange]:
+        """
+        Yield the state changes of the tasks, as ``(task_name, old_state, new_state, timestamp)`` tuples,
+        until the workgraph process terminates.
+
+        The changes are received from the change feed that the engine broadcasts after every step, and the stored
+        task states are checked every ``interval`` seconds, so no change is missed without a broker.
+        Only the state of the tasks is updated, use :meth:`update` to load their processes and outputs.
+
+        Args:
+            timeout (float): Optional; the maximum time in seconds to watch the workgraph.
+            interval (float): The time interval in seconds between two checks of the stored states. Defaults to 5.
 
-            time.sleep(interval)
+        Raises:
+            TimeoutError: If the process does not terminate within the given timeout.
+        """
+        from aiida_workgraph.utils.control import TaskStateWatcher
 
-            if time.time() - start > timeout:
-                raise TimeoutError(
-                    f'Timeout reached after {timeout} seconds while waiting for the WorkGraph: {self.process.pk}. '
-                )
+        if self.process is None:
+            return
+        start = time.time()
+        with TaskStateWatcher(self.pk, self._get_watched_states()) as watcher:
+            while True:
+                for change in watcher.poll():
+                    self._apply_task_state_change(change)
+                    yield change
+                if watcher.terminated:
+                    self.state = watcher.process_state.upper()
+                    return
+                watcher.wait(self._get_watch_wait_time(start, timeout, interval))
+
+    async def watch_async(self, timeout: Optional[float] = None, interval: float = 5) -> AsyncIterator[TaskStateChange]:
+        """The asyncio variant of :meth:`watch`, the waiting between two checks does not block the event loop."""
+        import asyncio
+        from aiida_workgraph.utils.control import TaskStateWatcher
+
+        if self.process is None:
+            return
+        start = time.time()
+        with TaskStateWatcher(self.pk, self._get_watched_states()) as watcher:
+            while True:
+                for change in watcher.poll():
+                    self._apply_task_state_change(change)
+                    yield change
+                if watcher.terminated:
+                    self.state = watcher.process_state.upper()
+                    return
+                await asyncio.to_thread(watcher.wait, self._get_watch_wait_time(start, timeout, interval))
+
+    def _get_watched_states(self) -> Dict[str, str]:
+        return {task.name: task.state for task in self.tasks}
+
+    def _get_watch_wait_time(self, start: float, timeout: Optional[float], interval: float) -> float:
+        if timeout is None:
+            return interval
+        remaining = timeout - (time.time() - start)
+        if remaining <= 0:
+            raise TimeoutError(f'Timeout reached after {timeout} seconds while watching the WorkGraph: {self.pk}.')
+        return min(interval, remaining)
+
+    def _apply_task_state_change(self, change: TaskStateChange) -> None:
+        """Apply a state change to the task and to the widget, the mapped tasks are not in the workgraph."""
+        if change.task_name in self.tasks:
+            self.tasks[change.task_name].state = change.new_state
+        if self.widget is not None:
+            self.widget.states = {**(self.widget.states or {}), change.task_name: change.new_state}
 
     def update(self) -> None:
         """
         Update the current state and primary key of the process node as well as the state, node and primary key
         of the tasks that are outgoing from the process node. This includes updating the state of process nodes
         linked to the current process, and data nodes linked to the current process.
+
+        Only the tasks whose state, process or modification time changed since the last update are refreshed.
         """
         from aiida_workgraph.utils import get_processes_latest, resolve_node_link_managers
 
@@ -321,11 +488,19 @@ class WorkGraph(node_graph.Graph):
             # the mapped tasks are not in the workgraph
             if name not in self.tasks:
                 continue
-            self.tasks[name].update_state(data)
+            task = self.tasks[name]
+            if (task.state, task.pk, getattr(task, 'mtime', None)) == (data['state'], data['pk'], data['mtime']):
+                continue
+            task.update_state(data)
 
         if self.widget is not None:
-            states = {name: data['state'] for name, data in processes_data.items()}
-            self.widget.states = states
+            # only send the states that changed to the widget
+            states = self.widget.states or {}
+            changed = {
+                name: data['state'] for name, data in processes_data.items() if states.get(name) != data['state']
+            }
+            if changed:
+                self.widget.states = {**states, **changed}
 
         if self.process.is_finished_ok:
             self.outputs._set_socket_value(resolve_node_link_managers(self.process.outputs))
@@ -340,6 +515,17 @@ class WorkGraph(node_graph.Graph):
         for key in [
             'max_iteration',
             'max_number_jobs',
+            'max_inline_workers',
+            'inline_coroutines',
+            'max_inline_coroutines',
+            'concurrency_pools',
+            'shared_job_budget',
+            'job_quota',
+            'max_submit_rate',
+            'submit_burst',
+            'routine_reports',
+            'step_transaction',
+            'profiling',
             'connectivity',
         ]:
             if key in wgdata:
@@ -540,6 +726,33 @@ class WorkGraph(node_graph.Graph):
                 continue
             self.links._append(link)
 
+    def add_concurrency_pool(
+        self,
+        name: str,
+        limit: Optional[int] = None,
+        computer: Optional[str] = None,
+        task_type: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> None:
+        """Limit the number of running jobs of the tasks that match all the given selectors.
+
+        Each pool is respected independently of the others and of ``max_number_jobs``.
+
+        Args:
+            name (str): The name of the pool.
+            limit (int, optional): The maximum number of running jobs, ``None`` means no limit.
+            computer (str, optional): Select the tasks that run on the computer with this label.
+            task_type (str, optional): Select the tasks of this type, e.g. ``CALCJOB``.
+            tag (str, optional): Select the tasks with this ``tag``.
+        """
+        selectors = {'computer': computer, 'task_type': task_type.upper() if task_type else None, 'tag': tag}
+        selectors = {key: value for key, value in selectors.items() if value is not None}
+        if not selectors:
+            raise ValueError(f'Concurrency pool {name} needs at least one of: computer, task_type or tag.')
+        if limit is not None and limit < 0:
+            raise ValueError(f'The limit of concurrency pool {name} must be a non-negative integer, got {limit}.')
+        self.concurrency_pools[name] = {'limit': limit, **selectors}
+
     def get_error_handlers(self) -> Dict[str, ErrorHandlerSpec]:
         """Get the error handlers."""
         return self._error_handlers
@@ -108,6 +108,36 @@ def decorated_normal_add() -> Callable:
     return add
 
 
+def _add_one(x):
+    return x + 1
+
+
+@pytest.fixture
+def normal_task() -> Callable:
+    """Return a function that builds a Normal task of a function, it runs in the engine without a broker.
+
+    Without a function, the task adds one to its input ``x``.
+    """
+    from aiida_workgraph import Task
+    from aiida_workgraph.task import TaskHandle
+    from node_graph.executor import RuntimeExecutor
+    from node_graph.task_spec import TaskSpec
+
+    def build(function: Callable = _add_one) -> TaskHandle:
+        names = function.__code__.co_varnames[: function.__code__.co_argcount]
+        spec = TaskSpec(
+            identifier=function.__name__.strip('_'),
+            task_type='Normal',
+            inputs=namespace(**{name: Any for name in names}),
+            outputs=namespace(result=Any),
+            executor=RuntimeExecutor.from_callable(function),
+            base_class=Task,
+        )
+        return TaskHandle(spec)
+
+    return build
+
+
 @pytest.fixture
 def decorated_add() -> Callable:
     """Generate a decorated node for test."""
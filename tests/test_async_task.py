@@ -19,3 +19,48 @@ def test_async_decorator(decorated_add):
     assert add1.outputs.result.value == 4
     report = get_workchain_report(wg.process, 'REPORT')
     assert 'Waiting for child processes: ' in report
+
+
+def test_inline_coroutines():
+    """Coroutine tasks run in the loop of the engine, limited by the semaphore."""
+    import time
+
+    @task()
+    async def sleep_and_time(t):
+        start = time.time()
+        await asyncio.sleep(t)
+        return start
+
+    wg = WorkGraph(name='test_inline_coroutines')
+    for i in range(3):
+        wg.add_task(sleep_and_time, f'sleep{i}', t=0.5)
+    wg.inline_coroutines = True
+    wg.max_inline_coroutines = 2
+    wg.run()
+    assert wg.process.is_finished_ok
+    starts = sorted(wg.tasks[f'sleep{i}'].outputs.result.value.value for i in range(3))
+    # two coroutines start together, the third one waits for a free slot
+    assert starts[1] - starts[0] < 0.4
+    assert starts[2] - starts[0] >= 0.4
+    # the provenance is still recorded
+    assert wg.tasks.sleep0.process.is_finished_ok
+    assert wg.tasks.sleep0.process.caller.pk == wg.process.pk
+
+
+def test_inline_coroutine_cancelled():
+    """A cancelled in-loop process fails its task, instead of leaving the workgraph waiting for it."""
+
+    @task()
+    async def cancel_self():
+        # the asyncio task of an in-loop process is named after the task
+        for asyncio_task in asyncio.all_tasks():
+            if asyncio_task.get_name() == 'cancel_self':
+                asyncio_task.cancel()
+        await asyncio.sleep(1)
+
+    wg = WorkGraph(name='test_inline_coroutine_cancelled')
+    wg.add_task(cancel_self, 'cancel_self')
+    wg.inline_coroutines = True
+    wg.run()
+    assert wg.tasks.cancel_self.state == 'FAILED'
+    assert wg.tasks.cancel_self.process.is_killed
@@ -7,6 +7,18 @@ from aiida_workgraph import task
 AddTask = task(ArithmeticAddCalculation)
 
 
+@pytest.fixture(autouse=True)
+def restore_logging():
+    """Restore the logging after a ``verdi`` command, which removes the handler that stores the process reports."""
+    from aiida.common import log
+
+    yield
+    if log.CLI_ACTIVE:
+        log.CLI_ACTIVE = None
+        log.CLI_LOG_LEVEL = None
+        log.configure_logging(with_orm=True)
+
+
 @task.graph
 def add_graph(x, y, code):
     return AddTask(code=code, x=x, y=y, metadata={'options': {'sleep': 15}}).sum
@@ -97,3 +109,159 @@ def test_task_list(add_code, capsys):
     result = cli_runner.invoke(workgraph, ['task', 'list', str(wg.pk)])
     assert result.exit_code == 0, result.exception
     assert 'ArithmeticAddCalculation        PLANNED' in result.output
+
+
+def _run_add_one_graph(normal_task, name, ntasks=3, pools=None):
+    """Run a workgraph of Normal tasks, which runs without a broker."""
+    from aiida import orm
+    from aiida_workgraph import WorkGraph
+
+    add_one = normal_task()
+    wg = WorkGraph(name)
+    for i in range(ntasks):
+        wg.add_task(add_one, name=f'task{i}', x=orm.Int(i))
+    for pool_name, pool in (pools or {}).items():
+        wg.add_concurrency_pool(pool_name, **pool)
+    wg.run()
+    return wg
+
+
+def test_task_list_options(normal_task):
+    import json
+
+    wg = _run_add_one_graph(normal_task, 'test_task_list_options')
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['task', 'list', str(wg.pk), '--json', '--state', 'finished'])
+    assert result.exit_code == 0, result.exception
+    data = json.loads(result.output)
+    assert data['state'] == 'FINISHED'
+    tasks = {task['name']: task for task in data['tasks']}
+    assert {'task0', 'task1', 'task2'}.issubset(tasks)
+    assert tasks['task0']['pk'] == wg.tasks.task0.pk
+    result = cli_runner.invoke(workgraph, ['task', 'list', str(wg.pk), '--watch'])
+    assert result.exit_code == 0, result.exception
+    assert 'task1' in result.output
+
+
+def test_quota():
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['quota', 'set', 'test_cli_quota', '3'])
+    assert result.exit_code == 0, result.exception
+    result = cli_runner.invoke(workgraph, ['quota', 'show', 'test_cli_quota'])
+    assert result.exit_code == 0, result.exception
+    assert 'Job quota test_cli_quota: 0/3 slots in use.' in result.output
+    result = cli_runner.invoke(workgraph, ['quota', 'reclaim', 'test_cli_quota'])
+    assert result.exit_code == 0, result.exception
+
+
+def test_workgraph_list(normal_task):
+    wg = _run_add_one_graph(normal_task, 'test_workgraph_list')
+    assert wg.process.task_summary['counts'] == {'FINISHED': 3}
+    assert wg.process.task_summary['total'] == 3
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['list', '--all', '--task-state', 'finished', '--order-by', 'updated'])
+    assert result.exit_code == 0, result.exception
+    line = next(line for line in result.output.splitlines() if line.split()[:1] == [str(wg.pk)])
+    assert '3/3' in line
+    assert 'FINISHED: 3' in line
+    result = cli_runner.invoke(workgraph, ['list', '--all', '--task-state', 'failed', '--order-by', 'FAILED'])
+    assert result.exit_code == 0, result.exception
+    assert not any(line.split()[:1] == [str(wg.pk)] for line in result.output.splitlines())
+
+
+def test_workgraph_top(normal_task):
+    wg = _run_add_one_graph(normal_task, 'test_workgraph_top')
+    metrics = wg.process.engine_metrics
+    assert metrics['steps'] >= 1
+    assert metrics['running'] == 0
+    assert metrics['step_time'] > 0
+    # the recorded steps are written when the engine terminates
+    assert len(wg.process.engine_steps) == metrics['steps']
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['top', '--once'])
+    assert result.exit_code == 0, result.exception
+    assert 'Fin/min' in result.output
+
+
+def test_task_timings(normal_task):
+    import numpy as np
+
+    wg = _run_add_one_graph(normal_task, 'test_task_timings')
+    timings = wg.timings()
+    row = timings[timings['task'] == 'task1'][0]
+    assert row['ready'] <= row['started'] <= row['launched'] <= row['applied']
+    assert np.isfinite(row['run'])
+    assert row['react'] >= 0
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['task', 'timings', str(wg.pk)])
+    assert result.exit_code == 0, result.exception
+    assert 'task1' in result.output
+    assert 'Total' in result.output
+
+
+def test_task_timings_flush():
+    """Only the rows of the changed tasks are written, each under its own attribute key."""
+    from types import SimpleNamespace
+    from aiida_workgraph.engine.metrics import TaskTimings
+    from aiida_workgraph.orm.workgraph import WorkGraphNode
+
+    node = WorkGraphNode().store()
+    timings = TaskTimings(SimpleNamespace(node=node))
+    timings.record('task1', ready=1.0)
+    timings.record('task2', ready=2.0)
+    timings.flush()
+    timings.record('task1', started=3.0)
+    timings.flush()
+    assert node.get_task_timing('task1') == [1.0, 3.0, None, None, None]
+    assert node.base.attributes.get('task_timings:task2') == [2.0, None, None, None, None]
+    assert node.task_timings == {'task1': [1.0, 3.0, None, None, None], 'task2': [2.0, None, None, None, None]}
+    # a task that is ready again starts a new row
+    timings.record('task1', ready=4.0)
+    timings.flush()
+    assert node.get_task_timing('task1') == [4.0, None, None, None, None]
+
+
+def test_task_trace(tmp_path, normal_task):
+    import json
+
+    wg = _run_add_one_graph(normal_task, 'test_task_trace', pools={'add': {'limit': 2, 'task_type': 'NORMAL'}})
+    assert len(wg.process.engine_steps) > 0
+    output = tmp_path / 'trace.json'
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['task', 'trace', str(wg.pk), str(output)])
+    assert result.exit_code == 0, result.exception
+    events = json.loads(output.read_text())['traceEvents']
+    threads = {event['tid']: event['args']['name'] for event in events if event['name'] == 'thread_name'}
+    tasks = {event['name']: event for event in events if event.get('cat') == 'task'}
+    assert set(tasks) >= {'task0', 'task1', 'task2'}
+    assert threads[tasks['task0']['tid']].startswith('pool: add')
+    assert any(event['name'] == 'step' for event in events)
+    assert any(event['name'] == 'run' and event['tid'] == tasks['task0']['tid'] for event in events)
+    assert all(event['ts'] >= 0 and event['dur'] >= 0 for event in events if event['ph'] == 'X')
+
+
+def test_task_stats(decorated_add, tmp_path):
+    import json
+
+    from aiida_workgraph import WorkGraph
+    from aiida_workgraph.utils.runtime_stats import RuntimeStats
+
+    wg = WorkGraph('test_task_stats')
+    wg.add_task(decorated_add, name='stats_add1', x=1, y=2, t=0)
+    wg.add_task(decorated_add, name='stats_add2', x=wg.tasks.stats_add1.outputs.result, y=2, t=0)
+    wg.run()
+    cache = tmp_path / 'stats.json'
+    stats = RuntimeStats(cache=cache)
+    assert stats.update() >= 2
+    assert len(stats.samples['stats_add1']) == 1
+    assert stats.durations()['stats_add2'] >= 0
+    # the cached statistics are updated with the new workgraphs only
+    assert RuntimeStats(cache=cache).update() == 0
+    assert 'stats_add1' in RuntimeStats(cache=cache).samples
+    cli_runner = CliRunner()
+    result = cli_runner.invoke(workgraph, ['task', 'stats', 'stats_add1', '--no-cache', '--json'])
+    assert result.exit_code == 0, result.exception
+    assert json.loads(result.output)['stats_add1']['count'] == 1
+    result = cli_runner.invoke(workgraph, ['task', 'stats', '--by', 'process_label', '--no-cache'])
+    assert result.exit_code == 0, result.exception
+    assert 'add' in result.output
@@ -1,6 +1,7 @@
+import re
 import time
 import pytest
-from aiida_workgraph import WorkGraph
+from aiida_workgraph import Task, WorkGraph
 from aiida.cmdline.utils.common import get_workchain_report
 
 
@@ -51,3 +52,228 @@ def test_max_number_jobs(add_code) -> None:
     report = get_workchain_report(wg.process, 'REPORT')
     assert 'tasks ready to run: add2' in report
     wg.tasks.add2.outputs.sum.value == 2
+
+
+def _current_thread_name(x):
+    import threading
+
+    time.sleep(0.2)
+    return f'{threading.current_thread().name}-{x}'
+
+
+def test_max_inline_workers(normal_task) -> None:
+    """Independent Normal tasks are executed in the inline worker pool,
+    and their results are applied in order."""
+    current_thread_name = normal_task(_current_thread_name)
+    wg = WorkGraph('test_max_inline_workers')
+    for i in range(4):
+        wg.add_task(current_thread_name, name=f'task{i}', x=i)
+    wg.max_inline_workers = 4
+    wg.run()
+    report = get_workchain_report(wg.process, 'REPORT')
+    finished = [line.split('Task: ')[1].split(' ')[0] for line in report.splitlines() if 'finished.' in line]
+    assert finished == ['task0', 'task1', 'task2', 'task3']
+    node = wg.process
+    assert node.base.attributes.get('workgraph_data')['max_inline_workers'] == 4
+
+
+def test_bulk_launch(add_code) -> None:
+    """Many ready process tasks are launched in one transaction."""
+    from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+    from aiida_workgraph.engine.task_manager import BULK_LAUNCH_MIN_TASKS
+
+    wg = WorkGraph('test_bulk_launch')
+    for i in range(BULK_LAUNCH_MIN_TASKS):
+        wg.add_task(ArithmeticAddCalculation, name=f'add{i}', x=i, y=1, code=add_code)
+    wg.run()
+    assert wg.process.is_finished_ok
+    report = get_workchain_report(wg.process, 'REPORT')
+    assert f'Launched {BULK_LAUNCH_MIN_TASKS} tasks in bulk.' in report
+    assert [wg.tasks[f'add{i}'].outputs.sum.value for i in range(BULK_LAUNCH_MIN_TASKS)] == list(
+        range(1, BULK_LAUNCH_MIN_TASKS + 1)
+    )
+
+
+@pytest.mark.parametrize('mode', ['report', 'debug', 'summary'])
+def test_routine_reports(mode, normal_task) -> None:
+    """Routine messages are reported, logged at DEBUG or summarized per step."""
+    from aiida import orm
+
+    add_one = normal_task()
+    wg = WorkGraph(f'test_routine_reports_{mode}')
+    wg.add_task(add_one, name='task1', x=1)
+    wg.add_task(add_one, name='task2', x=2)
+    wg.routine_reports = mode
+    wg.run()
+    report = get_workchain_report(wg.process, 'REPORT')
+    assert ('Task: task1 finished.' in report) == (mode == 'report')
+    assert (re.search(r'Step summary: \d+ ready tasks, 2 tasks finished.', report) is not None) == (mode == 'summary')
+    assert 'Finalize workgraph.' in report
+    # the buffered reports keep the location of their caller
+    logs = orm.Log.collection.get_logs_for(wg.process)
+    finalize = next(log for log in logs if 'Finalize workgraph.' in log.message)
+    assert finalize.metadata['funcName'] == 'finalize'
+    assert finalize.metadata['pathname'].endswith('workgraph.py')
+
+
+def test_step_transaction(normal_task) -> None:
+    """The writes of a step are committed together, so there are fewer commits per task."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    add_one = normal_task()
+    # the step transaction is opt-in
+    assert WorkGraph('test_step_transaction').step_transaction is False
+    commits = {}
+    for step_transaction in (False, True):
+        wg = WorkGraph(f'test_step_transaction_{step_transaction}')
+        for i in range(10):
+            wg.add_task(add_one, name=f'task{i}', x=i)
+        wg.step_transaction = step_transaction
+        counter = []
+
+        def on_commit(session):
+            counter.append(1)
+
+        event.listen(Session, 'after_commit', on_commit)
+        try:
+            wg.run()
+        finally:
+            event.remove(Session, 'after_commit', on_commit)
+        assert wg.process.is_finished_ok
+        assert wg.tasks.task9.outputs.result.value.value == 10
+        commits[step_transaction] = len(counter)
+    assert commits[True] < commits[False]
+
+
+class SubmitProcessFunctionTask(Task):
+    """A process task that submits a process function, which the engine has to refuse."""
+
+    def execute(self, engine_process, args=None, kwargs=None, var_kwargs=None):
+        from aiida import orm
+        from aiida.engine import calcfunction
+
+        @calcfunction
+        def add_one(x):
+            return x + 1
+
+        return engine_process.submit(add_one, x=orm.Int(1)), None
+
+
+def test_step_transaction_submit_process_function(caplog) -> None:
+    """A process function can not be submitted, also when the submission is deferred to the end of the step."""
+    from aiida_workgraph.socket_spec import namespace
+    from aiida_workgraph.task import TaskHandle
+    from node_graph.task_spec import TaskSpec
+
+    spec = TaskSpec(
+        identifier='submit_process_function',
+        task_type='CALCJOB',
+        outputs=namespace(),
+        base_class=SubmitProcessFunctionTask,
+    )
+    wg = WorkGraph('test_step_transaction_submit_process_function')
+    wg.add_task(TaskHandle(spec), name='submit')
+    wg.step_transaction = True
+    wg.run()
+    assert wg.process.exit_status == 302
+    assert 'Cannot submit a process function' in caplog.text
+
+
+def test_get_processes_latest_bulk(normal_task) -> None:
+    """The nodes of all tasks are fetched with one query, and loaded only when the outputs are accessed."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from aiida import orm
+    from aiida_workgraph.utils import get_processes_latest
+
+    add_one = normal_task()
+    wg = WorkGraph('test_get_processes_latest_bulk')
+    for i in range(10):
+        wg.add_task(add_one, name=f'task{i}', x=orm.Int(i))
+    wg.run()
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        if statement.startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', on_execute)
+    try:
+        processes = get_processes_latest(wg.pk)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', on_execute)
+    # loading the workgraph node and its attributes, and a single query for the nodes of the ten tasks
+    assert len(statements) < 10
+    assert all(processes[f'task{i}']['pk'] is not None for i in range(10))
+    # only the tasks that changed since the last update are refreshed
+    wg.tasks.task3.reset()
+    wg.update()
+    assert wg.tasks.task3._pending_process_pk == processes['task3']['pk']
+    assert wg.tasks.task3.outputs.result.value == 4
+    assert wg.tasks.task3._pending_process_pk is None
+
+
+def test_watch(normal_task) -> None:
+    """The task state changes are yielded until the workgraph terminates."""
+    import asyncio
+    from aiida_workgraph.engine.change_feed import TaskStateChange
+    from aiida_workgraph.utils.control import TaskStateWatcher
+
+    add_one = normal_task()
+    wg = WorkGraph('test_watch')
+    wg.add_task(add_one, name='task1', x=1)
+    wg.add_task(add_one, name='task2', x=2)
+    wg.run()
+    for name in ['task1', 'task2']:
+        wg.tasks[name].reset()
+    changes = {change.task_name: change for change in wg.watch(timeout=10, interval=0.1)}
+    assert changes['task1'][1:3] == ('PLANNED', 'FINISHED')
+    assert changes['task2'].new_state == 'FINISHED'
+    assert wg.tasks.task1.state == 'FINISHED'
+    assert wg.state == 'FINISHED'
+
+    async def watch():
+        return [change async for change in wg.watch_async(timeout=10, interval=0.1)]
+
+    # no change since the last watch
+    assert asyncio.run(watch()) == []
+
+    # the broadcasts that arrive after the task states were read do not move the tasks back
+    with TaskStateWatcher(wg.pk) as watcher:
+        assert {change.task_name for change in watcher.poll()} >= {'task1', 'task2'}
+        watcher.listener.task_changes.extend(
+            [
+                TaskStateChange('task1', 'PLANNED', 'RUNNING', watcher.snapshot_time - 1),
+                TaskStateChange('task2', 'FINISHED', 'RUNNING', watcher.snapshot_time + 1),
+            ]
+        )
+        assert watcher.poll() == []
+        assert watcher.states['task1'] == watcher.states['task2'] == 'FINISHED'
+
+
+def test_profiling(tmp_path, normal_task) -> None:
+    """The time and SQL statements of the phases of the engine are stored in the extras and in the directory."""
+    import json
+    from aiida_workgraph.engine.profiler import PROFILE_EXTRA_KEY
+
+    add_one = normal_task()
+    wg = WorkGraph('test_profiling')
+    wg.add_task(add_one, name='task1', x=1)
+    wg.add_task(add_one, name='task2', x=wg.tasks.task1.outputs.result)
+    wg.profiling = str(tmp_path)
+    wg.run()
+    assert wg.process.is_finished_ok
+    profile = wg.process.base.extras.get(PROFILE_EXTRA_KEY)
+    phases = profile['phases']
+    assert phases['TaskManager.run_tasks']['calls'] >= 2
+    step = phases['WorkGraphEngine._do_step']
+    assert step['total'] >= phases['TaskManager.continue_workgraph']['total']
+    assert step['statements'] >= step['self_statements'] > 0
+    assert profile['statements'] == sum(phase['self_statements'] for phase in phases.values())
+    assert json.loads((tmp_path / f'workgraph_{wg.pk}_profile.json').read_text()) == profile
+    # profiling is disabled by default
+    wg = WorkGraph('test_profiling_disabled')
+    wg.add_task(add_one, name='task1', x=1)
+    wg.run()
+    assert PROFILE_EXTRA_KEY not in wg.process.base.extras.all
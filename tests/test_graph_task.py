@@ -47,3 +47,73 @@ def test_single_namespace_outputs():
     # graph outputs
     assert wg.outputs.sum.value == 3
     assert wg.outputs.product.value == 2
+
+
+def test_shared_job_budget():
+    """The child workgraphs share the job budget of their parent."""
+    import asyncio
+    from aiida.cmdline.utils.common import get_workchain_report
+
+    @task()
+    async def sleep(t):
+        await asyncio.sleep(t)
+        return t
+
+    @task.graph
+    def one_sleep():
+        sleep(t=0.2)
+
+    @task.graph
+    def sleeps(n):
+        for _ in range(n.value):
+            one_sleep()
+
+    wg = WorkGraph('test_shared_job_budget')
+    wg.add_task(sleeps, 'sleeps1', n=2)
+    wg.add_task(sleeps, 'sleeps2', n=2)
+    wg.max_number_jobs = 2
+    wg.shared_job_budget = True
+    wg.run()
+    assert wg.process.is_finished_ok
+    report = get_workchain_report(wg.process, 'REPORT')
+    assert 'Grant 1 job slots to task sleeps1.' in report
+    assert 'Grant 1 job slots to task sleeps2.' in report
+    for child in wg.process.called:
+        wgdata = child.base.attributes.get('workgraph_data')
+        assert wgdata['max_number_jobs'] == 1
+        assert wgdata['shared_job_budget'] is True
+        assert 'The maximum number of subprocesses has been reached: 1' in get_workchain_report(child, 'REPORT')
+
+
+def test_shared_job_budget_deferred():
+    """A child workgraph that gets no slot of the budget waits, and the graph of a subgraph task is not modified."""
+    import asyncio
+    from aiida.cmdline.utils.common import get_workchain_report
+
+    @task()
+    async def sleep(t):
+        await asyncio.sleep(t)
+        return t
+
+    @task.graph
+    def one_sleep(t):
+        return sleep(t=t).result
+
+    sub = one_sleep.build(t=0.1)
+    sub.max_number_jobs = 5
+    wg = WorkGraph('test_shared_job_budget_deferred')
+    wg.add_task(one_sleep, 'graph1', t=0.1)
+    sub_task = wg.add_task(sub, 'graph2', t=0.1)
+    wg.max_number_jobs = 1
+    wg.shared_job_budget = True
+    wg.run()
+    assert wg.process.is_finished_ok
+    report = get_workchain_report(wg.process, 'REPORT')
+    assert 'Grant 0 job slots' not in report
+    assert 'The maximum number of subprocesses has been reached: 1. Cannot launch the job: graph2.' in report
+    graph1, graph2 = wg.tasks.graph1.process, wg.tasks.graph2.process
+    # the second child workgraph started after the first one finished
+    assert graph2.ctime >= graph1.mtime
+    assert graph2.base.attributes.get('workgraph_data')['max_number_jobs'] == 1
+    assert sub_task.subgraph.max_number_jobs == 5
+    assert sub_task.subgraph.shared_job_budget is False
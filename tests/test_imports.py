@@ -0,0 +1,43 @@
+import subprocess
+import sys
+
+import pytest
+
+# the modules that only the public API needs, they must not be imported with the package
+HEAVY_MODULES = ('aiida_workgraph.workgraph', 'aiida_pythonjob', 'aiida_shell', 'node_graph', 'plumpy', 'numpy')
+
+
+def get_imported_modules(statement: str) -> set:
+    """Return the names of the modules that the statement imports."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True
+    )
+    return {
+        line.split('|')[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and 'cumulative' not in line
+    }
+
+
+# the ``verdi workgraph`` command group is loaded by every ``verdi`` invocation
+@pytest.mark.parametrize('module', ('aiida_workgraph', 'aiida_workgraph.cli.cmd_workgraph'))
+def test_import(module):
+    """Importing the package does not import the engine, the tasks or their dependencies."""
+    modules = get_imported_modules(f'import {module}')
+    assert module in modules
+    assert not set(HEAVY_MODULES) & modules
+
+
+def test_lazy_attributes():
+    """The public API is imported on first access, and ``task`` is the decorator and not the module."""
+    import aiida_workgraph
+    import aiida_workgraph.task
+    from aiida_workgraph.decorator import task
+    from aiida_workgraph.task import Task
+
+    assert aiida_workgraph.task is task
+    assert aiida_workgraph.Task is Task
+    assert aiida_workgraph.spec.namespace is aiida_workgraph.namespace
+    assert 'WorkGraph' in dir(aiida_workgraph)
+    with pytest.raises(AttributeError, match='has no attribute'):
+        aiida_workgraph.missing
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+
+from aiida_workgraph import WorkGraph, task
+from aiida_workgraph.engine.pools import get_task_computer_label, task_matches_pool
+
+
+def test_add_concurrency_pool():
+    wg = WorkGraph('test_add_concurrency_pool')
+    wg.add_concurrency_pool('cluster', limit=50, computer='hpc')
+    wg.add_concurrency_pool('monitors', task_type='monitor')
+    assert wg.concurrency_pools == {
+        'cluster': {'limit': 50, 'computer': 'hpc'},
+        'monitors': {'limit': None, 'task_type': 'MONITOR'},
+    }
+    with pytest.raises(ValueError, match='needs at least one of'):
+        wg.add_concurrency_pool('empty', limit=1)
+    wg2 = WorkGraph.from_dict(wg.to_dict())
+    assert wg2.concurrency_pools == wg.concurrency_pools
+
+
+def test_task_matches_pool(add_code):
+    wg = WorkGraph('test_task_matches_pool')
+    add = wg.add_task(ArithmeticAddCalculation, 'add', x=1, y=2, code=add_code)
+    add.tag = 'cheap'
+    assert get_task_computer_label(add) == 'localhost'
+    assert task_matches_pool(add, {'limit': 1, 'computer': 'localhost'})
+    assert task_matches_pool(add, {'limit': 1, 'computer': 'localhost', 'task_type': 'CALCJOB', 'tag': 'cheap'})
+    assert not task_matches_pool(add, {'limit': 1, 'computer': 'hpc'})
+    assert not task_matches_pool(add, {'limit': 1, 'task_type': 'CALCJOB', 'tag': 'expensive'})
+
+
+def test_concurrency_pool_limit():
+    """Tasks of a full pool wait, while the other tasks are launched."""
+
+    @task()
+    async def sleep_and_time(t):
+        start = time.time()
+        await asyncio.sleep(t)
+        return start
+
+    wg = WorkGraph('test_concurrency_pool_limit')
+    for i in range(2):
+        wg.add_task(sleep_and_time, f'serial{i}', t=0.5).tag = 'serial'
+        wg.add_task(sleep_and_time, f'free{i}', t=0.5)
+    wg.add_concurrency_pool('serial', limit=1, tag='serial')
+    wg.run()
+    assert wg.process.is_finished_ok
+    starts = {task.name: task.outputs.result.value.value for task in wg.tasks if task.name[:4] in ('seri', 'free')}
+    assert abs(starts['serial1'] - starts['serial0']) >= 0.4
+    assert abs(starts['free1'] - starts['free0']) < 0.4
@@ -0,0 +1,51 @@
+from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+
+from aiida_workgraph import WorkGraph
+from aiida_workgraph.engine.priority import critical_path_lengths, sort_tasks_by_priority
+
+
+def build_chain_and_leaves(n_chain: int, n_leaves: int) -> WorkGraph:
+    """A long chain that is added after many independent leaves."""
+    wg = WorkGraph('chain_and_leaves')
+    for i in range(n_leaves):
+        wg.add_task(ArithmeticAddCalculation, f'leaf{i}', x=i, y=1)
+    previous = wg.add_task(ArithmeticAddCalculation, 'chain0', x=0, y=1)
+    for i in range(1, n_chain):
+        previous = wg.add_task(ArithmeticAddCalculation, f'chain{i}', x=previous.outputs.sum, y=1)
+    return wg
+
+
+def test_critical_path_lengths():
+    output_node = {'a': ['b', 'c'], 'b': ['d'], 'c': [], 'd': [], 'e': []}
+    assert critical_path_lengths(output_node) == {'a': 3, 'b': 2, 'c': 1, 'd': 1, 'e': 1}
+    assert critical_path_lengths(output_node, weights={'c': 5})['a'] == 6
+    # a long chain does not hit the recursion limit
+    chain = {f't{i}': [f't{i + 1}'] for i in range(5000)}
+    chain['t5000'] = []
+    assert critical_path_lengths(chain)['t0'] == 5001
+
+
+def test_sort_by_priority():
+    wg = build_chain_and_leaves(n_chain=3, n_leaves=2)
+    critical_path = critical_path_lengths(wg.build_connectivity()['output_node'])
+    assert sort_tasks_by_priority(['leaf0', 'leaf1', 'chain0'], wg.tasks, critical_path) == ['chain0', 'leaf0', 'leaf1']
+    # the explicit priority comes first, and is persisted
+    wg.tasks.leaf1.priority = 10
+    assert sort_tasks_by_priority(['leaf0', 'leaf1', 'chain0'], wg.tasks, critical_path) == ['leaf1', 'chain0', 'leaf0']
+    wg2 = WorkGraph.from_dict(wg.to_dict())
+    assert wg2.tasks.leaf1.priority == 10
+
+
+def test_priority_makespan():
+    """The critical path is started first, so the leaves fill the remaining slots."""
+    wg = build_chain_and_leaves(n_chain=4, n_leaves=8)
+    wg.max_number_jobs = 2
+    result = wg.simulate(default_duration=10)
+    assert result.makespan == 60
+    assert result.spans['chain0'] == [(0, 10)]
+    # started in the order they were added, the leaves delay the chain
+    for i in range(8):
+        wg.tasks[f'leaf{i}'].priority = 1
+    result = wg.simulate(default_duration=10)
+    assert result.makespan == 80
+    assert result.spans['chain0'] == [(40, 50)]
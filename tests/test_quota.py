@@ -0,0 +1,76 @@
+import pytest
+from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+from aiida.cmdline.utils.common import get_workchain_report
+from aiida.engine import ProcessState
+from aiida.orm import WorkflowNode
+
+from aiida_workgraph import WorkGraph
+from aiida_workgraph.orm.quota import (
+    JobQuotaSlot,
+    acquire_job_slot,
+    get_job_quota_limit,
+    get_job_slots,
+    reclaim_stale_job_slots,
+    record_job_slot_process,
+    release_job_slot,
+    set_job_quota,
+)
+
+
+def create_process_node(state: ProcessState) -> WorkflowNode:
+    node = WorkflowNode()
+    node.set_process_state(state)
+    return node.store()
+
+
+def test_job_quota_slots():
+    set_job_quota('test_job_quota_slots', 2)
+    assert get_job_quota_limit('test_job_quota_slots') == 2
+    assert get_job_quota_limit('undefined_quota') is None
+    with pytest.raises(ValueError, match='slash'):
+        set_job_quota('a/b', 1)
+    holder = create_process_node(ProcessState.RUNNING)
+    first = acquire_job_slot('test_job_quota_slots', holder.pk, 'add1')
+    second = acquire_job_slot('test_job_quota_slots', holder.pk, 'add2')
+    assert {first, second} == {'test_job_quota_slots/0', 'test_job_quota_slots/1'}
+    assert acquire_job_slot('test_job_quota_slots', holder.pk, 'add3') is None
+    assert release_job_slot(first)
+    assert not release_job_slot(first)
+    assert acquire_job_slot('test_job_quota_slots', holder.pk, 'add3') == first
+    assert {slot['task'] for slot in get_job_slots('test_job_quota_slots')} == {'add2', 'add3'}
+
+
+def test_reclaim_stale_job_slots():
+    """The slots of killed processes, or of jobs that terminated, are reclaimed when the quota is full."""
+    set_job_quota('test_reclaim_stale_job_slots', 2)
+    killed = create_process_node(ProcessState.KILLED)
+    running = create_process_node(ProcessState.RUNNING)
+    acquire_job_slot('test_reclaim_stale_job_slots', killed.pk, 'add1')
+    label = acquire_job_slot('test_reclaim_stale_job_slots', running.pk, 'add2')
+    record_job_slot_process(label, create_process_node(ProcessState.FINISHED).pk)
+    assert reclaim_stale_job_slots('test_reclaim_stale_job_slots') == 2
+    set_job_quota('test_reclaim_stale_job_slots', 1)
+    acquire_job_slot('test_reclaim_stale_job_slots', killed.pk, 'add1')
+    # the quota is full, but the holder of the slot was killed
+    assert acquire_job_slot('test_reclaim_stale_job_slots', running.pk, 'add2') == 'test_reclaim_stale_job_slots/0'
+    assert acquire_job_slot('test_reclaim_stale_job_slots', running.pk, 'add3') is None
+    # a slot without a holder is stale
+    release_job_slot('test_reclaim_stale_job_slots/0')
+    JobQuotaSlot(label='test_reclaim_stale_job_slots/0').store()
+    assert acquire_job_slot('test_reclaim_stale_job_slots', running.pk, 'add4') == 'test_reclaim_stale_job_slots/0'
+    assert get_job_slots('test_reclaim_stale_job_slots')[0]['task'] == 'add4'
+
+
+def test_job_quota_engine(add_code):
+    """The jobs wait for a free slot of the quota, and the slots are released when the jobs finish."""
+    set_job_quota('test_job_quota_engine', 1)
+    wg = WorkGraph('test_job_quota_engine')
+    wg.add_task(ArithmeticAddCalculation, 'add1', x=1, y=2, code=add_code)
+    wg.add_task(ArithmeticAddCalculation, 'add2', x=3, y=4, code=add_code)
+    wg.job_quota = 'test_job_quota_engine'
+    assert WorkGraph.from_dict(wg.to_dict()).job_quota == 'test_job_quota_engine'
+    wg.run()
+    assert wg.process.is_finished_ok
+    report = get_workchain_report(wg.process, 'REPORT')
+    assert 'The job quota test_job_quota_engine is full. Cannot launch the job: add2.' in report
+    assert get_job_slots('test_job_quota_engine') == []
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from aiida.cmdline.utils.common import get_workchain_report
+
+from aiida_workgraph import WorkGraph, task
+from aiida_workgraph.engine.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock)
+    for _ in range(3):
+        assert bucket.has_token()
+        bucket.consume()
+    assert not bucket.has_token()
+    assert bucket.wait_time() == pytest.approx(0.5)
+    clock.now = 0.5
+    assert bucket.has_token()
+    bucket.consume()
+    # the bucket never holds more than the burst size
+    clock.now = 100
+    assert bucket.wait_time() == 0
+    assert bucket.tokens == 3
+    with pytest.raises(ValueError, match='must be positive'):
+        TokenBucket(rate=0)
+
+
+def test_token_bucket_achieved_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=1, window=10, clock=clock)
+    for i in range(50):
+        clock.now = i * 0.5
+        bucket.consume()
+    assert bucket.achieved_rate() == pytest.approx(2, rel=0.1)
+    assert bucket.stats(queue_depth=4) == {
+        'queue_depth': 4,
+        'submitted': 50,
+        'submit_rate': bucket.achieved_rate(),
+        'max_submit_rate': 10,
+        'submit_burst': 1,
+    }
+
+
+def test_max_submit_rate():
+    """The ready tasks are submitted at most ``max_submit_rate`` per second, the others are deferred."""
+
+    @task()
+    async def get_time():
+        return time.time()
+
+    wg = WorkGraph('test_max_submit_rate')
+    for i in range(4):
+        wg.add_task(get_time, f'get_time{i}')
+    wg.max_submit_rate = 1
+    wg.submit_burst = 1
+    assert WorkGraph.from_dict(wg.to_dict()).max_submit_rate == 1
+    wg.run()
+    assert wg.process.is_finished_ok
+    times = sorted(task.outputs.result.value.value for task in wg.tasks if task.name.startswith('get_time'))
+    assert times[-1] - times[0] >= 2.5
+    assert 'Submission rate limit reached' in get_workchain_report(wg.process, 'REPORT')
+    stats = wg.process.submit_stats
+    assert stats['submitted'] == 4
+    assert stats['queue_depth'] == 0
+    assert stats['max_submit_rate'] == 1
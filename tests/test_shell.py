@@ -125,3 +125,30 @@ def test_shell_graph_task():
     wg.run()
     # wg.submit(wait=True, timeout=60)
     assert wg.outputs.result.value.value == 5
+
+
+def test_shelljob_spec_cache():
+    """The socket specs of a process class and of the shell jobs with the same outputs are built once."""
+    from aiida_shell import ShellJob
+    from aiida_workgraph.socket_spec import from_aiida_process, spec_structure_key
+
+    from aiida_workgraph.tasks.shelljob_task import _cached_shelljob_TaskSpec
+
+    # the callers get copies of the cached specs, which they can modify
+    in_spec, _ = from_aiida_process(ShellJob)
+    assert in_spec == from_aiida_process(ShellJob.spec())[0]
+    in_spec.fields.pop('nodes')
+    assert 'nodes' in from_aiida_process(ShellJob)[0].fields
+    wg = WorkGraph(name='test_shelljob_spec_cache')
+    job1 = wg.add_task(shelljob, command='cat', resolve_command=False, outputs=['result'])
+    hits = _cached_shelljob_TaskSpec.cache_info().hits
+    job2 = wg.add_task(shelljob, command='cat', resolve_command=False, outputs=['result'])
+    assert _cached_shelljob_TaskSpec.cache_info().hits == hits + 1
+    job3 = wg.add_task(shelljob, command='cat', resolve_command=False, outputs=['other'])
+    assert job1.spec == job2.spec
+    assert job1.spec.outputs.fields is not job2.spec.outputs.fields
+    assert 'other' in job3.outputs and 'other' not in job1.outputs
+    assert spec_structure_key(['a', {'b': 1}]) == spec_structure_key(['a', {'b': 1}])
+    assert spec_structure_key([1]) != spec_structure_key([True])
+    assert spec_structure_key([{'a': []}]) is not None
+    assert spec_structure_key([{1, 2}, {3: set()}]) is None
@@ -0,0 +1,51 @@
+import pytest
+from aiida.calculations.arithmetic.add import ArithmeticAddCalculation
+
+from aiida_workgraph import Map, While, WorkGraph
+
+
+def test_simulate_job_slots():
+    """The jobs wait for a free slot, the task on the critical path is launched first."""
+    wg = WorkGraph('test_simulate_job_slots')
+    for i in range(4):
+        wg.add_task(ArithmeticAddCalculation, name=f'add{i}', x=1, y=i)
+    wg.add_task(ArithmeticAddCalculation, name='last', x=wg.tasks.add3.outputs.sum, y=1)
+    wg.max_number_jobs = 2
+    result = wg.simulate(durations={'last': 5}, default_duration=10)
+    assert result.makespan == 25
+    assert result.peak_concurrency == 2
+    assert result.utilization == pytest.approx(45 / 50)
+    assert result.spans['add3'] == [(0, 10)]
+    assert result.spans['last'] == [(20, 25)]
+    assert result.critical_path[-1] == 'last'
+    # nothing was run
+    assert wg.process is None
+    assert 'last' in wg.tasks
+
+
+def test_simulate_zones(decorated_add, decorated_smaller_than):
+    """The While zone runs the given iterations, and the Map zone is expanded with a concurrency pool."""
+    with WorkGraph('test_simulate_zones') as wg:
+        wg.ctx = {'n': 1}
+        compare = wg.add_task(decorated_smaller_than, name='compare', x=wg.ctx.n, y=10)
+        with While(compare.outputs.result) as while_zone:
+            job = while_zone.add_task(ArithmeticAddCalculation, name='job', x=wg.ctx.n, y=1)
+            wg.update_ctx({'n': job.outputs.sum})
+        source = wg.add_task(decorated_add, name='source', x=1, y=1)
+        with Map(source.outputs.result) as map_zone:
+            map_zone.add_task(ArithmeticAddCalculation, name='mapped', x=map_zone.item.value, y=1)
+    wg.add_concurrency_pool('jobs', limit=3, task_type='CALCJOB')
+    result = wg.simulate(
+        durations={'job': 2, 'mapped': lambda task: 4},
+        default_duration=0.5,
+        outcomes={'while_zone': 3, 'map_zone': 7},
+    )
+    assert len(result.spans['job']) == 3
+    assert len(result.spans['compare']) == 4
+    mapped = [name for name in result.spans if name.endswith('_mapped')]
+    assert len(mapped) == 7
+    assert result.peak_concurrency == 3
+    # the map items start after the source, and at most three jobs run at the same time
+    assert min(result.spans[name][0][0] for name in mapped) == 1.0
+    assert result.makespan == 13.0
+    assert result.critical_path[-1].endswith('_mapped')
@@ -335,3 +335,37 @@ def test_attach_extras_to_aiida_data_node():
     wg = MyWorkflow.build()
     wg.run()
     assert wg.outputs.result.value.base.extras.get('unit') == 'eV'
+
+
+def test_set_extras_many():
+    """The extras of many nodes are written with one bulk UPDATE, and merged with the existing extras."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from aiida.orm import Int, QueryBuilder
+    from aiida_workgraph.orm.utils import set_extras_many
+
+    nodes = [Int(i).store() for i in range(20)]
+    nodes[0].base.extras.set('old', 1)
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('UPDATE'):
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', on_execute)
+    try:
+        set_extras_many([(node, {'unit': 'eV', 'index': i}) for i, node in enumerate(nodes)])
+    finally:
+        event.remove(Engine, 'before_cursor_execute', on_execute)
+    assert len(statements) == 1
+    # the models in memory are up to date
+    assert nodes[5].base.extras.get('index') == 5
+    # read the extras back from the database, and not from the models in the session
+    qb = QueryBuilder().append(
+        Int,
+        filters={'id': {'in': [node.pk for node in nodes]}},
+        project=['id', 'extras.old', 'extras.unit', 'extras.index'],
+    )
+    extras = {pk: (old, unit, index) for pk, old, unit, index in qb.all()}
+    assert extras[nodes[0].pk] == (1, 'eV', 0)
+    assert extras[nodes[19].pk] == (None, 'eV', 19)
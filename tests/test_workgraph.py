@@ -236,6 +236,18 @@ def test_wait_timeout(create_workgraph_process_node):
         wg.wait(timeout=1, interval=1)
 
 
+def test_wait_finished(create_workgraph_process_node):
+    """A finished workgraph is returned at once, without polling."""
+    import time
+
+    wg = WorkGraph()
+    wg.process = create_workgraph_process_node(state='finished')
+    start = time.time()
+    wg.wait(timeout=10, interval=5)
+    assert time.time() - start < 5
+    assert wg.state == 'FINISHED'
+
+
 def test_inputs_outputs(decorated_namespace_sum_diff):
     """Test the group inputs and outputs of the WorkGraph."""
 